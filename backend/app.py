@@ -12,6 +12,13 @@ from routes.messages import messages_bp
 from routes.rewards import rewards_bp
 from routes.qr_codes import qr_bp
 from routes.chat import chat_bp
+from services.query_guard import init_query_guard
+from services.engine_profile import configure_engine_options, init_engine_profile
+from services.db_routing import init_db_routing, copy_to_replica, REPLICA_BIND, LAST_WRITE_HEADER
+from services.archive import archive_closed_items, start_archiver
+from services.message_bus import init_message_bus
+from migrations import run_migrations
+import click
 import os
 
 def create_app():
@@ -19,12 +26,17 @@ def create_app():
     app.config.from_object(Config)
     
     # Initialize extensions
+    configure_engine_options(app)
     db.init_app(app)
+    init_engine_profile(app, db)
+    init_db_routing(app)
+    init_query_guard(app, db)
     jwt = JWTManager(app)
     CORS(app, 
          origins="*", 
          supports_credentials=True,
-         allow_headers=["Content-Type", "Authorization"],
+         allow_headers=["Content-Type", "Authorization", LAST_WRITE_HEADER],
+         expose_headers=[LAST_WRITE_HEADER],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     
     # JWT Error Handlers
@@ -76,77 +88,61 @@ def create_app():
     @app.route('/qr/<code>')
     def qr_code_page(code):
         """Public page when QR code is scanned"""
-        from flask import render_template_string, request
-        base_url = request.host_url.rstrip('/')
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Item Found - Reunite</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                body {{ font-family: system-ui, -apple-system, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .container {{ background: white; border-radius: 12px; padding: 24px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); }}
-                h1 {{ color: #2f303c; }}
-                .form-group {{ margin-bottom: 16px; }}
-                label {{ display: block; margin-bottom: 8px; font-weight: 600; color: #2f303c; }}
-                input, textarea {{ width: 100%; padding: 12px; border: 2px solid #e5e7eb; border-radius: 8px; font-size: 14px; }}
-                button {{ background: #4278ff; color: white; padding: 12px 24px; border: none; border-radius: 8px; font-weight: 600; cursor: pointer; }}
-                button:hover {{ background: #3a6ce0; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>📱 Item Found</h1>
-                <p>This item belongs to someone. Please fill out the form below to contact the owner and help return their item.</p>
-                <form id="contactForm">
-                    <div class="form-group">
-                        <label>Your Name *</label>
-                        <input type="text" name="finder_name" required>
-                    </div>
-                    <div class="form-group">
-                        <label>Your Email</label>
-                        <input type="email" name="finder_email">
-                    </div>
-                    <div class="form-group">
-                        <label>Message *</label>
-                        <textarea name="message" rows="4" required placeholder="I found your item! How can I return it to you?"></textarea>
-                    </div>
-                    <button type="submit">Send Message</button>
-                </form>
-                <div id="result" style="margin-top: 20px; display: none;"></div>
-            </div>
-            <script>
-                document.getElementById('contactForm').addEventListener('submit', async (e) => {{
-                    e.preventDefault();
-                    const formData = new FormData(e.target);
-                    const data = Object.fromEntries(formData);
-                    try {{
-                        const response = await fetch('{base_url}/api/qr-codes/{code}/contact', {{
-                            method: 'POST',
-                            headers: {{ 'Content-Type': 'application/json' }},
-                            body: JSON.stringify(data)
-                        }});
-                        const result = await response.json();
-                        document.getElementById('result').style.display = 'block';
-                        document.getElementById('result').innerHTML = result.success 
-                            ? '<p style="color: green;">✓ ' + result.message + '</p>'
-                            : '<p style="color: red;">Error: ' + result.error + '</p>';
-                        e.target.reset();
-                    }} catch (err) {{
-                        document.getElementById('result').style.display = 'block';
-                        document.getElementById('result').innerHTML = '<p style="color: red;">Error sending message</p>';
-                    }}
-                }});
-            </script>
-        </body>
-        </html>
-        """
-        return render_template_string(html_template)
-    
-    # Create tables
+        from flask import render_template, request
+        # render_template compiles qr_landing.html once and reuses it
+        response = app.make_response(render_template('qr_landing.html', code=code))
+        response.headers['Cache-Control'] = f"public, max-age={app.config['QR_PAGE_MAX_AGE']}"
+        response.add_etag()
+        return response.make_conditional(request)
+    
+    @app.cli.command('migrate')
+    def migrate_command():
+        """Apply pending schema migrations"""
+        applied = run_migrations(db)
+        print(f"{len(applied)} migration(s) applied")
+    
+    @app.cli.command('copy-replica')
+    def copy_replica_command():
+        """Copy the SQLite primary database to the replica file (local testing)"""
+        engines = db.engines
+        if REPLICA_BIND not in engines:
+            print("DATABASE_REPLICA_URL is not set")
+            return
+        primary, replica = engines[None].url, engines[REPLICA_BIND].url
+        if primary.get_backend_name() != 'sqlite' or replica.get_backend_name() != 'sqlite':
+            print("copy-replica only supports SQLite databases")
+            return
+        copy_to_replica(primary.database, replica.database)
+        print(f"Copied {primary.database} -> {replica.database}")
+    
+    @app.cli.command('rebuild-points')
+    def rebuild_points_command():
+        """Recompute user_points totals from the rewards ledger"""
+        from services.points import rebuild_user_points
+        rebuild_user_points()
+        print("User point totals rebuilt")
+    
+    @app.cli.command('render-qr-page')
+    @click.argument('output', default='qr_landing.html')
+    def render_qr_page_command(output):
+        """Pre-render the QR landing page for a proxy/CDN to serve for every /qr/<code>"""
+        from flask import render_template
+        with app.test_request_context():
+            html = render_template('qr_landing.html', code=None)
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"Wrote {output}")
+    
+    @app.cli.command('archive')
+    def archive_command():
+        """Move closed items past the retention window into the archive tables"""
+        totals = archive_closed_items(app.config['ARCHIVE_RETENTION_DAYS'], app.config['ARCHIVE_BATCH_SIZE'])
+        for table, moved in totals.items():
+            print(f"{table}: {moved} archived")
+    
+    # Create tables and bring existing databases up to date
     with app.app_context():
-        db.create_all()
+        run_migrations(db)
         
         # Create default admin account if it doesn't exist
         from models import User
@@ -162,6 +158,10 @@ def create_app():
             db.session.add(admin)
             db.session.commit()
             print("Default admin created: admin@reunite.com / admin123")
+        
+        init_message_bus(app)
+    
+    start_archiver(app)
     
     return app
 
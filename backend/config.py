@@ -5,12 +5,71 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///reunite.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')  # Optional read replica for listing endpoints
+    REPLICA_READ_YOUR_WRITES_SECONDS = float(os.environ.get('REPLICA_READ_YOUR_WRITES_SECONDS') or 5)
+    
+    # Engine profile: 'tuned' (pool sizing, SQLite WAL + pragmas) or 'default' (SQLAlchemy defaults)
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE') or 'tuned'
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)  # Seconds; server databases only
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 20000)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
-    OLLAMA_HOST = os.environ.get('OLLAMA_HOST') or 'http://76.213.143.25:11434'
+    OLLAMA_HOST = os.environ.get('OLLAMA_HOST') or 'http://localhost:11434'
+    OLLAMA_TIMEOUT = float(os.environ['OLLAMA_TIMEOUT']) if os.environ.get('OLLAMA_TIMEOUT') else None  # Seconds, None = no timeout
     OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL') or 'llama2'
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     FRONTEND_URL = os.environ.get('FRONTEND_URL') or 'https://reunite-wheat.vercel.app'
 
+    
+    # AI chat sessions
+    CHAT_TOKEN_BUDGET = int(os.environ.get('CHAT_TOKEN_BUDGET') or 2048)  # Max tokens of prompt history per request
+    CHAT_SUMMARY_BUDGET = int(os.environ.get('CHAT_SUMMARY_BUDGET') or 256)  # Max tokens kept for summarized old turns
+    CHAT_SESSION_TTL = int(os.environ.get('CHAT_SESSION_TTL') or 3600)  # Seconds of inactivity before a session expires
+    CHAT_MAX_SESSIONS = int(os.environ.get('CHAT_MAX_SESSIONS') or 1000)
+    
+    # Requests issuing more queries than this fail in tests and log a warning otherwise (0 disables)
+    MAX_QUERIES_PER_REQUEST = int(os.environ.get('MAX_QUERIES_PER_REQUEST') or 15)
+    
+    # Seconds a worker serves its in-memory leaderboard before reloading from user_points
+    LEADERBOARD_CACHE_TTL = int(os.environ.get('LEADERBOARD_CACHE_TTL') or 60)
+    
+    # Seconds a worker trusts its cached claim participants (claimant, finder, status) before
+    # re-checking the claim's status on the primary
+    CLAIM_PARTICIPANTS_TTL = int(os.environ.get('CLAIM_PARTICIPANTS_TTL') or 5)
+    
+    # Server-Sent Events streams for claim chats
+    SSE_KEEPALIVE_SECONDS = int(os.environ.get('SSE_KEEPALIVE_SECONDS') or 15)
+    SSE_POLL_SECONDS = float(os.environ.get('SSE_POLL_SECONDS') or 5)  # How often each worker's poller checks for messages sent through other workers
+    SSE_MAX_STREAM_SECONDS = int(os.environ.get('SSE_MAX_STREAM_SECONDS') or 300)  # Streams end and the client reconnects
+    SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS') or 3000)  # Client reconnect delay
+    SSE_MAX_SUBSCRIBERS = int(os.environ.get('SSE_MAX_SUBSCRIBERS') or 500)  # Open streams per worker
+    SSE_TOKEN_SECONDS = int(os.environ.get('SSE_TOKEN_SECONDS') or 60)  # Lifetime of the claim-scoped token a stream is opened with
+    
+    # In-memory cache of rendered QR images (rendered variants are also cached on disk)
+    QR_CACHE_MAX_BYTES = int(os.environ.get('QR_CACHE_MAX_BYTES') or 32 * 1024 * 1024)
+    QR_INFO_CACHE_TTL = int(os.environ.get('QR_INFO_CACHE_TTL') or 60)  # Seconds a worker serves a cached GET /api/qr-codes/<code> payload
+    QR_PAGE_MAX_AGE = int(os.environ.get('QR_PAGE_MAX_AGE') or 3600)  # Cache lifetime of the /qr/<code> landing page
+    QR_CODE_POOL_SIZE = int(os.environ.get('QR_CODE_POOL_SIZE') or 500)  # Pre-verified codes kept per worker
+    JOIN_CODE_POOL_SIZE = int(os.environ.get('JOIN_CODE_POOL_SIZE') or 20)
+    QR_BATCH_MAX_CODES = int(os.environ.get('QR_BATCH_MAX_CODES') or 200)  # Codes per POST /api/qr-codes/batch
+    QR_RENDER_WORKERS = int(os.environ.get('QR_RENDER_WORKERS') or 0)  # Processes rendering batches, 0 = CPU count
+    
+    # Token-bucket limits on the public QR endpoints, requests per minute (0 = unlimited)
+    QR_INFO_RATE_PER_IP = int(os.environ.get('QR_INFO_RATE_PER_IP') or 60)
+    QR_INFO_RATE_PER_CODE = int(os.environ.get('QR_INFO_RATE_PER_CODE') or 300)
+    QR_CONTACT_RATE_PER_IP = int(os.environ.get('QR_CONTACT_RATE_PER_IP') or 5)
+    QR_CONTACT_RATE_PER_CODE = int(os.environ.get('QR_CONTACT_RATE_PER_CODE') or 20)
+    CONTACT_DEDUPE_SECONDS = int(os.environ.get('CONTACT_DEDUPE_SECONDS') or 60)  # Identical contact messages within this window are sent once
+    RATE_LIMIT_STORAGE_URL = os.environ.get('RATE_LIMIT_STORAGE_URL')  # e.g. redis://localhost:6379/0 to share limits across workers; unset = per worker
+    MESSAGE_BUS_URL = os.environ.get('MESSAGE_BUS_URL') or RATE_LIMIT_STORAGE_URL  # Redis channel for new chat messages; unset = poll the database
+    
+    # Archival of closed items (lost: found/closed, found: claimed/returned) into archived_* tables
+    ARCHIVE_RETENTION_DAYS = int(os.environ.get('ARCHIVE_RETENTION_DAYS') or 180)
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE') or 500)  # Items moved per transaction
+    ARCHIVE_INTERVAL_HOURS = float(os.environ.get('ARCHIVE_INTERVAL_HOURS') or 0)  # Background archiver period, 0 = off
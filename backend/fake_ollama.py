@@ -0,0 +1,251 @@
+"""
+Local stand-in for the Ollama API, for latency and load testing.
+
+Implements the subset of the API the backend uses (POST /api/chat, plus
+/api/tags and /api/version for health checks) with configurable latency,
+failure injection, streaming and canned JSON responses. Uses only the
+standard library.
+
+Usage:
+    python fake_ollama.py --port 11434 --latency lognormal --latency-ms 800 --failure-rate 0.05
+    OLLAMA_HOST=http://localhost:11434 python app.py
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timezone
+import argparse
+import json
+import random
+import time
+
+# Canned responses for the structured prompts sent by gemini_service.py
+CANNED_ANALYSIS = {
+    "extraction": {
+        "category": "phone",
+        "color": "black",
+        "brand": "Apple",
+        "model": "iPhone 13",
+        "unique_features": ["cracked corner"],
+        "condition": "good",
+        "description": "Black iPhone in a clear case"
+    },
+    "descriptor": {
+        "object": "phone",
+        "colors": ["black"],
+        "materials": ["glass", "aluminum"],
+        "markings": ["logo"],
+        "shape": "rectangular"
+    },
+    "verification": {
+        "verification_confidence": 85,
+        "is_valid_proof": True,
+        "evidence_found": ["matching color", "matching brand"],
+        "analysis": "Photo is consistent with the item description"
+    }
+}
+CANNED_SIMILARITY = {
+    "match_confidence": 80,
+    "visual_similarities": ["color match"],
+    "differences": [],
+    "analysis": "Similar item"
+}
+CANNED_CHAT = ("I can help with that! To report a lost item, open your dashboard and choose "
+               "'Report Lost Item'. Adding a photo and a clear description improves matching.")
+
+class Settings:
+    """Runtime behavior of the stand-in server, set from command-line flags"""
+    latency = 'fixed'          # fixed, uniform, normal, lognormal
+    latency_ms = 0.0           # Mean (or fixed) latency per request
+    jitter_ms = 0.0            # Spread for uniform/normal distributions
+    per_token_ms = 0.0         # Extra delay per streamed chunk
+    failure_rate = 0.0         # Fraction of requests answered with failure_status
+    failure_status = 500
+    timeout_rate = 0.0         # Fraction of requests that hang for hang_seconds
+    hang_seconds = 120.0
+    models = None              # Allowed model names (None = accept any)
+    responses = {}             # Replies overriding the canned ones, keyed by prompt kind (see PROMPT_KINDS)
+
+def sample_latency():
+    """Draw one request latency in seconds from the configured distribution"""
+    mean = Settings.latency_ms
+    if Settings.latency == 'uniform':
+        ms = random.uniform(max(0, mean - Settings.jitter_ms), mean + Settings.jitter_ms)
+    elif Settings.latency == 'normal':
+        ms = random.gauss(mean, Settings.jitter_ms)
+    elif Settings.latency == 'lognormal':
+        # Heavy right tail, median close to the configured mean
+        ms = random.lognormvariate(0, 0.6) * mean
+    else:
+        ms = mean
+    return max(0.0, ms) / 1000.0
+
+# Kinds of prompt the backend sends; --response-file may override any of them
+PROMPT_KINDS = ['chat', 'similarity', 'analysis', 'verification', 'extraction']
+
+def prompt_kind(prompt):
+    """Classify a prompt as one of PROMPT_KINDS"""
+    if 'Return JSON' not in prompt:
+        return 'chat'
+    if '"match_confidence"' in prompt:
+        return 'similarity'
+    if '"extraction"' in prompt:
+        return 'analysis'
+    if '"verification_confidence"' in prompt:
+        return 'verification'
+    return 'extraction'
+
+def load_responses(path):
+    """Read a --response-file: a JSON object mapping prompt kinds to replies"""
+    with open(path) as f:
+        responses = json.load(f)
+    if not isinstance(responses, dict):
+        raise SystemExit(f"--response-file must be a JSON object keyed by {', '.join(PROMPT_KINDS)}")
+    unknown = sorted(set(responses) - set(PROMPT_KINDS))
+    if unknown:
+        raise SystemExit(f"--response-file has unknown prompt kinds: {', '.join(unknown)}")
+    return responses
+
+def build_reply(messages):
+    """Pick a canned reply based on the last user prompt"""
+    prompt = messages[-1].get('content', '') if messages else ''
+    kind = prompt_kind(prompt)
+    if kind in Settings.responses:
+        reply = Settings.responses[kind]
+        return reply if isinstance(reply, str) else json.dumps(reply)
+    if kind == 'chat':
+        return CANNED_CHAT
+    if kind == 'similarity':
+        return json.dumps(CANNED_SIMILARITY)
+    if kind == 'analysis':
+        analysis = dict(CANNED_ANALYSIS)
+        if '"verification"' not in prompt:
+            analysis.pop('verification')
+        return json.dumps(analysis)
+    return json.dumps(CANNED_ANALYSIS[kind])
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/version':
+            return self._send_json(200, {'version': '0.0.0-fake'})
+        if self.path == '/api/tags':
+            names = Settings.models or ['llama2']
+            return self._send_json(200, {'models': [{'name': name, 'model': name} for name in names]})
+        self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/api/chat':
+            return self._send_json(404, {'error': 'not found'})
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            return self._send_json(400, {'error': 'invalid JSON body'})
+
+        model = data.get('model', '')
+        if Settings.models and model not in Settings.models:
+            return self._send_json(404, {'error': f"model '{model}' not found, try pulling it first"})
+
+        # Failure injection happens before any latency so errors are cheap
+        if Settings.timeout_rate and random.random() < Settings.timeout_rate:
+            time.sleep(Settings.hang_seconds)
+        if Settings.failure_rate and random.random() < Settings.failure_rate:
+            return self._send_json(Settings.failure_status, {'error': 'injected failure'})
+
+        started = time.time()
+        time.sleep(sample_latency())
+        reply = build_reply(data.get('messages', []))
+
+        if data.get('stream', True):
+            return self._stream(model, reply, started)
+
+        self._send_json(200, {
+            'model': model,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'message': {'role': 'assistant', 'content': reply},
+            'done': True,
+            'total_duration': int((time.time() - started) * 1e9)
+        })
+
+    def _stream(self, model, reply, started):
+        """Send the reply as newline-delimited JSON chunks, like Ollama's streaming API"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        words = reply.split(' ')
+        for i, word in enumerate(words):
+            if Settings.per_token_ms:
+                time.sleep(Settings.per_token_ms / 1000.0)
+            self._write_chunk({
+                'model': model,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'message': {'role': 'assistant', 'content': word + (' ' if i < len(words) - 1 else '')},
+                'done': False
+            })
+        self._write_chunk({
+            'model': model,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'message': {'role': 'assistant', 'content': ''},
+            'done': True,
+            'total_duration': int((time.time() - started) * 1e9)
+        })
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload) + '\n').encode('utf-8')
+        self.wfile.write(f"{len(line):X}\r\n".encode('ascii') + line + b'\r\n')
+        self.wfile.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in Ollama server for load testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--latency', choices=['fixed', 'uniform', 'normal', 'lognormal'], default='fixed')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Mean (or fixed) latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Spread for uniform/normal latency')
+    parser.add_argument('--per-token-ms', type=float, default=0.0, help='Delay between streamed chunks')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--failure-status', type=int, default=500)
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests that hang')
+    parser.add_argument('--hang-seconds', type=float, default=120.0)
+    parser.add_argument('--models', help='Comma-separated model names to accept (others return "not found")')
+    parser.add_argument('--response-file', help='JSON object of replies keyed by prompt kind: ' + ', '.join(PROMPT_KINDS))
+    args = parser.parse_args()
+
+    Settings.latency = args.latency
+    Settings.latency_ms = args.latency_ms
+    Settings.jitter_ms = args.jitter_ms
+    Settings.per_token_ms = args.per_token_ms
+    Settings.failure_rate = args.failure_rate
+    Settings.failure_status = args.failure_status
+    Settings.timeout_rate = args.timeout_rate
+    Settings.hang_seconds = args.hang_seconds
+    Settings.models = [m.strip() for m in args.models.split(',')] if args.models else None
+    Settings.responses = load_responses(args.response_file) if args.response_file else {}
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeOllamaHandler)
+    server.daemon_threads = True
+    print(f"Fake Ollama listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
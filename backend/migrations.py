@@ -0,0 +1,280 @@
+"""
+Schema migrations for existing databases.
+
+Missing tables are created from the models first, but that doesn't touch
+existing tables, so new indexes, columns and triggers are applied here. Each
+migration runs once, in version order, inside its own transaction and is
+recorded in the schema_migrations table. Workers starting together serialize
+on a database-wide lock, so table creation and each migration happen in
+exactly one of them. Migrations must be safe to run on tables that were just
+created from the current models, so check the inspector first (MySQL has no
+CREATE INDEX IF NOT EXISTS; use _create_index).
+
+Run automatically by create_app(), or manually with `flask --app app migrate`.
+"""
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateTable
+from contextlib import contextmanager
+from datetime import datetime
+
+MIGRATIONS = []
+
+def _create_index(conn, name, table, columns):
+    """CREATE INDEX unless the table already has an index with that name"""
+    if name not in {index['name'] for index in inspect(conn).get_indexes(table)}:
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+
+def migration(version, description):
+    """Register a migration function; versions must be unique and increasing"""
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+@migration(1, 'Composite indexes for hot query predicates')
+def add_hot_path_indexes(conn):
+    indexes = [
+        ('ix_lost_items_school_status', 'lost_items', 'school_id, status'),
+        ('ix_found_items_school_status', 'found_items', 'school_id, status'),
+        ('ix_matches_lost_item_status', 'matches', 'lost_item_id, status'),
+        ('ix_claims_found_item', 'claims', 'found_item_id'),
+        ('ix_claims_claimant', 'claims', 'claimant_id'),
+        ('ix_messages_claim_created', 'messages', 'claim_id, created_at'),
+        ('ix_rewards_school_user', 'rewards', 'school_id, user_id'),
+        ('ix_contact_messages_qr_code', 'contact_messages', 'qr_code_id'),
+    ]
+    for name, table, columns in indexes:
+        _create_index(conn, name, table, columns)
+
+@migration(2, 'Backfill user_points totals from the rewards ledger')
+def backfill_user_points(conn):
+    if conn.execute(text("SELECT COUNT(*) FROM user_points")).scalar():
+        return
+    conn.execute(text(
+        "INSERT INTO user_points (user_id, school_id, total_points, updated_at) "
+        "SELECT user_id, school_id, SUM(points), :now FROM rewards GROUP BY user_id, school_id"
+    ), {'now': datetime.utcnow()})
+
+@migration(3, 'Denormalized schools.member_count')
+def add_school_member_count(conn):
+    columns = {c['name'] for c in inspect(conn).get_columns('schools')}
+    if 'member_count' not in columns:
+        conn.execute(text("ALTER TABLE schools ADD COLUMN member_count INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text(
+        "UPDATE schools SET member_count = "
+        "(SELECT COUNT(*) FROM users WHERE users.school_id = schools.id)"
+    ))
+
+# Full-text index over lost and found items. rowid encodes the source row:
+# lost item N -> 2N, found item N -> 2N + 1
+ITEMS_FTS_COLUMNS = 'title, description, brand, color, location'
+
+def _fts_triggers(table, item_type, rowid_expr):
+    new_rowid = rowid_expr.format(row='new')
+    old_rowid = rowid_expr.format(row='old')
+    insert = (
+        f"INSERT INTO items_fts (rowid, {ITEMS_FTS_COLUMNS}, item_type, item_id, school_id) "
+        f"VALUES ({new_rowid}, new.title, new.description, new.brand, new.color, new.location, "
+        f"'{item_type}', new.id, new.school_id);"
+    )
+    delete = f"DELETE FROM items_fts WHERE rowid = {old_rowid};"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {ITEMS_FTS_COLUMNS}, school_id "
+        f"ON {table} BEGIN {delete} {insert} END",
+    ]
+
+def _fts5_available(conn):
+    return bool(conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+@migration(4, 'FTS5 search index over lost and found items')
+def add_items_fts(conn):
+    if conn.dialect.name != 'sqlite':
+        return  # Search falls back to LIKE queries on other databases
+    if not _fts5_available(conn):
+        print("⚠️ SQLite was built without FTS5; item search will use LIKE queries")
+        return
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+        f"{ITEMS_FTS_COLUMNS}, item_type UNINDEXED, item_id UNINDEXED, school_id UNINDEXED)"
+    ))
+    for table, item_type, rowid_expr in (
+        ('lost_items', 'lost', '{row}.id * 2'),
+        ('found_items', 'found', '{row}.id * 2 + 1'),
+    ):
+        for statement in _fts_triggers(table, item_type, rowid_expr):
+            conn.execute(text(statement))
+        conn.execute(text(
+            f"INSERT INTO items_fts (rowid, {ITEMS_FTS_COLUMNS}, item_type, item_id, school_id) "
+            f"SELECT {rowid_expr.format(row=table)}, title, description, brand, color, location, "
+            f"'{item_type}', id, school_id FROM {table}"
+        ))
+
+@migration(5, 'Index messages by (claim_id, id) for incremental fetches')
+def add_messages_claim_id_index(conn):
+    _create_index(conn, 'ix_messages_claim_id', 'messages', 'claim_id, id')
+
+@migration(6, 'Backfill unread_counts from unread messages')
+def backfill_unread_counts(conn):
+    if conn.execute(text("SELECT COUNT(*) FROM unread_counts")).scalar():
+        return
+    conn.execute(text(
+        "INSERT INTO unread_counts (user_id, claim_id, count) "
+        "SELECT receiver_id, claim_id, COUNT(*) FROM messages WHERE is_read = :unread "
+        "GROUP BY receiver_id, claim_id"
+    ), {'unread': False})
+
+@migration(7, 'updated_at on lost and found items, so archiving counts from when an item closed')
+def add_item_updated_at(conn):
+    for table, backfill in (
+        # When existing items closed wasn't recorded; start their clock now
+        ('lost_items', ':now'),
+        ('found_items', ':now'),
+        ('archived_lost_items', 'archived_at'),
+        ('archived_found_items', 'archived_at'),
+    ):
+        columns = {c['name'] for c in inspect(conn).get_columns(table)}
+        if 'updated_at' not in columns:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP"))
+            conn.execute(text(f"UPDATE {table} SET updated_at = {backfill}"), {'now': datetime.utcnow()})
+    _create_index(conn, 'ix_lost_items_status_updated', 'lost_items', 'status, updated_at')
+    _create_index(conn, 'ix_found_items_status_updated', 'found_items', 'status, updated_at')
+
+# Tables whose rows move into archived_* with their ids (services/archive.py)
+ARCHIVED_SOURCE_TABLES = ('lost_items', 'found_items', 'matches', 'claims', 'messages')
+
+def _rebuild_sqlite_table(conn, table):
+    """
+    Recreate `table` from its model definition (SQLite can't alter a primary
+    key in place), keeping its rows, indexes and triggers
+    """
+    name = table.name
+    dependents = [
+        (row.type, row.name, row.sql) for row in conn.execute(text(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE type IN ('index', 'trigger') AND tbl_name = :name AND sql IS NOT NULL"
+        ), {'name': name})
+    ]
+    for kind, dependent, _ in dependents:
+        conn.execute(text(f"DROP {kind.upper()} {dependent}"))
+
+    # The copy needs every other table alongside it to compile its foreign keys
+    metadata = MetaData()
+    for other in table.metadata.tables.values():
+        other.to_metadata(metadata)
+    rebuilt = table.to_metadata(metadata, name=f'{name}_rebuild')
+
+    existing = {c['name'] for c in inspect(conn).get_columns(name)}
+    columns = ', '.join(c.name for c in table.columns if c.name in existing)
+    conn.execute(CreateTable(rebuilt))
+    conn.execute(text(f"INSERT INTO {rebuilt.name} ({columns}) SELECT {columns} FROM {name}"))
+    conn.execute(text(f"DROP TABLE {name}"))
+    conn.execute(text(f"ALTER TABLE {rebuilt.name} RENAME TO {name}"))
+    for _, _, sql in dependents:
+        conn.execute(text(sql))
+
+@migration(8, 'AUTOINCREMENT ids on archived tables so SQLite never reuses an archived id')
+def add_sqlite_autoincrement(conn):
+    if conn.dialect.name != 'sqlite':
+        return  # Sequences on other databases never hand out an id twice
+    from models import db
+
+    for name in ARCHIVED_SOURCE_TABLES:
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': name}
+        ).scalar()
+        if 'AUTOINCREMENT' not in sql.upper():
+            _rebuild_sqlite_table(conn, db.metadata.tables[name])
+        # Start past every id already handed out, including rows that have been archived
+        highest = conn.execute(text(
+            f"SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM {name} "
+            f"UNION ALL SELECT MAX(id) FROM archived_{name})"
+        )).scalar() or 0
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {'name': name})
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {'name': name, 'seq': highest})
+
+LOCK_TIMEOUT_SECONDS = 600  # How long a starting worker waits for another one's migrations
+LOCK_NAME = 'reunite_schema_migrations'
+LOCK_KEY = 7301442  # pg_advisory_xact_lock key; arbitrary but fixed
+
+def _acquire_lock(conn):
+    """
+    Start a transaction holding a database-wide migration lock, so workers
+    starting together apply each migration once. SQLite takes its write lock
+    up front (BEGIN IMMEDIATE); Postgres and MySQL use advisory locks.
+    """
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+    elif dialect == 'postgresql':
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': LOCK_KEY})
+    elif dialect in ('mysql', 'mariadb'):
+        locked = conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {'name': LOCK_NAME, 'timeout': LOCK_TIMEOUT_SECONDS}
+        ).scalar()
+        if not locked:
+            raise RuntimeError('Timed out waiting for another process to finish migrations')
+
+def _release_lock(conn):
+    # Postgres and SQLite locks end with the transaction; MySQL's is held by the session
+    if conn.dialect.name in ('mysql', 'mariadb'):
+        conn.execute(text("SELECT RELEASE_LOCK(:name)"), {'name': LOCK_NAME})
+        conn.commit()
+
+def _applied_versions(conn):
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+@contextmanager
+def _locked_transaction(conn):
+    _acquire_lock(conn)
+    try:
+        yield
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _release_lock(conn)
+
+def run_migrations(db):
+    """Create missing tables and apply all pending migrations; returns the versions applied"""
+    newly_applied = []
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            # Wait out another worker's migrations rather than failing with "database is locked"
+            busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {LOCK_TIMEOUT_SECONDS * 1000}")
+            conn.commit()
+        try:
+            with _locked_transaction(conn):
+                db.metadata.create_all(conn)
+                conn.execute(text(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                    "version INTEGER PRIMARY KEY, "
+                    "description VARCHAR(200) NOT NULL, "
+                    "applied_at TIMESTAMP NOT NULL)"
+                ))
+                applied = _applied_versions(conn)
+
+            for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in applied:
+                    continue
+                # Each migration gets its own transaction; the applied set is
+                # re-read under the lock in case another worker got there first
+                with _locked_transaction(conn):
+                    applied = _applied_versions(conn)
+                    if version not in applied:
+                        fn(conn)
+                        conn.execute(
+                            text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                            {'v': version, 'd': description, 't': datetime.utcnow()}
+                        )
+                        newly_applied.append(version)
+                        print(f"✅ Applied migration {version}: {description}")
+        finally:
+            if conn.dialect.name == 'sqlite':
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+                conn.commit()
+    return newly_applied
@@ -1,9 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
-import secrets
+import json
 
-db = SQLAlchemy()
+from services.db_routing import RoutingSession
+from services.code_pool import CodePool
+from config import Config
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Archived rows keep their ids, so tables that get archived must never hand
+# one out again (plain SQLite INTEGER PRIMARY KEY reuses max(id) + 1)
+NEVER_REUSE_IDS = {'sqlite_autoincrement': True}
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -50,19 +58,24 @@ class School(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
+    member_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Denormalized count of members
     
     # Relationship to creator (admin who created the school)
     creator = db.relationship('User', foreign_keys=[created_by], lazy=True)
     
     @staticmethod
     def generate_join_code():
-        """Generate a unique 6-character join code"""
-        import string
-        while True:
-            # Generate a 6-character alphanumeric code
-            code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(6))
-            if not School.query.filter_by(join_code=code).first():
-                return code
+        """Take an unused 6-character join code from the pool (commit via commit_with_code)"""
+        return join_code_pool.take()
+    
+    @staticmethod
+    def adjust_member_count(school_id, delta):
+        """Atomically add delta to a school's member counter (part of the caller's transaction)"""
+        db.session.execute(
+            db.update(School)
+            .where(School.id == school_id)
+            .values(member_count=School.member_count + delta)
+        )
     
     def to_dict(self):
         """Convert school to dictionary"""
@@ -72,11 +85,16 @@ class School(db.Model):
             'join_code': self.join_code,
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'member_count': len(self.members) if self.members else 0
+            'member_count': self.member_count or 0
         }
 
 class LostItem(db.Model):
     __tablename__ = 'lost_items'
+    __table_args__ = (
+        db.Index('ix_lost_items_school_status', 'school_id', 'status'),
+        db.Index('ix_lost_items_status_updated', 'status', 'updated_at'),
+        NEVER_REUSE_IDS,
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -104,6 +122,7 @@ class LostItem(db.Model):
     # Status
     status = db.Column(db.String(20), default='active', nullable=False)  # active, found, closed
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)  # Status changes bump this; archiving counts from it
     
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], lazy=True)
@@ -112,7 +131,9 @@ class LostItem(db.Model):
     claims = db.relationship('Claim', foreign_keys='Claim.lost_item_id', backref='lost_item', lazy=True, cascade='all, delete-orphan')
     qr_codes = db.relationship('QRCode', foreign_keys='QRCode.lost_item_id', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def to_dict(self, users=None):
+        """Serialize; pass a {user_id: User} map to avoid loading self.user"""
+        user = users.get(self.user_id) if users is not None else self.user
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -129,11 +150,16 @@ class LostItem(db.Model):
             'photo_url': self.photo_url,
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'user_name': f"{self.user.first_name} {self.user.last_name}" if self.user else None
+            'user_name': f"{user.first_name} {user.last_name}" if user else None
         }
 
 class FoundItem(db.Model):
     __tablename__ = 'found_items'
+    __table_args__ = (
+        db.Index('ix_found_items_school_status', 'school_id', 'status'),
+        db.Index('ix_found_items_status_updated', 'status', 'updated_at'),
+        NEVER_REUSE_IDS,
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -156,6 +182,7 @@ class FoundItem(db.Model):
     # Status
     status = db.Column(db.String(20), default='available', nullable=False)  # available, claimed, returned
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)  # Status changes bump this; archiving counts from it
     
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], lazy=True)
@@ -163,7 +190,9 @@ class FoundItem(db.Model):
     matches = db.relationship('Match', foreign_keys='Match.found_item_id', backref='found_item', lazy=True, cascade='all, delete-orphan')
     claims = db.relationship('Claim', foreign_keys='Claim.found_item_id', backref='found_item', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def to_dict(self, users=None):
+        """Serialize; pass a {user_id: User} map to avoid loading self.user"""
+        user = users.get(self.user_id) if users is not None else self.user
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -180,11 +209,15 @@ class FoundItem(db.Model):
             'photo_url': self.photo_url,
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'finder_name': f"{self.user.first_name} {self.user.last_name}" if self.user else None
+            'finder_name': f"{user.first_name} {user.last_name}" if user else None
         }
 
 class Match(db.Model):
     __tablename__ = 'matches'
+    __table_args__ = (
+        db.Index('ix_matches_lost_item_status', 'lost_item_id', 'status'),
+        NEVER_REUSE_IDS,
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     lost_item_id = db.Column(db.Integer, db.ForeignKey('lost_items.id'), nullable=False)
@@ -198,7 +231,10 @@ class Match(db.Model):
     status = db.Column(db.String(20), default='pending', nullable=False)  # pending, viewed, dismissed, claimed
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
-    def to_dict(self):
+    def to_dict(self, lost_items=None, found_items=None, users=None):
+        """Serialize; pass preloaded {id: obj} maps (see serialize_matches) to avoid lazy loads"""
+        lost_item = lost_items.get(self.lost_item_id) if lost_items is not None else self.lost_item
+        found_item = found_items.get(self.found_item_id) if found_items is not None else self.found_item
         return {
             'id': self.id,
             'lost_item_id': self.lost_item_id,
@@ -207,12 +243,17 @@ class Match(db.Model):
             'match_reasons': self.match_reasons,
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'lost_item': self.lost_item.to_dict() if self.lost_item else None,
-            'found_item': self.found_item.to_dict() if self.found_item else None
+            'lost_item': lost_item.to_dict(users) if lost_item else None,
+            'found_item': found_item.to_dict(users) if found_item else None
         }
 
 class Claim(db.Model):
     __tablename__ = 'claims'
+    __table_args__ = (
+        db.Index('ix_claims_found_item', 'found_item_id'),
+        db.Index('ix_claims_claimant', 'claimant_id'),
+        NEVER_REUSE_IDS,
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     lost_item_id = db.Column(db.Integer, db.ForeignKey('lost_items.id'), nullable=False)
@@ -234,7 +275,11 @@ class Claim(db.Model):
     claimant = db.relationship('User', foreign_keys=[claimant_id], lazy=True)
     verifier = db.relationship('User', foreign_keys=[verified_by], lazy=True)
     
-    def to_dict(self):
+    def to_dict(self, lost_items=None, found_items=None, users=None):
+        """Serialize; pass preloaded {id: obj} maps (see serialize_claims) to avoid lazy loads"""
+        lost_item = lost_items.get(self.lost_item_id) if lost_items is not None else self.lost_item
+        found_item = found_items.get(self.found_item_id) if found_items is not None else self.found_item
+        claimant = users.get(self.claimant_id) if users is not None else self.claimant
         return {
             'id': self.id,
             'lost_item_id': self.lost_item_id,
@@ -246,9 +291,9 @@ class Claim(db.Model):
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'verified_at': self.verified_at.isoformat() if self.verified_at else None,
-            'claimant_name': f"{self.claimant.first_name} {self.claimant.last_name}" if self.claimant else None,
-            'lost_item': self.lost_item.to_dict() if self.lost_item else None,
-            'found_item': self.found_item.to_dict() if self.found_item else None
+            'claimant_name': f"{claimant.first_name} {claimant.last_name}" if claimant else None,
+            'lost_item': lost_item.to_dict(users) if lost_item else None,
+            'found_item': found_item.to_dict(users) if found_item else None
         }
 
 class QRCode(db.Model):
@@ -268,12 +313,13 @@ class QRCode(db.Model):
     
     @staticmethod
     def generate_code():
-        """Generate a unique QR code"""
-        import string
-        while True:
-            code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(12))
-            if not QRCode.query.filter_by(code=code).first():
-                return code
+        """Take an unused QR code from the pool (commit via commit_with_code)"""
+        return qr_code_pool.take()
+    
+    @staticmethod
+    def generate_codes(count):
+        """Take `count` unused QR codes from the pool"""
+        return qr_code_pool.take_many(count)
     
     def to_dict(self):
         return {
@@ -289,6 +335,11 @@ class QRCode(db.Model):
 
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        db.Index('ix_messages_claim_created', 'claim_id', 'created_at'),
+        db.Index('ix_messages_claim_id', 'claim_id', 'id'),
+        NEVER_REUSE_IDS,
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     claim_id = db.Column(db.Integer, db.ForeignKey('claims.id'), nullable=False)
@@ -304,7 +355,10 @@ class Message(db.Model):
     sender = db.relationship('User', foreign_keys=[sender_id], lazy=True)
     receiver = db.relationship('User', foreign_keys=[receiver_id], lazy=True)
     
-    def to_dict(self):
+    def to_dict(self, users=None):
+        """Serialize; pass a {user_id: User} map to avoid loading sender/receiver"""
+        sender = users.get(self.sender_id) if users is not None else self.sender
+        receiver = users.get(self.receiver_id) if users is not None else self.receiver
         return {
             'id': self.id,
             'claim_id': self.claim_id,
@@ -313,13 +367,15 @@ class Message(db.Model):
             'content': self.content,
             'is_read': self.is_read,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'sender_name': f"{self.sender.first_name} {self.sender.last_name}" if self.sender else None,
-            'receiver_name': f"{self.receiver.first_name} {self.receiver.last_name}" if self.receiver else None,
-            'sender_name': f"{self.sender.first_name} {self.sender.last_name}" if self.sender else None
+            'sender_name': f"{sender.first_name} {sender.last_name}" if sender else None,
+            'receiver_name': f"{receiver.first_name} {receiver.last_name}" if receiver else None
         }
 
 class ContactMessage(db.Model):
     __tablename__ = 'contact_messages'
+    __table_args__ = (
+        db.Index('ix_contact_messages_qr_code', 'qr_code_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     qr_code_id = db.Column(db.Integer, db.ForeignKey('qr_codes.id'), nullable=False)
@@ -345,6 +401,9 @@ class ContactMessage(db.Model):
 
 class Reward(db.Model):
     __tablename__ = 'rewards'
+    __table_args__ = (
+        db.Index('ix_rewards_school_user', 'school_id', 'user_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -370,3 +429,136 @@ class Reward(db.Model):
             'reason': self.reason,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class PhotoAnalysis(db.Model):
+    __tablename__ = 'photo_analyses'
+    __table_args__ = (
+        db.UniqueConstraint('photo_hash', 'context_key', name='uq_photo_analysis_context'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    photo_hash = db.Column(db.String(64), nullable=False, index=True)  # sha256 of the image bytes
+    context_key = db.Column(db.String(64), nullable=False, default='')  # hash of the item text verified against ('' = none)
+    photo_url = db.Column(db.String(500), nullable=True)
+    analysis = db.Column(db.Text, nullable=False)  # JSON: extraction, descriptor, verification
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'photo_hash': self.photo_hash,
+            'photo_url': self.photo_url,
+            'analysis': json.loads(self.analysis) if self.analysis else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class UserPoints(db.Model):
+    """Running point total per user per school, maintained alongside the rewards ledger"""
+    __tablename__ = 'user_points'
+    __table_args__ = (
+        db.UniqueConstraint('school_id', 'user_id', name='uq_user_points_school_user'),
+        db.Index('ix_user_points_school_total', 'school_id', 'total_points'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    total_points = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+class UnreadCount(db.Model):
+    """Unread messages per receiver per claim, maintained by send and read-marking"""
+    __tablename__ = 'unread_counts'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'claim_id', name='uq_unread_counts_user_claim'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    claim_id = db.Column(db.Integer, db.ForeignKey('claims.id'), nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+# Pre-verified unique codes, refilled in the background
+qr_code_pool = CodePool(db, QRCode.code, length=12, size=Config.QR_CODE_POOL_SIZE)
+join_code_pool = CodePool(db, School.join_code, length=6, size=Config.JOIN_CODE_POOL_SIZE)
+
+def _archive_table(model, *indexes):
+    """Cold copy of a model's table: same columns without foreign keys, plus archived_at"""
+    columns = [
+        db.Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False, nullable=c.nullable)
+        for c in model.__table__.columns
+    ]
+    return db.Table(
+        f'archived_{model.__tablename__}',
+        *columns,
+        db.Column('archived_at', db.DateTime, nullable=False),
+        *indexes
+    )
+
+# Closed items and everything hanging off them, moved out of the hot tables by services/archive.py
+archived_lost_items = _archive_table(
+    LostItem, db.Index('ix_archived_lost_items_school_created', 'school_id', 'created_at'))
+archived_found_items = _archive_table(
+    FoundItem, db.Index('ix_archived_found_items_school_created', 'school_id', 'created_at'))
+archived_matches = _archive_table(
+    Match, db.Index('ix_archived_matches_lost_item', 'lost_item_id'))
+archived_claims = _archive_table(
+    Claim, db.Index('ix_archived_claims_claimant', 'claimant_id'))
+archived_messages = _archive_table(
+    Message, db.Index('ix_archived_messages_claim_created', 'claim_id', 'created_at'))
+
+ARCHIVE_TABLES = {
+    LostItem: archived_lost_items,
+    FoundItem: archived_found_items,
+    Match: archived_matches,
+    Claim: archived_claims,
+    Message: archived_messages,
+}
+
+def from_archive(model, row):
+    """Rebuild a read-only (never added to the session) instance from an archive row"""
+    return model(**{c.name: row._mapping[c.name] for c in model.__table__.columns})
+
+def load_archived(model, ids):
+    """Load archived rows for a set of IDs in one IN query, as an {id: instance} map"""
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return {}
+    table = ARCHIVE_TABLES[model]
+    rows = db.session.execute(db.select(table).where(table.c.id.in_(ids)))
+    return {row.id: from_archive(model, row) for row in rows}
+
+def _load_by_id(model, ids, include_archived=False):
+    """Load rows for a set of IDs in one IN query, as an {id: row} map"""
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return {}
+    rows = {row.id: row for row in model.query.filter(model.id.in_(ids)).all()}
+    if include_archived and len(rows) < len(ids):
+        rows.update(load_archived(model, ids - rows.keys()))
+    return rows
+
+def _load_nested(rows, extra_user_ids=(), include_archived=False):
+    """Load the lost items, found items and their users referenced by matches/claims"""
+    lost_items = _load_by_id(LostItem, (r.lost_item_id for r in rows), include_archived)
+    found_items = _load_by_id(FoundItem, (r.found_item_id for r in rows), include_archived)
+    user_ids = {item.user_id for item in lost_items.values()}
+    user_ids |= {item.user_id for item in found_items.values()}
+    user_ids |= set(extra_user_ids)
+    users = _load_by_id(User, user_ids)
+    return lost_items, found_items, users
+
+def serialize_messages(messages):
+    """Serialize messages with sender/receiver names from one batched user lookup"""
+    users = _load_by_id(User, {m.sender_id for m in messages} | {m.receiver_id for m in messages})
+    return [message.to_dict(users) for message in messages]
+
+def serialize_matches(matches):
+    """Serialize matches with nested items using a fixed number of queries"""
+    lost_items, found_items, users = _load_nested(matches)
+    return [match.to_dict(lost_items, found_items, users) for match in matches]
+
+def serialize_claims(claims, include_archived=False):
+    """Serialize claims with nested items and claimant using a fixed number of queries"""
+    lost_items, found_items, users = _load_nested(claims, (c.claimant_id for c in claims), include_archived)
+    return [claim.to_dict(lost_items, found_items, users) for claim in claims]
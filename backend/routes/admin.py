@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, School
+from models import db, User, School, join_code_pool
+from services.code_pool import commit_with_code
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -29,18 +30,18 @@ def create_school():
         if not school_name:
             return jsonify({'error': 'School name cannot be empty'}), 400
         
-        # Generate unique join code
-        join_code = School.generate_join_code()
-        
         # Create school
         school = School(
             name=school_name,
-            join_code=join_code,
             created_by=admin.id
         )
         
-        db.session.add(school)
-        db.session.commit()
+        def assign_join_code(code):
+            school.join_code = code
+            db.session.add(school)
+        
+        # Pooled join codes are pre-checked; the unique constraint settles any race
+        commit_with_code(db, join_code_pool, assign_join_code)
         
         return jsonify({
             'message': 'School created successfully',
@@ -112,8 +113,12 @@ def regenerate_join_code(school_id):
             return jsonify({'error': 'Admin access required'}), 403
         
         school = School.query.get_or_404(school_id)
-        school.join_code = School.generate_join_code()
-        db.session.commit()
+        
+        def assign_join_code(code):
+            school.join_code = code
+            db.session.add(school)
+        
+        commit_with_code(db, join_code_pool, assign_join_code)
         
         return jsonify({
             'message': 'Join code regenerated',
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
-from models import db, User
+from models import db, User, School
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
@@ -46,7 +46,6 @@ def signup():
         
         # If join code provided, try to join school
         if join_code:
-            from models import School
             school = School.query.filter_by(join_code=join_code, is_active=True).first()
             if school:
                 user.school_id = school.id
@@ -54,6 +53,8 @@ def signup():
                 return jsonify({'error': 'Invalid join code'}), 400
         
         db.session.add(user)
+        if user.school_id:
+            School.adjust_member_count(user.school_id, 1)
         db.session.commit()
         
         # Generate tokens (identity must be a string)
@@ -1,9 +1,17 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from services.gemini_service import client, OLLAMA_MODEL
+from services.gemini_service import client, OLLAMA_MODEL, single_flight, request_key
+from services.chat_sessions import get_session, create_session, delete_session
 
 chat_bp = Blueprint('chat', __name__)
 
+def _chat(model, messages):
+    """Call Ollama, sharing one in-flight call among identical concurrent prompts"""
+    return single_flight(
+        request_key('chat', model, messages),
+        lambda: client.chat(model=model, messages=messages)
+    )
+
 @chat_bp.route('/message', methods=['POST'])
 @jwt_required()
 def send_chat_message():
@@ -12,45 +20,28 @@ def send_chat_message():
         user_id = int(get_jwt_identity())
         data = request.get_json()
         message = data.get('message', '').strip()
-        conversation_history = data.get('history', [])  # Array of {role, content} objects
+        session_id = data.get('session_id')
+        conversation_history = data.get('history')  # Array of {role, content}; only sent after a session_expired reply
         
         if not message:
             return jsonify({'error': 'Message is required'}), 400
         
-        # Build messages array for Ollama
-        messages = []
-        
-        # System prompt for context
-        system_prompt = """You are a helpful AI assistant for Reunite, a lost and found platform. 
-You help users with:
-- Finding lost items
-- Reporting found items
-- Understanding how to use the platform
-- Answering questions about lost and found processes
-- Providing tips for better item recovery
-
-Be friendly, concise, and helpful. If you don't know something specific about the user's account, suggest they check their dashboard."""
+        # Server-side session keeps the history within the token budget, so
+        # clients send just the new message once they have a session
+        session = get_session(user_id, session_id)
+        if not session:
+            if session_id and conversation_history is None:
+                # Unknown to this worker (restart, expiry, another process): ask the client to resend with history
+                return jsonify({'error': 'Chat session expired', 'session_expired': True}), 404
+            # Older clients include the current message at the end of history
+            if conversation_history and conversation_history[-1].get('role') == 'user' \
+                    and conversation_history[-1].get('content', '').strip() == message:
+                conversation_history = conversation_history[:-1]
+            session = create_session(user_id, conversation_history)
         
-        # Add conversation history (last 10 messages to keep context manageable)
-        if conversation_history and len(conversation_history) > 0:
-            # Add conversation history
-            for msg in conversation_history[-10:]:
-                if msg.get('role') in ['user', 'assistant']:
-                    messages.append({
-                        'role': msg['role'],
-                        'content': msg['content']
-                    })
-            # Add current message
-            messages.append({
-                'role': 'user',
-                'content': message
-            })
-        else:
-            # First message - include system context
-            messages.append({
-                'role': 'user',
-                'content': system_prompt + '\n\nNow, the user is asking: ' + message
-            })
+        # The turn is only recorded once it gets a reply, so a retry after a failure doesn't repeat it
+        with session.lock:
+            messages = session.build_messages(pending=message)
         
         # Call Ollama - try with configured model, fallback to common models if not available
         print(f"Calling Ollama with model: {OLLAMA_MODEL}, messages count: {len(messages)}")
@@ -64,10 +55,7 @@ Be friendly, concise, and helpful. If you don't know something specific about th
         
         # Try the configured model first
         try:
-            response = client.chat(
-                model=model_to_use,
-                messages=messages
-            )
+            response = _chat(model_to_use, messages)
         except Exception as ollama_error:
             error_str = str(ollama_error)
             last_error = ollama_error
@@ -79,10 +67,7 @@ Be friendly, concise, and helpful. If you don't know something specific about th
                 for fallback_model in fallback_models:
                     try:
                         print(f"Trying fallback model: {fallback_model}")
-                        response = client.chat(
-                            model=fallback_model,
-                            messages=messages
-                        )
+                        response = _chat(fallback_model, messages)
                         print(f"Successfully used fallback model: {fallback_model}")
                         model_to_use = fallback_model
                         break
@@ -118,9 +103,14 @@ Be friendly, concise, and helpful. If you don't know something specific about th
             
         if not ai_response:
             ai_response = "I'm sorry, I didn't get a response. Please try again."
+        else:
+            with session.lock:
+                session.add_turn('user', message)
+                session.add_turn('assistant', ai_response)
         
         return jsonify({
             'response': ai_response,
+            'session_id': session.session_id,
             'success': True
         }), 200
         
@@ -136,3 +126,11 @@ Be friendly, concise, and helpful. If you don't know something specific about th
             'response': "I'm having trouble processing your request right now. Please try again in a moment.",
             'details': error_msg if 'localhost' in str(e) or 'connection' in str(e).lower() else None
         }), 500
+
+@chat_bp.route('/session/<session_id>', methods=['DELETE'])
+@jwt_required()
+def clear_chat_session(session_id):
+    """Discard a chat session's server-side history"""
+    user_id = int(get_jwt_identity())
+    delete_session(user_id, session_id)
+    return jsonify({'message': 'Chat session cleared'}), 200
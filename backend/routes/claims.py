@@ -1,9 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, LostItem, FoundItem, Match, Claim, Message, Reward
+from models import db, User, LostItem, FoundItem, Match, Claim, Message, serialize_claims
 from datetime import datetime
-from services.gemini_service import verify_claim_with_photo
+from services.photo_analysis import get_photo_analysis
+from services.pagination import get_page_args, paginate
+from services.points import award_points
 import os
+from services.db_routing import read_only
+from services.archive import include_archived_requested, paginate_with_archive
+from services.claim_participants import invalidate_participants
 
 claims_bp = Blueprint('claims', __name__)
 
@@ -126,16 +131,19 @@ def verify_claim():
             proof_photo.save(filepath)
             proof_photo_url = f"/uploads/proofs/{filename}"
             
-            # Analyze with Gemini
+            # Analyze with Ollama - reuses a stored analysis if this photo was
+            # already checked against the same lost item description
             proof_photo.seek(0)
             photo_bytes = proof_photo.read()
             lost_item = LostItem.query.get(claim.lost_item_id)
             
-            verification_result = verify_claim_with_photo(
+            analysis = get_photo_analysis(
                 photo_bytes,
+                proof_photo_url,
                 lost_item.description or '',
                 lost_item.verification_question
             )
+            verification_result = analysis['verification']
         
         # Update claim
         claim.proof_photo_url = proof_photo_url
@@ -202,7 +210,7 @@ def approve_claim(claim_id):
         lost_item.status = 'found'
         
         # Award points to finder
-        finder_reward = Reward(
+        award_points(
             user_id=found_item.user_id,
             school_id=found_item.school_id,
             points=50,
@@ -210,9 +218,9 @@ def approve_claim(claim_id):
             related_item_id=found_item.id,
             related_type='found'
         )
-        db.session.add(finder_reward)
         
         db.session.commit()
+        invalidate_participants(claim.id)
         
         return jsonify({
             'message': 'Claim approved successfully',
@@ -228,15 +236,31 @@ def approve_claim(claim_id):
 
 @claims_bp.route('/my-claims', methods=['GET'])
 @jwt_required()
+@read_only
 def get_my_claims():
     """Get user's claims (as claimant)"""
     try:
         user_id = int(get_jwt_identity())
         
-        claims = Claim.query.filter_by(claimant_id=user_id).order_by(Claim.created_at.desc()).all()
-        
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = Claim.query.filter_by(claimant_id=user_id)
+        filters = {'claimant_id': user_id}
+        if request.args.get('status'):
+            query = query.filter(Claim.status == request.args['status'])
+            filters['status'] = request.args['status']
+        
+        include_archived = include_archived_requested(request)
+        if include_archived:
+            claims, next_cursor = paginate_with_archive(query, Claim, limit, cursor, **filters)
+        else:
+            claims, next_cursor = paginate(query, Claim, limit, cursor)
         return jsonify({
-            'claims': [claim.to_dict() for claim in claims]
+            'claims': serialize_claims(claims, include_archived),
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -244,20 +268,27 @@ def get_my_claims():
 
 @claims_bp.route('/found-item-claims', methods=['GET'])
 @jwt_required()
+@read_only
 def get_found_item_claims():
     """Get claims on items found by the user"""
     try:
         user_id = int(get_jwt_identity())
         
-        # Get all found items by this user
-        found_items = FoundItem.query.filter_by(user_id=user_id).all()
-        found_item_ids = [item.id for item in found_items]
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Get all claims for these found items
-        claims = Claim.query.filter(Claim.found_item_id.in_(found_item_ids)).order_by(Claim.created_at.desc()).all()
+        # Claims on any item found by this user
+        user_found_item_ids = db.session.query(FoundItem.id).filter(FoundItem.user_id == user_id)
+        query = Claim.query.filter(Claim.found_item_id.in_(user_found_item_ids))
+        if request.args.get('status'):
+            query = query.filter(Claim.status == request.args['status'])
         
+        claims, next_cursor = paginate(query, Claim, limit, cursor)
         return jsonify({
-            'claims': [claim.to_dict() for claim in claims]
+            'claims': serialize_claims(claims),
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -1,10 +1,18 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, LostItem, FoundItem, Match, Claim, QRCode, Reward
+from models import db, User, LostItem, FoundItem, Match, Claim, QRCode, UnreadCount, serialize_matches
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 import os
 from werkzeug.utils import secure_filename
-from services.gemini_service import analyze_item_for_matching, extract_item_details_from_photo
+from services.gemini_service import analyze_item_for_matching
+from services.photo_analysis import get_photo_analysis
+from services.pagination import get_page_args, paginate
+from services.points import award_points
+from services.search import search_items
+from services.db_routing import read_only
+from services.archive import include_archived_requested, paginate_with_archive, load_users
+from services.claim_participants import invalidate_participants
 import json
 
 items_bp = Blueprint('items', __name__)
@@ -27,6 +35,62 @@ def save_uploaded_file(file, folder='items'):
         return f"/uploads/{folder}/{filename}"
     return None
 
+def insert_matches(rows):
+    """Insert match rows with a single executemany INSERT"""
+    if rows:
+        db.session.execute(db.insert(Match), rows)
+
+def build_matches_for_lost_item(lost_item):
+    """Score a new lost item against available found items; returns Match row values for insert_matches()"""
+    found_items = FoundItem.query.options(joinedload(FoundItem.user)).filter_by(
+        school_id=lost_item.school_id,
+        status='available'
+    ).all()
+    if not found_items:
+        return []
+    
+    print(f"🔍 Matching lost item '{lost_item.title}' against {len(found_items)} found items")
+    results = analyze_item_for_matching(lost_item.to_dict(), [item.to_dict() for item in found_items])
+    print(f"📊 Found {len(results)} potential matches")
+    
+    matches = []
+    for match_data in results:
+        match_score = match_data.get('match_score', 0)
+        found_item_idx = match_data.get('found_item_index')
+        if match_score >= 30 and found_item_idx is not None and found_item_idx < len(found_items):  # Lower threshold to 30% to catch more matches
+            matches.append({
+                'lost_item_id': lost_item.id,
+                'found_item_id': found_items[found_item_idx].id,
+                'confidence_score': match_score,
+                'match_reasons': json.dumps(match_data.get('match_reasons', []))
+            })
+    print(f"✅ {len(matches)} matches met the 30% confidence threshold")
+    return matches
+
+def build_matches_for_found_item(found_item):
+    """Score a new found item against active lost items; returns Match row values for insert_matches()"""
+    lost_items = LostItem.query.options(joinedload(LostItem.user)).filter_by(
+        school_id=found_item.school_id,
+        status='active'
+    ).all()
+    if not lost_items:
+        return []
+    
+    print(f"🔍 Matching found item '{found_item.title}' against {len(lost_items)} lost items")
+    found_item_dict = found_item.to_dict()
+    matches = []
+    for lost_item in lost_items:
+        results = analyze_item_for_matching(lost_item.to_dict(), [found_item_dict])
+        if results and results[0].get('match_score', 0) >= 30:  # Lower threshold to 30% to catch more matches
+            matches.append({
+                'lost_item_id': lost_item.id,
+                'found_item_id': found_item.id,
+                'confidence_score': results[0]['match_score'],
+                'match_reasons': json.dumps(results[0].get('match_reasons', []))
+            })
+    print(f"✅ {len(matches)} matches met the 30% confidence threshold")
+    return matches
+
 @items_bp.route('/lost', methods=['POST'])
 @jwt_required()
 def report_lost_item():
@@ -41,19 +105,26 @@ def report_lost_item():
         data = request.form
         photo = request.files.get('photo')
         
-        # Extract item details from photo if provided
-        item_details = {}
-        if photo:
-            photo_bytes = photo.read()
-            photo.seek(0)  # Reset for saving
-            details = extract_item_details_from_photo(photo_bytes)
-            item_details = details
-        
         # Save photo
         photo_url = None
+        photo_bytes = None
         if photo:
+            photo_bytes = photo.read()
+            photo.seek(0)  # Reset for saving
             photo_url = save_uploaded_file(photo, 'lost')
         
+        # One combined vision call per photo; verification evidence against this
+        # item's description is stored so a matching claim photo reuses it
+        item_details = {}
+        if photo_bytes:
+            analysis = get_photo_analysis(
+                photo_bytes,
+                photo_url,
+                data.get('description', ''),
+                data.get('verification_question', '')
+            )
+            item_details = analysis['extraction']
+        
         # Create lost item
         lost_item = LostItem(
             user_id=user_id,
@@ -74,44 +145,12 @@ def report_lost_item():
         )
         
         db.session.add(lost_item)
-        db.session.commit()
+        db.session.flush()  # Assign lost_item.id for matches and the reward
         
-        # Trigger matching
+        # Matching runs in the same transaction; a failure only drops the matches
         try:
-            found_items = FoundItem.query.filter_by(
-                school_id=user.school_id,
-                status='available'
-            ).all()
-            
-            if found_items:
-                found_items_dict = [item.to_dict() for item in found_items]
-                print(f"🔍 Matching lost item '{lost_item.title}' against {len(found_items)} found items")
-                matches = analyze_item_for_matching(lost_item.to_dict(), found_items_dict)
-                print(f"📊 Found {len(matches)} potential matches")
-                
-                # Create match records
-                matches_created = 0
-                for match_data in matches:
-                    match_score = match_data.get('match_score', 0)
-                    if match_score >= 30:  # Lower threshold to 30% to catch more matches
-                        found_item_idx = match_data.get('found_item_index')
-                        if found_item_idx is not None and found_item_idx < len(found_items):
-                            found_item = found_items[found_item_idx]
-                            match = Match(
-                                lost_item_id=lost_item.id,
-                                found_item_id=found_item.id,
-                                confidence_score=match_score,
-                                match_reasons=json.dumps(match_data.get('match_reasons', []))
-                            )
-                            db.session.add(match)
-                            matches_created += 1
-                            print(f"✅ Created match: {match_score}% confidence")
-                
-                if matches_created > 0:
-                    db.session.commit()
-                    print(f"✅ Saved {matches_created} matches to database")
-                else:
-                    print(f"⚠️  No matches met the 50% confidence threshold")
+            with db.session.begin_nested():
+                insert_matches(build_matches_for_lost_item(lost_item))
         except Exception as e:
             print(f"❌ Error in matching: {str(e)}")
             import traceback
@@ -119,7 +158,7 @@ def report_lost_item():
             # Don't fail the request if matching fails
         
         # Award points for reporting
-        reward = Reward(
+        award_points(
             user_id=user_id,
             school_id=user.school_id,
             points=10,
@@ -127,7 +166,8 @@ def report_lost_item():
             related_item_id=lost_item.id,
             related_type='lost'
         )
-        db.session.add(reward)
+        
+        # Item, matches and reward commit together
         db.session.commit()
         
         return jsonify({
@@ -153,19 +193,20 @@ def report_found_item():
         data = request.form
         photo = request.files.get('photo')
         
-        # Extract item details from photo if provided
-        item_details = {}
-        if photo:
-            photo_bytes = photo.read()
-            photo.seek(0)
-            details = extract_item_details_from_photo(photo_bytes)
-            item_details = details
-        
         # Save photo
         photo_url = None
+        photo_bytes = None
         if photo:
+            photo_bytes = photo.read()
+            photo.seek(0)  # Reset for saving
             photo_url = save_uploaded_file(photo, 'found')
         
+        # One combined vision call per photo, persisted for later reuse
+        item_details = {}
+        if photo_bytes:
+            analysis = get_photo_analysis(photo_bytes, photo_url)
+            item_details = analysis['extraction']
+        
         # Create found item
         found_item = FoundItem(
             user_id=user_id,
@@ -183,50 +224,19 @@ def report_found_item():
         )
         
         db.session.add(found_item)
-        db.session.commit()
+        db.session.flush()  # Assign found_item.id for matches and the reward
         
-        # Trigger AI matching with existing lost items
+        # Matching runs in the same transaction; a failure only drops the matches
         try:
-            lost_items = LostItem.query.filter_by(
-                school_id=user.school_id,
-                status='active'
-            ).all()
-            
-            if lost_items:
-                found_item_dict = found_item.to_dict()
-                print(f"🔍 Matching found item '{found_item.title}' against {len(lost_items)} lost items")
-                matches_created = 0
-                for lost_item in lost_items:
-                    matches = analyze_item_for_matching(
-                        lost_item.to_dict(),
-                        [found_item_dict]
-                    )
-                    
-                    if matches and len(matches) > 0:
-                        match_score = matches[0].get('match_score', 0)
-                        if match_score >= 30:  # Lower threshold to 30% to catch more matches
-                            match = Match(
-                                lost_item_id=lost_item.id,
-                                found_item_id=found_item.id,
-                                confidence_score=match_score,
-                                match_reasons=json.dumps(matches[0].get('match_reasons', []))
-                            )
-                            db.session.add(match)
-                            matches_created += 1
-                            print(f"✅ Created match: {match_score}% confidence for '{lost_item.title}'")
-                
-                if matches_created > 0:
-                    db.session.commit()
-                    print(f"✅ Saved {matches_created} matches to database")
-                else:
-                    print(f"⚠️  No matches met the 30% confidence threshold")
+            with db.session.begin_nested():
+                insert_matches(build_matches_for_found_item(found_item))
         except Exception as e:
             print(f"❌ Error in AI matching: {str(e)}")
             import traceback
             traceback.print_exc()
         
         # Award points
-        reward = Reward(
+        award_points(
             user_id=user_id,
             school_id=user.school_id,
             points=15,
@@ -234,7 +244,8 @@ def report_found_item():
             related_item_id=found_item.id,
             related_type='found'
         )
-        db.session.add(reward)
+        
+        # Item, matches and reward commit together
         db.session.commit()
         
         return jsonify({
@@ -248,6 +259,7 @@ def report_found_item():
 
 @items_bp.route('/lost', methods=['GET'])
 @jwt_required()
+@read_only
 def get_lost_items():
     """Get lost items for user's school"""
     try:
@@ -257,9 +269,32 @@ def get_lost_items():
         if not user or not user.school_id:
             return jsonify({'error': 'You must be in a school'}), 400
         
-        items = LostItem.query.filter_by(school_id=user.school_id).order_by(LostItem.created_at.desc()).all()
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = LostItem.query.options(joinedload(LostItem.user)).filter_by(school_id=user.school_id)
+        filters = {'school_id': user.school_id}
+        if request.args.get('mine', '').lower() in ('1', 'true', 'yes'):
+            query = query.filter(LostItem.user_id == user_id)
+            filters['user_id'] = user_id
+        if request.args.get('status'):
+            query = query.filter(LostItem.status == request.args['status'])
+            filters['status'] = request.args['status']
+        if request.args.get('category'):
+            query = query.filter(LostItem.category == request.args['category'])
+            filters['category'] = request.args['category']
+        
+        if include_archived_requested(request):
+            items, next_cursor = paginate_with_archive(query, LostItem, limit, cursor, **filters)
+            users = load_users(items)
+        else:
+            items, next_cursor = paginate(query, LostItem, limit, cursor)
+            users = None
         return jsonify({
-            'items': [item.to_dict() for item in items]
+            'items': [item.to_dict(users) for item in items],
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -288,11 +323,15 @@ def delete_lost_item(item_id):
         Match.query.filter_by(lost_item_id=item_id).delete()
         
         # Delete associated claims
+        claim_ids = [row.id for row in db.session.query(Claim.id).filter_by(lost_item_id=item_id).all()]
+        if claim_ids:
+            UnreadCount.query.filter(UnreadCount.claim_id.in_(claim_ids)).delete(synchronize_session=False)
         Claim.query.filter_by(lost_item_id=item_id).delete()
         
         # Delete the item
         db.session.delete(lost_item)
         db.session.commit()
+        invalidate_participants(*claim_ids)
         
         return jsonify({'message': 'Lost item deleted successfully'}), 200
         
@@ -302,6 +341,7 @@ def delete_lost_item(item_id):
 
 @items_bp.route('/found', methods=['GET'])
 @jwt_required()
+@read_only
 def get_found_items():
     """Get found items for user's school"""
     try:
@@ -311,9 +351,70 @@ def get_found_items():
         if not user or not user.school_id:
             return jsonify({'error': 'You must be in a school'}), 400
         
-        items = FoundItem.query.filter_by(school_id=user.school_id).order_by(FoundItem.created_at.desc()).all()
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = FoundItem.query.options(joinedload(FoundItem.user)).filter_by(school_id=user.school_id)
+        filters = {'school_id': user.school_id}
+        if request.args.get('status'):
+            query = query.filter(FoundItem.status == request.args['status'])
+            filters['status'] = request.args['status']
+        if request.args.get('category'):
+            query = query.filter(FoundItem.category == request.args['category'])
+            filters['category'] = request.args['category']
+        
+        if include_archived_requested(request):
+            items, next_cursor = paginate_with_archive(query, FoundItem, limit, cursor, **filters)
+            users = load_users(items)
+        else:
+            items, next_cursor = paginate(query, FoundItem, limit, cursor)
+            users = None
+        return jsonify({
+            'items': [item.to_dict(users) for item in items],
+            'next_cursor': next_cursor
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@items_bp.route('/search', methods=['GET'])
+@jwt_required()
+@read_only
+def search():
+    """Full-text search over lost and found items in user's school"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        if not user or not user.school_id:
+            return jsonify({'error': 'You must be in a school'}), 400
+        
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'error': 'Search query is required'}), 400
+        
+        item_type = request.args.get('type')
+        if item_type and item_type not in ('lost', 'found'):
+            return jsonify({'error': "type must be 'lost' or 'found'"}), 400
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit', 20)), 100))
+            offset = int(request.args.get('cursor') or 0)
+        except ValueError:
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        
+        results, has_more = search_items(
+            user.school_id, q,
+            item_type=item_type,
+            status=request.args.get('status'),
+            limit=limit,
+            offset=offset
+        )
         return jsonify({
-            'items': [item.to_dict() for item in items]
+            'results': results,
+            'next_cursor': str(offset + limit) if has_more else None
         }), 200
         
     except Exception as e:
@@ -321,6 +422,7 @@ def get_found_items():
 
 @items_bp.route('/matches', methods=['GET'])
 @jwt_required()
+@read_only
 def get_matches():
     """Get AI matches for user"""
     try:
@@ -330,17 +432,51 @@ def get_matches():
         if not user or not user.school_id:
             return jsonify({'error': 'You must be in a school'}), 400
         
+        try:
+            limit, cursor = get_page_args(numeric=True)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Get matches for user's lost items
-        lost_items = LostItem.query.filter_by(user_id=user_id).all()
-        lost_item_ids = [item.id for item in lost_items]
+        user_lost_item_ids = db.session.query(LostItem.id).filter(LostItem.user_id == user_id)
+        query = Match.query.filter(Match.lost_item_id.in_(user_lost_item_ids))
+        if request.args.get('status'):
+            query = query.filter(Match.status == request.args['status'])
+        else:
+            query = query.filter(Match.status.in_(['pending', 'viewed']))
+        
+        # Best matches first
+        matches, next_cursor = paginate(query, Match, limit, cursor, sort_column=Match.confidence_score)
+        return jsonify({
+            'matches': serialize_matches(matches),
+            'next_cursor': next_cursor
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@items_bp.route('/stats', methods=['GET'])
+@jwt_required()
+@read_only
+def get_stats():
+    """Dashboard counts for the user, without loading the listings"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
         
-        matches = Match.query.filter(
-            Match.lost_item_id.in_(lost_item_ids),
-            Match.status.in_(['pending', 'viewed'])
-        ).order_by(Match.confidence_score.desc()).all()
+        if not user or not user.school_id:
+            return jsonify({'error': 'You must be in a school'}), 400
         
+        user_lost_item_ids = db.session.query(LostItem.id).filter(LostItem.user_id == user_id)
         return jsonify({
-            'matches': [match.to_dict() for match in matches]
+            'lost_items': LostItem.query.filter_by(school_id=user.school_id, user_id=user_id).count(),
+            'found_items': FoundItem.query.filter_by(school_id=user.school_id, status='available').count(),
+            'my_claims': Claim.query.filter_by(claimant_id=user_id).count(),
+            'matches': Match.query.filter(
+                Match.lost_item_id.in_(user_lost_item_ids),
+                Match.status.in_(['pending', 'viewed'])
+            ).count(),
+            'qr_codes': QRCode.query.filter_by(user_id=user_id).count()
         }), 200
         
     except Exception as e:
@@ -1,7 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Claim, Message, LostItem, FoundItem
+from models import db, User, Claim, Message, FoundItem, ARCHIVE_TABLES, from_archive, load_archived, serialize_messages
 from datetime import datetime
+from services.db_routing import read_only
+from services.pagination import get_limit
+from services.archive import include_archived_requested
+from services.message_bus import subscribe, unsubscribe, publish
+from services.unread import increment_unread, mark_claim_read, get_unread_counts
+from services.claim_participants import get_participants
+from config import Config
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+import json
+import time
 
 messages_bp = Blueprint('messages', __name__)
 
@@ -19,21 +29,20 @@ def send_message():
         if not content:
             return jsonify({'error': 'Message content is required'}), 400
         
-        claim = Claim.query.get(claim_id)
-        if not claim:
+        try:
+            claim_id = int(claim_id)
+        except (TypeError, ValueError):
             return jsonify({'error': 'Claim not found'}), 404
         
-        # Determine receiver (opposite party)
-        lost_item = LostItem.query.get(claim.lost_item_id)
-        found_item = FoundItem.query.get(claim.found_item_id)
-        
-        if not lost_item or not found_item:
-            return jsonify({'error': 'Related items not found'}), 404
+        participants = get_participants(claim_id)
+        if not participants:
+            return jsonify({'error': 'Claim not found'}), 404
         
-        if user_id == claim.claimant_id:
-            receiver_id = found_item.user_id
-        elif user_id == found_item.user_id:
-            receiver_id = claim.claimant_id
+        # Determine receiver (opposite party)
+        if user_id == participants.claimant_id:
+            receiver_id = participants.finder_id
+        elif user_id == participants.finder_id:
+            receiver_id = participants.claimant_id
         else:
             return jsonify({'error': 'Unauthorized'}), 403
         
@@ -46,50 +55,235 @@ def send_message():
         )
         
         db.session.add(message)
+        increment_unread(receiver_id, claim_id)
         db.session.commit()
         
+        message_data = serialize_messages([message])[0]
+        publish(claim_id, message_data)
+        
         return jsonify({
             'message': 'Message sent successfully',
-            'message_data': message.to_dict()
+            'message_data': message_data
         }), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _get_archived_messages(user_id, claim_id):
+    """Full history of an archived claim; archived conversations are read-only"""
+    claim = load_archived(Claim, [claim_id]).get(claim_id)
+    if not claim:
+        return jsonify({'error': 'Claim not found'}), 404
+    
+    found_item = FoundItem.query.get(claim.found_item_id)
+    found_item = found_item or load_archived(FoundItem, [claim.found_item_id]).get(claim.found_item_id)
+    if not found_item:
+        return jsonify({'error': 'Related items not found'}), 404
+    
+    if user_id not in [claim.claimant_id, found_item.user_id]:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    table = ARCHIVE_TABLES[Message]
+    rows = db.session.execute(
+        db.select(table).where(table.c.claim_id == claim_id).order_by(table.c.created_at.asc())
+    )
+    messages = [from_archive(Message, row) for row in rows]
+    return jsonify({
+        'messages': serialize_messages(messages),
+        'archived': True
+    }), 200
+
 @messages_bp.route('/claim/<int:claim_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_messages(claim_id):
     """Get messages for a claim"""
     try:
         user_id = int(get_jwt_identity())
         
-        claim = Claim.query.get(claim_id)
-        if not claim:
+        participants = get_participants(claim_id)
+        if not participants and include_archived_requested(request):
+            return _get_archived_messages(user_id, claim_id)
+        if not participants:
             return jsonify({'error': 'Claim not found'}), 404
         
         # Check authorization
-        lost_item = LostItem.query.get(claim.lost_item_id)
-        found_item = FoundItem.query.get(claim.found_item_id)
+        if user_id not in [participants.claimant_id, participants.finder_id]:
+            return jsonify({'error': 'Unauthorized'}), 403
         
-        if not lost_item or not found_item:
-            return jsonify({'error': 'Related items not found'}), 404
+        # after_id: newer messages (polling); before_id: an older page; neither: the latest page
+        try:
+            limit = get_limit()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        try:
+            after_id = int(request.args['after_id']) if request.args.get('after_id') else None
+            before_id = int(request.args['before_id']) if request.args.get('before_id') else None
+        except ValueError:
+            return jsonify({'error': 'after_id and before_id must be integers'}), 400
         
-        if user_id not in [claim.claimant_id, found_item.user_id]:
-            return jsonify({'error': 'Unauthorized'}), 403
+        query = Message.query.filter(Message.claim_id == claim_id)
+        if after_id is not None:
+            messages = query.filter(Message.id > after_id).order_by(Message.id.asc()).limit(limit + 1).all()
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+        else:
+            if before_id is not None:
+                query = query.filter(Message.id < before_id)
+            messages = query.order_by(Message.id.desc()).limit(limit + 1).all()
+            has_more = len(messages) > limit
+            messages = list(reversed(messages[:limit]))
         
-        messages = Message.query.filter_by(claim_id=claim_id).order_by(Message.created_at.asc()).all()
+        data = serialize_messages(messages)
         
         # Mark as read
-        for msg in messages:
-            if msg.receiver_id == user_id and not msg.is_read:
-                msg.is_read = True
+        if mark_claim_read(user_id, claim_id):
+            for message in data:
+                if message['receiver_id'] == user_id:
+                    message['is_read'] = True
         
-        db.session.commit()
+        return jsonify({
+            'messages': data,
+            'has_more': has_more
+        }), 200
         
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@messages_bp.route('/claim/<int:claim_id>/read', methods=['POST'])
+@jwt_required()
+def mark_read(claim_id):
+    """Mark the user's received messages in a claim as read (e.g. ones delivered over the stream)"""
+    try:
+        user_id = int(get_jwt_identity())
+        marked = mark_claim_read(user_id, claim_id)
+        return jsonify({'marked': marked}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@messages_bp.route('/unread-counts', methods=['GET'])
+@jwt_required()
+@read_only
+def unread_counts():
+    """Unread message counts per claim and in total"""
+    try:
+        user_id = int(get_jwt_identity())
+        counts = get_unread_counts(user_id)
         return jsonify({
-            'messages': [msg.to_dict() for msg in messages]
+            'claims': {str(claim_id): count for claim_id, count in counts.items()},
+            'total': sum(counts.values())
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+def _sse_event(message):
+    return f"id: {message['id']}\nevent: message\ndata: {json.dumps(message)}\n\n"
+
+def _stream_tokens():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='message-stream')
+
+def _messages_after(claim_id, after_id):
+    """Serialized messages in a claim newer than after_id, oldest first"""
+    try:
+        rows = Message.query.filter(
+            Message.claim_id == claim_id, Message.id > after_id
+        ).order_by(Message.id.asc()).all()
+        return serialize_messages(rows)
+    finally:
+        db.session.close()  # Don't hold a pooled connection while the stream idles
+
+@messages_bp.route('/claim/<int:claim_id>/stream-token', methods=['POST'])
+@jwt_required()
+def create_stream_token(claim_id):
+    """
+    Short-lived token for opening one claim's message stream. EventSource can't
+    set headers, so the stream takes this in the URL instead of the access token.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        
+        participants = get_participants(claim_id)
+        if not participants:
+            return jsonify({'error': 'Claim not found'}), 404
+        
+        if user_id not in [participants.claimant_id, participants.finder_id]:
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        token = _stream_tokens().dumps({'user_id': user_id, 'claim_id': claim_id})
+        return jsonify({'token': token, 'expires_in': Config.SSE_TOKEN_SECONDS}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@messages_bp.route('/claim/<int:claim_id>/stream', methods=['GET'])
+def stream_messages(claim_id):
+    """Server-Sent Events stream of new messages in a claim chat, opened with ?token= from stream-token"""
+    try:
+        try:
+            grant = _stream_tokens().loads(request.args.get('token', ''), max_age=Config.SSE_TOKEN_SECONDS)
+        except BadSignature:
+            return jsonify({'error': 'Invalid or expired stream token'}), 401
+        if grant.get('claim_id') != claim_id:
+            return jsonify({'error': 'Stream token is for another claim'}), 403
+        user_id = grant['user_id']
+        
+        participants = get_participants(claim_id)
+        if not participants:
+            return jsonify({'error': 'Claim not found'}), 404
+        
+        if user_id not in [participants.claimant_id, participants.finder_id]:
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        # Resume point: EventSource sends Last-Event-ID on reconnect, first connects pass after_id
+        resume = request.headers.get('Last-Event-ID') or request.args.get('after_id')
+        try:
+            after_id = int(resume) if resume else None
+        except ValueError:
+            return jsonify({'error': 'after_id must be an integer'}), 400
+        
+        if after_id is None:
+            # Only messages sent from now on
+            after_id = db.session.query(db.func.max(Message.id)).filter(Message.claim_id == claim_id).scalar() or 0
+        
+        # Messages are read from the database after subscribing, so nothing sent in between is missed
+        subscription = subscribe(claim_id)
+        if subscription is None:
+            return jsonify({'error': 'Too many open message streams, try again shortly'}), 503
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def events():
+        try:
+            yield f"retry: {Config.SSE_RETRY_MS}\n\n"
+            last_id = after_id
+            for message in _messages_after(claim_id, after_id):
+                last_id = message['id']
+                yield _sse_event(message)
+            
+            # From here on the stream only waits on the bus, which carries messages
+            # sent through every worker (see services/message_bus.py); a message
+            # can arrive twice (e.g. from the poller too), so ids already sent are skipped
+            deadline = time.time() + Config.SSE_MAX_STREAM_SECONDS
+            while not subscription.dropped:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                message = subscription.get(timeout=min(Config.SSE_KEEPALIVE_SECONDS, remaining))
+                if message is None:
+                    yield ": keepalive\n\n"
+                elif message['id'] > last_id:
+                    last_id = message['id']
+                    yield _sse_event(message)
+            # Ending the stream makes the client reconnect from the last id
+        finally:
+            unsubscribe(subscription)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+    })
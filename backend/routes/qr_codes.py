@@ -1,12 +1,19 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, LostItem, QRCode, ContactMessage
+from models import db, User, LostItem, QRCode, ContactMessage, qr_code_pool
 from config import Config
+from services.pagination import get_page_args, paginate
+from sqlalchemy.orm import joinedload
 from datetime import datetime
-import qrcode
-import io
 import secrets
 import string
+from services.db_routing import read_only
+from services.code_pool import commit_with_code
+from services.qr_render import qr_target_url, normalize_variant, variant_key, get_rendered, render_many, FORMATS
+from services.qr_sheets import build_sheet, SHEET_FORMATS, QR_SIZE
+from services.qr_lookup import get_public_qr
+from services.rate_limit import rate_limited, claim_first_send, release_send, client_ip
+import io
 
 qr_bp = Blueprint('qr_codes', __name__)
 
@@ -25,49 +32,22 @@ def create_qr_code():
         lost_item_id = data.get('lost_item_id')  # Optional
         contact_info = data.get('contact_info', '')  # Optional contact info
         
-        # Generate unique code
-        code = QRCode.generate_code()
-        
-        # Create QR code
+        # Create QR code; the image is rendered on demand by get_qr_image
         qr_code = QRCode(
             user_id=user_id,
             lost_item_id=lost_item_id if lost_item_id else None,
-            code=code,
             contact_info=contact_info
         )
         
-        db.session.add(qr_code)
-        db.session.commit()
+        def assign_code(code):
+            qr_code.code = code
+            qr_code.qr_image_url = f"/api/qr-codes/image/{code}"
+            db.session.add(qr_code)
         
-        # Generate QR code image
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        # QR code links to frontend page
-        # Use request.host_url and replace port 5000 with frontend port (5173 for Vite dev)
-        # In production, use the configured frontend URL
-        base_url = request.host_url.rstrip('/')
-        # Replace backend port with frontend port for local dev
-        if 'localhost:5000' in base_url:
-            frontend_url = base_url.replace(':5000', ':5173')
-        else:
-            # In production, use the configured frontend URL
-            frontend_url = Config.FRONTEND_URL.rstrip('/')
-        qr_url = f"{frontend_url}/qr/{code}"
-        qr.add_data(qr_url)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Save QR code image
-        from werkzeug.utils import secure_filename
-        import os
-        filename = f"{code}_qr.png"
-        upload_path = os.path.join('instance', 'qr_codes')
-        os.makedirs(upload_path, exist_ok=True)
-        filepath = os.path.join(upload_path, filename)
-        img.save(filepath)
-        
-        qr_code.qr_image_url = f"/uploads/qr_codes/{filename}"
-        db.session.commit()
+        # Pooled codes are pre-checked; the unique constraint settles any race
+        commit_with_code(db, qr_code_pool, assign_code)
+        
+        qr_url = qr_target_url(qr_code.code, request.host_url)
         
         return jsonify({
             'message': 'QR code created successfully',
@@ -82,17 +62,87 @@ def create_qr_code():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@qr_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_qr_code_batch():
+    """Create many QR codes at once and return them as a printable sheet (PDF or PNG)"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json() or {}
+        contact_info = data.get('contact_info', '')  # Optional contact info
+        sheet_format = (data.get('format') or 'pdf').lower()
+        if sheet_format not in SHEET_FORMATS:
+            return jsonify({'error': 'format must be pdf or png'}), 400
+        try:
+            count = int(data.get('count', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'count must be an integer'}), 400
+        if not 1 <= count <= Config.QR_BATCH_MAX_CODES:
+            return jsonify({'error': f'count must be between 1 and {Config.QR_BATCH_MAX_CODES}'}), 400
+        
+        # Allocate every code in one transaction
+        allocated = []
+        
+        def insert_codes(codes):
+            now = datetime.utcnow()
+            db.session.execute(db.insert(QRCode), [
+                {
+                    'user_id': user_id,
+                    'code': code,
+                    'qr_image_url': f"/api/qr-codes/image/{code}",
+                    'contact_info': contact_info,
+                    'created_at': now
+                }
+                for code in codes
+            ])
+            allocated[:] = codes
+        
+        commit_with_code(db, qr_code_pool, insert_codes, count=count)
+        codes = allocated
+        
+        qr_pngs = render_many([qr_target_url(code, request.host_url) for code in codes], QR_SIZE)
+        sheet = build_sheet(qr_pngs, codes, sheet_format)
+        
+        return send_file(
+            io.BytesIO(sheet),
+            mimetype=SHEET_FORMATS[sheet_format],
+            as_attachment=True,
+            download_name=f"reunite-qr-codes.{sheet_format}"
+        )
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error creating QR code batch: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
 @qr_bp.route('/my-codes', methods=['GET'])
 @jwt_required()
+@read_only
 def get_my_qr_codes():
     """Get user's QR codes"""
     try:
         user_id = int(get_jwt_identity())
         
-        qr_codes = QRCode.query.filter_by(user_id=user_id).order_by(QRCode.created_at.desc()).all()
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
+        query = QRCode.query.options(
+            joinedload(QRCode.lost_item).joinedload(LostItem.user)
+        ).filter_by(user_id=user_id)
+        
+        qr_codes, next_cursor = paginate(query, QRCode, limit, cursor)
         return jsonify({
-            'qr_codes': [qr.to_dict() for qr in qr_codes]
+            'qr_codes': [qr.to_dict() for qr in qr_codes],
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -100,6 +150,7 @@ def get_my_qr_codes():
 
 @qr_bp.route('/contact-messages', methods=['GET'])
 @jwt_required()
+@read_only
 def get_contact_messages():
     """Get contact messages for user's QR codes"""
     try:
@@ -125,21 +176,17 @@ def get_contact_messages():
         return jsonify({'error': str(e)}), 500
 
 @qr_bp.route('/<code>', methods=['GET'])
+@rate_limited('qr_info')
+@read_only
 def get_qr_info(code):
     """Public endpoint - Get info when QR code is scanned"""
     try:
-        qr = QRCode.query.filter_by(code=code).first()
-        if not qr:
+        info = get_public_qr(code)
+        if info is None:
             return jsonify({'error': 'Invalid QR code'}), 404
         
-        user = User.query.get(qr.user_id)
-        lost_item = LostItem.query.get(qr.lost_item_id) if qr.lost_item_id else None
-        
         return jsonify({
-            'code': qr.code,
-            'owner_name': f"{user.first_name} {user.last_name}" if user else "Unknown",
-            'contact_info': qr.contact_info,
-            'lost_item': lost_item.to_dict() if lost_item else None,
+            **info,
             'message': 'This item belongs to someone. Please contact them to return it.'
         }), 200
         
@@ -147,8 +194,10 @@ def get_qr_info(code):
         return jsonify({'error': str(e)}), 500
 
 @qr_bp.route('/<code>/contact', methods=['POST'])
+@rate_limited('qr_contact')
 def contact_qr_owner(code):
     """Public endpoint - Send a message to QR code owner"""
+    dedupe_key = None
     try:
         data = request.get_json()
         finder_name = data.get('finder_name', 'Someone')
@@ -158,8 +207,17 @@ def contact_qr_owner(code):
         if not message:
             return jsonify({'error': 'Message is required'}), 400
         
+        # A resubmitted message (double click, client retry) was already delivered
+        first_send, dedupe_key = claim_first_send(code, client_ip(), finder_email, message.strip())
+        if not first_send:
+            return jsonify({
+                'message': 'Your message has been sent! The owner will be notified.',
+                'success': True
+            }), 200
+        
         qr = QRCode.query.filter_by(code=code).first()
         if not qr:
+            release_send(dedupe_key)
             return jsonify({'error': 'Invalid QR code'}), 404
         
         # Create a contact message to notify the QR code owner
@@ -180,20 +238,33 @@ def contact_qr_owner(code):
         }), 200
         
     except Exception as e:
+        release_send(dedupe_key)
         return jsonify({'error': str(e)}), 500
 
 @qr_bp.route('/image/<code>', methods=['GET'])
+@read_only
 def get_qr_image(code):
-    """Get QR code image"""
+    """Get QR code image (?size=<pixels>&format=png|svg)"""
     try:
-        qr = QRCode.query.filter_by(code=code).first()
-        if not qr or not qr.qr_image_url:
-            return jsonify({'error': 'QR code image not found'}), 404
+        try:
+            size, fmt = normalize_variant(request.args.get('size'), request.args.get('format'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        qr_url = qr_target_url(code, request.host_url)
+        etag = variant_key(qr_url, size, fmt)
+        # Rendered variants never change, so revalidation needs no DB or render work
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            if not db.session.query(QRCode.id).filter_by(code=code).first():
+                return jsonify({'error': 'QR code image not found'}), 404
+            content, etag = get_rendered(qr_url, size, fmt)
+            response = Response(content, mimetype=FORMATS[fmt])
         
-        from flask import send_from_directory
-        import os
-        filename = os.path.basename(qr.qr_image_url)
-        return send_from_directory(os.path.join('instance', 'qr_codes'), filename)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -212,8 +283,8 @@ def delete_qr_code(qr_id):
         if qr.user_id != user_id:
             return jsonify({'error': 'You can only delete your own QR codes'}), 403
         
-        # Delete the QR code image file if it exists
-        if qr.qr_image_url:
+        # Delete the QR code image file saved by older versions, if it exists
+        if qr.qr_image_url and qr.qr_image_url.startswith('/uploads/'):
             try:
                 import os
                 filename = os.path.basename(qr.qr_image_url)
@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Reward
-from sqlalchemy import func
+from models import User, Reward
+from services.points import get_total_points, get_leaderboard as get_school_leaderboard
+from services.db_routing import read_only
 
 rewards_bp = Blueprint('rewards', __name__)
 
 @rewards_bp.route('/my-points', methods=['GET'])
 @jwt_required()
+@read_only
 def get_my_points():
     """Get user's total points and reward history"""
     try:
@@ -16,11 +18,8 @@ def get_my_points():
         if not user or not user.school_id:
             return jsonify({'error': 'You must be in a school'}), 400
         
-        # Get total points
-        total_points = db.session.query(func.sum(Reward.points)).filter_by(
-            user_id=user_id,
-            school_id=user.school_id
-        ).scalar() or 0
+        # Get total points from the running total
+        total_points = get_total_points(user_id, user.school_id)
         
         # Get recent rewards
         rewards = Reward.query.filter_by(
@@ -38,6 +37,7 @@ def get_my_points():
 
 @rewards_bp.route('/leaderboard', methods=['GET'])
 @jwt_required()
+@read_only
 def get_leaderboard():
     """Get school leaderboard"""
     try:
@@ -47,28 +47,15 @@ def get_leaderboard():
         if not user or not user.school_id:
             return jsonify({'error': 'You must be in a school'}), 400
         
-        # Get top users by points
-        top_users = db.session.query(
-            User.id,
-            User.first_name,
-            User.last_name,
-            func.sum(Reward.points).label('total_points')
-        ).join(
-            Reward, User.id == Reward.user_id
-        ).filter(
-            Reward.school_id == user.school_id
-        ).group_by(
-            User.id, User.first_name, User.last_name
-        ).order_by(
-            func.sum(Reward.points).desc()
-        ).limit(10).all()
+        # Get top users by points (served from the in-memory top-N)
+        top_users = get_school_leaderboard(user.school_id)
         
         leaderboard = []
-        for rank, (uid, first, last, points) in enumerate(top_users, 1):
+        for rank, (uid, name, points) in enumerate(top_users, 1):
             leaderboard.append({
                 'rank': rank,
                 'user_id': uid,
-                'name': f"{first} {last}",
+                'name': name,
                 'points': int(points) if points else 0
             })
         
@@ -36,6 +36,7 @@ def join_school():
         
         # Join the school
         user.school_id = school.id
+        School.adjust_member_count(school.id, 1)
         db.session.commit()
         
         return jsonify({
@@ -85,6 +86,7 @@ def leave_school():
         if not user.school_id:
             return jsonify({'error': 'You are not a member of any school'}), 400
         
+        School.adjust_member_count(user.school_id, -1)
         user.school_id = None
         db.session.commit()
         
@@ -0,0 +1,139 @@
+from models import db, LostItem, FoundItem, Match, Claim, Message, QRCode, User, UnreadCount, ARCHIVE_TABLES, from_archive
+from services.pagination import encode_cursor, paginate
+from services.claim_participants import invalidate_participants
+from services.qr_lookup import invalidate_qr
+from sqlalchemy import and_, or_, select, literal, DateTime
+from datetime import datetime, timedelta
+import threading
+import time
+
+# Statuses after which an item no longer changes
+TERMINAL_STATUSES = {
+    LostItem: ('found', 'closed'),
+    FoundItem: ('claimed', 'returned'),
+}
+ITEM_FOREIGN_KEYS = {
+    LostItem: (Match.lost_item_id, Claim.lost_item_id),
+    FoundItem: (Match.found_item_id, Claim.found_item_id),
+}
+BATCH_PAUSE_SECONDS = 0.05  # Let other writers in between batches
+
+def _move(model, condition, archived_at):
+    """Copy matching rows into the model's archive table, then delete them from the hot table"""
+    table = model.__table__
+    archive = ARCHIVE_TABLES[model]
+    names = [c.name for c in table.columns] + ['archived_at']
+    rows = select(*table.columns, literal(archived_at, DateTime)).where(condition)
+    db.session.execute(archive.insert().from_select(names, rows))
+    return db.session.execute(table.delete().where(condition)).rowcount
+
+def _eligible_ids(model, cutoff, batch_size):
+    # updated_at is bumped by every status change, so it dates the close
+    query = db.session.query(model.id).filter(
+        model.status.in_(TERMINAL_STATUSES[model]),
+        model.updated_at < cutoff
+    )
+    if model is LostItem:
+        # QR codes keep pointing at their lost item, so those stay hot
+        linked = db.session.query(QRCode.lost_item_id).filter(QRCode.lost_item_id.isnot(None))
+        query = query.filter(~LostItem.id.in_(linked))
+    return [row.id for row in query.order_by(model.id).limit(batch_size).all()]
+
+def archive_batch(model, cutoff, batch_size):
+    """
+    Move one batch of items closed before `cutoff`, with their matches,
+    claims and claim messages, in a single transaction. Returns items moved.
+    """
+    ids = _eligible_ids(model, cutoff, batch_size)
+    if not ids:
+        return 0
+    try:
+        match_fk, claim_fk = ITEM_FOREIGN_KEYS[model]
+        claim_ids = [row.id for row in db.session.query(Claim.id).filter(claim_fk.in_(ids)).all()]
+        now = datetime.utcnow()
+        # Children first so foreign keys hold at every step
+        if claim_ids:
+            db.session.execute(UnreadCount.__table__.delete().where(UnreadCount.claim_id.in_(claim_ids)))
+            _move(Message, Message.claim_id.in_(claim_ids), now)
+            _move(Claim, Claim.id.in_(claim_ids), now)
+        _move(Match, match_fk.in_(ids), now)
+        moved = _move(model, model.id.in_(ids), now)
+        db.session.commit()
+        invalidate_participants(*claim_ids)
+        if model is LostItem:
+            # Bulk deletes skip the ORM events that normally invalidate scanned QR payloads
+            invalidate_qr(lost_item_ids=ids)
+        return moved
+    except Exception:
+        db.session.rollback()
+        raise
+
+def archive_closed_items(retention_days, batch_size=500, max_batches=None):
+    """Archive lost and found items closed longer ago than the retention window, batch by batch"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    totals = {}
+    for model in (LostItem, FoundItem):
+        totals[model.__tablename__] = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = archive_batch(model, cutoff, batch_size)
+            totals[model.__tablename__] += moved
+            batches += 1
+            if moved < batch_size:
+                break
+            time.sleep(BATCH_PAUSE_SECONDS)
+    return totals
+
+def start_archiver(app):
+    """Run archive_closed_items every ARCHIVE_INTERVAL_HOURS in a daemon thread (0 disables)"""
+    interval = app.config.get('ARCHIVE_INTERVAL_HOURS') or 0
+    if interval <= 0 or app.testing:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval * 3600)
+            try:
+                with app.app_context():
+                    totals = archive_closed_items(
+                        app.config['ARCHIVE_RETENTION_DAYS'],
+                        app.config['ARCHIVE_BATCH_SIZE']
+                    )
+                    print(f"🗄️ Archived closed items: {totals}")
+            except Exception as e:
+                print(f"⚠️ Archiving failed: {e}")
+
+    thread = threading.Thread(target=run, name='archiver', daemon=True)
+    thread.start()
+    return thread
+
+def include_archived_requested(request):
+    return request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+def paginate_with_archive(query, model, limit, cursor=None, **filters):
+    """
+    Like paginate(), but merges in archived rows matching `filters` (column=value).
+    Archived rows come back as read-only instances of `model`.
+    """
+    rows, hot_cursor = paginate(query, model, limit, cursor)
+
+    table = ARCHIVE_TABLES[model]
+    archived = select(table).where(*[table.c[name] == value for name, value in filters.items()])
+    if cursor:
+        created_at, row_id = cursor
+        archived = archived.where(or_(
+            table.c.created_at < created_at,
+            and_(table.c.created_at == created_at, table.c.id < row_id)
+        ))
+    archived = archived.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit + 1)
+    archived_rows = [from_archive(model, row) for row in db.session.execute(archived)]
+
+    merged = sorted(rows + archived_rows, key=lambda row: (row.created_at, row.id), reverse=True)
+    has_more = hot_cursor is not None or len(merged) > limit
+    merged = merged[:limit]
+    return merged, encode_cursor(merged[-1]) if has_more and merged else None
+
+def load_users(rows):
+    """{user_id: User} for the owners of `rows`, in one query"""
+    ids = {row.user_id for row in rows}
+    return {user.id: user for user in User.query.filter(User.id.in_(ids)).all()} if ids else {}
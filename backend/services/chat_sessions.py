@@ -0,0 +1,122 @@
+from config import Config
+import secrets
+import threading
+import time
+
+# System prompt pinned to the front of every chat request
+SYSTEM_PROMPT = """You are a helpful AI assistant for Reunite, a lost and found platform.
+You help users with:
+- Finding lost items
+- Reporting found items
+- Understanding how to use the platform
+- Answering questions about lost and found processes
+- Providing tips for better item recovery
+
+Be friendly, concise, and helpful. If you don't know something specific about the user's account, suggest they check their dashboard."""
+
+TOKEN_BUDGET = Config.CHAT_TOKEN_BUDGET
+SUMMARY_BUDGET = Config.CHAT_SUMMARY_BUDGET
+SESSION_TTL = Config.CHAT_SESSION_TTL
+MAX_SESSIONS = Config.CHAT_MAX_SESSIONS
+
+_sessions = {}
+_lock = threading.Lock()
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token)"""
+    return len(text or '') // 4 + 1
+
+class ChatSession:
+    """Server-side conversation state for one user's chat"""
+
+    def __init__(self, session_id, user_id):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.summary = ''
+        self.turns = []  # List of {role, content}
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+
+    def add_turn(self, role, content):
+        self.turns.append({'role': role, 'content': content})
+        self.updated_at = time.time()
+        self.compact()
+
+    def compact(self, reserve=0):
+        """Fold the oldest turns into the summary until the history plus `reserve` tokens fits the budget"""
+        available = TOKEN_BUDGET - reserve - estimate_tokens(SYSTEM_PROMPT) - estimate_tokens(self.summary)
+        # Always keep the most recent turn (or the pending one), even if it alone exceeds the budget
+        keep = 0 if reserve else 1
+        while len(self.turns) > keep and sum(estimate_tokens(t['content']) for t in self.turns) > available:
+            dropped = self.turns.pop(0)
+            self.summary = _summarize(self.summary, dropped)
+            available = TOKEN_BUDGET - reserve - estimate_tokens(SYSTEM_PROMPT) - estimate_tokens(self.summary)
+
+    def build_messages(self, pending=None):
+        """
+        Messages array for Ollama: pinned system prompt, summary, recent turns,
+        then the `pending` user message, which isn't recorded until it gets a reply.
+        """
+        if pending:
+            self.compact(reserve=estimate_tokens(pending))
+        system_content = SYSTEM_PROMPT
+        if self.summary:
+            system_content += '\n\nEarlier in this conversation:\n' + self.summary
+        messages = [{'role': 'system', 'content': system_content}] + list(self.turns)
+        if pending:
+            messages.append({'role': 'user', 'content': pending})
+        return messages
+
+def _summarize(summary, turn):
+    """Append a one-line gist of a dropped turn, keeping only the newest lines within budget"""
+    speaker = 'User' if turn['role'] == 'user' else 'Assistant'
+    gist = ' '.join(turn['content'].split())
+    if len(gist) > 160:
+        gist = gist[:157] + '...'
+    lines = (summary.split('\n') if summary else []) + [f"- {speaker}: {gist}"]
+    while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > SUMMARY_BUDGET:
+        lines.pop(0)
+    return '\n'.join(lines)
+
+def _evict_expired(now):
+    expired = [sid for sid, s in _sessions.items() if now - s.updated_at > SESSION_TTL]
+    for sid in expired:
+        del _sessions[sid]
+    # Drop least recently used sessions if we're still over capacity
+    if len(_sessions) >= MAX_SESSIONS:
+        oldest = sorted(_sessions.values(), key=lambda s: s.updated_at)
+        for s in oldest[:len(_sessions) - MAX_SESSIONS + 1]:
+            del _sessions[s.session_id]
+
+def get_session(user_id, session_id):
+    """A user's live chat session, or None if the ID is unknown to this worker, expired, or someone else's"""
+    with _lock:
+        session = _sessions.get(session_id) if session_id else None
+        if session and (session.user_id != user_id or time.time() - session.updated_at > SESSION_TTL):
+            return None
+        return session
+
+def create_session(user_id, history=None):
+    """
+    Start a new session. `history` rebuilds the conversation when the client's
+    session wasn't found, e.g. after a restart or on another worker.
+    """
+    with _lock:
+        _evict_expired(time.time())
+        session = ChatSession(secrets.token_urlsafe(16), user_id)
+        _sessions[session.session_id] = session
+
+    for msg in history or []:
+        if msg.get('role') in ['user', 'assistant'] and msg.get('content'):
+            session.turns.append({'role': msg['role'], 'content': msg['content']})
+    session.compact()
+    return session
+
+def delete_session(user_id, session_id):
+    """Remove a session (e.g. when the user clears the chat)"""
+    with _lock:
+        session = _sessions.get(session_id)
+        if session and session.user_id == user_id:
+            del _sessions[session_id]
+            return True
+    return False
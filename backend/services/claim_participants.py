@@ -0,0 +1,65 @@
+from models import db, Claim, LostItem, FoundItem
+from services.db_routing import use_primary
+from config import Config
+from collections import namedtuple, OrderedDict
+import threading
+import time
+
+PARTICIPANTS_TTL = Config.CLAIM_PARTICIPANTS_TTL  # Seconds an entry is trusted before it is re-checked
+MAX_ENTRIES = 10000
+
+Participants = namedtuple('Participants', ['claimant_id', 'finder_id', 'status'])
+
+# claim_id -> (checked_at, Participants), least recently used first
+_participants = OrderedDict()
+_lock = threading.Lock()
+
+def _store(claim_id, checked_at, participants):
+    with _lock:
+        _participants[claim_id] = (checked_at, participants)
+        _participants.move_to_end(claim_id)
+        while len(_participants) > MAX_ENTRIES:
+            _participants.popitem(last=False)
+
+def get_participants(claim_id):
+    """
+    (claimant_id, finder_id, status) for a claim, or None if the claim or its
+    items don't exist. Served from memory for PARTICIPANTS_TTL seconds, then
+    re-checked against the primary: other workers' invalidations never reach
+    this one, so a deleted, archived or approved claim is noticed there.
+    """
+    now = time.time()
+    with _lock:
+        entry = _participants.get(claim_id)
+        if entry and now - entry[0] < PARTICIPANTS_TTL:
+            _participants.move_to_end(claim_id)
+            return entry[1]
+
+    with use_primary():
+        if entry:
+            # Claimant and finder never change, so the claim's status is its version
+            status = db.session.query(Claim.status).filter(Claim.id == claim_id).scalar()
+            if status is None:
+                invalidate_participants(claim_id)
+                return None
+            participants = entry[1]._replace(status=status)
+            _store(claim_id, now, participants)
+            return participants
+
+        row = db.session.query(Claim.claimant_id, FoundItem.user_id, Claim.status).join(
+            FoundItem, FoundItem.id == Claim.found_item_id
+        ).join(
+            LostItem, LostItem.id == Claim.lost_item_id
+        ).filter(Claim.id == claim_id).first()
+    if row is None:
+        return None  # Not cached: the claim may be created shortly
+
+    participants = Participants(*row)
+    _store(claim_id, now, participants)
+    return participants
+
+def invalidate_participants(*claim_ids):
+    """Drop cached entries after a claim's status changes or it is deleted/archived"""
+    with _lock:
+        for claim_id in claim_ids:
+            _participants.pop(claim_id, None)
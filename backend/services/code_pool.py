@@ -0,0 +1,93 @@
+from flask import current_app, has_app_context
+from sqlalchemy.exc import IntegrityError
+from collections import deque
+import secrets
+import string
+import threading
+
+ALPHABET = string.ascii_uppercase + string.digits
+
+class CodePool:
+    """
+    Pre-generated random codes already checked against the database, handed
+    out in O(1). Refilled in bulk (one IN query per batch) on a background
+    thread when it runs low. Another worker can still insert the same code
+    first, so callers commit through commit_with_code() and let the unique
+    constraint decide.
+    """
+
+    def __init__(self, db, column, length, size):
+        self.db = db
+        self.column = column
+        self.length = length
+        self.size = size
+        self.low_water = max(1, size // 4)
+        self.codes = deque()
+        self.lock = threading.Lock()
+        self.refilling = False
+
+    def _candidates(self, count):
+        return {''.join(secrets.choice(ALPHABET) for _ in range(self.length)) for _ in range(count)}
+
+    def _fill(self, count):
+        """Add up to `count` verified-unused codes (needs an app context)"""
+        candidates = self._candidates(count)
+        with self.lock:
+            candidates -= set(self.codes)
+        taken = {
+            row[0] for row in
+            self.db.session.query(self.column).filter(self.column.in_(candidates))
+        }
+        with self.lock:
+            self.codes.extend(candidates - taken)
+
+    def _refill_in_background(self, app):
+        with self.lock:
+            if self.refilling:
+                return
+            self.refilling = True
+
+        def run():
+            try:
+                with app.app_context():
+                    self._fill(self.size - len(self.codes))
+                    self.db.session.remove()
+            except Exception as e:
+                print(f"⚠️ Code pool refill failed: {e}")
+            finally:
+                with self.lock:
+                    self.refilling = False
+
+        threading.Thread(target=run, name='code-pool-refill', daemon=True).start()
+
+    def take_many(self, count):
+        """Pop `count` codes, filling synchronously only if the pool can't cover the request"""
+        while True:
+            with self.lock:
+                if len(self.codes) >= count:
+                    codes = [self.codes.popleft() for _ in range(count)]
+                    remaining = len(self.codes)
+                    break
+            self._fill(count - len(self.codes) + self.low_water)
+        if remaining < self.low_water and has_app_context():
+            self._refill_in_background(current_app._get_current_object())
+        return codes
+
+    def take(self):
+        return self.take_many(1)[0]
+
+def commit_with_code(db, pool, apply, count=None, attempts=3):
+    """
+    Call apply(code) with a pooled code, or apply(codes) with `count` codes,
+    then commit. apply must session.add() whatever it changes, since a
+    unique-constraint collision rolls back and retries with fresh codes.
+    """
+    for attempt in range(attempts):
+        apply(pool.take() if count is None else pool.take_many(count))
+        try:
+            db.session.commit()
+            return
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == attempts - 1:
+                raise
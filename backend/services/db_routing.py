@@ -0,0 +1,129 @@
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+from contextlib import contextmanager
+from functools import wraps
+import threading
+import time
+
+REPLICA_BIND = 'replica'
+# Successful writes return their time in this header and clients echo it back,
+# so any worker can tell a caller wrote recently
+LAST_WRITE_HEADER = 'X-Last-Write'
+
+# user_id -> time of their last successful write, for clients that don't echo the header
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+_read_your_writes_window = 5.0
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica engine during @read_only requests.
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or self._flushing or isinstance(clause, UpdateBase):
+            return primary
+        if not (has_request_context() and g.get('use_replica')):
+            return primary
+        engines = self._db.engines
+        if REPLICA_BIND in engines and primary is engines.get(None):
+            return engines[REPLICA_BIND]
+        return primary
+
+def replica_binds(config, engine_options):
+    """SQLALCHEMY_BINDS entry for the replica, if DATABASE_REPLICA_URL is set"""
+    url = config.get('DATABASE_REPLICA_URL')
+    if not url:
+        return {}
+    return {REPLICA_BIND: dict(engine_options(config, url), url=url)}
+
+def mark_write(user_id):
+    """Pin a user's reads to the primary for a short window after they write"""
+    now = time.time()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now
+        if len(_recent_writes) > 10000:
+            for uid, ts in list(_recent_writes.items()):
+                if now - ts > _read_your_writes_window:
+                    del _recent_writes[uid]
+
+def _within_window(ts, now):
+    # A timestamp a little ahead of us can come from another worker's clock
+    return -_read_your_writes_window < now - ts < _read_your_writes_window
+
+def wrote_recently(user_id):
+    """Whether the caller wrote within the read-your-writes window, per the header or this worker"""
+    now = time.time()
+    try:
+        header_ts = float(request.headers.get(LAST_WRITE_HEADER, ''))
+    except ValueError:
+        header_ts = None
+    if header_ts is not None and _within_window(header_ts, now):
+        return True
+    if not user_id:
+        return False
+    with _recent_writes_lock:
+        ts = _recent_writes.get(int(user_id))
+    return ts is not None and _within_window(ts, now)
+
+def read_only(fn):
+    """
+    Serve this endpoint from the replica, unless the caller wrote recently.
+    Place below @jwt_required() so the caller's identity is available.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            user_id = None  # Public endpoints ignore bad tokens
+        g.use_replica = not wrote_recently(user_id)
+        return fn(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def use_primary():
+    """Send this block's reads to the primary, e.g. reads that decide whether to write"""
+    previous = g.get('use_replica') if has_request_context() else None
+    if previous:
+        g.use_replica = False
+    try:
+        yield
+    finally:
+        if previous:
+            g.use_replica = previous
+
+def init_db_routing(app):
+    """Track writers so their next reads see their own writes"""
+    global _read_your_writes_window
+    _read_your_writes_window = app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5.0)
+
+    @app.after_request
+    def track_writes(response):
+        is_write = request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400
+        if app.config.get('DATABASE_REPLICA_URL') and is_write:
+            try:
+                verify_jwt_in_request(optional=True)
+                user_id = get_jwt_identity()
+            except Exception:
+                user_id = None
+            if user_id:
+                mark_write(int(user_id))
+            response.headers[LAST_WRITE_HEADER] = f"{time.time():.3f}"
+        return response
+
+def copy_to_replica(primary_path, replica_path):
+    """Snapshot a SQLite primary into the replica file (for local testing)"""
+    import sqlite3
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
@@ -0,0 +1,65 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def engine_options(config, uri=None):
+    """
+    SQLAlchemy engine options for the configured DB_ENGINE_PROFILE.
+    'tuned' sizes the connection pool (SQLite gets a busy timeout instead of
+    failing immediately with 'database is locked'); 'default' leaves
+    SQLAlchemy's defaults alone.
+    """
+    if config.get('DB_ENGINE_PROFILE') == 'default':
+        return {}
+
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}  # In-memory databases use a single shared connection
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'connect_args': {
+                'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000.0,
+                'check_same_thread': False
+            }
+        }
+
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_pre_ping': True,
+        'pool_recycle': config['DB_POOL_RECYCLE']
+    }
+
+def configure_engine_options(app):
+    """Merge the profile's options into SQLALCHEMY_ENGINE_OPTIONS and add the replica bind (call before db.init_app)"""
+    from services.db_routing import replica_binds
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds.update(replica_binds(app.config, engine_options))
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+def apply_sqlite_pragmas(engine, config):
+    """Set WAL mode and cache/mmap pragmas on every new SQLite connection"""
+    if config.get('DB_ENGINE_PROFILE') == 'default' or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers proceed while one writer commits
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.close()
+
+def init_engine_profile(app, db):
+    """Attach connect-time settings to the engine (call after db.init_app)"""
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config)
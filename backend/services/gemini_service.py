@@ -2,14 +2,74 @@ from ollama import Client
 from config import Config
 import json
 import base64
+import hashlib
 import tempfile
+import threading
 import os
 from datetime import datetime
 
 # Initialize Ollama client with custom host
-client = Client(host=Config.OLLAMA_HOST)
+client = Client(host=Config.OLLAMA_HOST, timeout=Config.OLLAMA_TIMEOUT)
 OLLAMA_MODEL = Config.OLLAMA_MODEL
 
+class _InFlightCall:
+    """A model call that concurrent identical requests wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.has_result = False
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def single_flight(key, fn):
+    """
+    Run fn() once for all concurrent callers sharing `key`.
+    The first caller makes the call; the rest block and receive the same
+    result (or exception). Nothing is cached once the call finishes.
+    """
+    with _in_flight_lock:
+        call = _in_flight.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = _InFlightCall()
+            _in_flight[key] = call
+    
+    if not is_leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        if not call.has_result:
+            raise RuntimeError('Shared model call ended without a result')
+        return call.result
+    
+    # Followers are always released with a result or an error, even if the
+    # leader is interrupted by a BaseException (KeyboardInterrupt, SystemExit,
+    # a greenlet kill)
+    try:
+        call.result = fn()
+        call.has_result = True
+        return call.result
+    except BaseException as e:
+        call.error = e if isinstance(e, Exception) else RuntimeError(f'Shared model call was interrupted: {e!r}')
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        call.done.set()
+
+def request_key(*parts):
+    """Hash arbitrary request parts (prompt, image bytes, messages) into a single-flight key"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
 def analyze_item_for_matching(lost_item, found_items):
     """
     Match lost items with found items using rule-based algorithm.
@@ -169,6 +229,77 @@ def extract_item_details_from_photo(image_bytes):
             "description": "Please fill in item details manually"
         }
 
+def photo_hash(image_bytes):
+    """Content hash used to key stored photo analyses"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+def _parse_json_response(response):
+    """Pull the JSON payload out of an Ollama chat response"""
+    result_text = response['message']['content'].strip()
+    if result_text.startswith('```'):
+        result_text = result_text.split('```')[1]
+        if result_text.startswith('json'):
+            result_text = result_text[4:]
+    return json.loads(result_text.strip())
+
+def analyze_photo(image_bytes, item_description=None, verification_question=None):
+    """
+    Single Ollama Vision call that returns everything we need from a photo:
+    extraction fields, a visual descriptor for similarity, and (when an item
+    description is given, even empty) verification evidence against that item.
+    The image is encoded once and sent inline instead of via a temp file.
+    """
+    prompt = ('Analyze photo. Return JSON: {"extraction":{"category":"phone","color":"black","brand":"Apple",'
+              '"model":"iPhone 13","unique_features":["scratch"],"condition":"good","description":"brief"},'
+              '"descriptor":{"object":"phone","colors":["black"],"materials":["glass"],"markings":["logo"],"shape":"rectangular"}')
+    if item_description is not None:
+        desc = item_description[:120]
+        prompt += ',"verification":{"verification_confidence":90,"is_valid_proof":true,"evidence_found":["feature"],"analysis":"brief"}'
+        prompt += '}. For verification, check the photo against item: ' + desc
+        if verification_question:
+            prompt += f" Q: {verification_question[:80]}"
+    else:
+        prompt += '}'
+    
+    try:
+        # Concurrent uploads of the same image with the same prompt share one call
+        response = single_flight(
+            request_key('analyze_photo', OLLAMA_MODEL, prompt, image_bytes),
+            lambda: client.chat(
+                model=OLLAMA_MODEL,
+                messages=[{
+                    'role': 'user',
+                    'content': prompt,
+                    'images': [base64.b64encode(image_bytes).decode('utf-8')]
+                }]
+            )
+        )
+        analysis = _parse_json_response(response)
+    except Exception as e:
+        print(f"Error in Ollama combined photo analysis: {str(e)}")
+        analysis = {}
+    
+    # Fill in any section the model failed to return
+    return {
+        'ai_available': bool(analysis),
+        'extraction': analysis.get('extraction') or {
+            "category": "other",
+            "color": "",
+            "brand": None,
+            "model": None,
+            "unique_features": [],
+            "condition": "unknown",
+            "description": "Please fill in item details manually"
+        },
+        'descriptor': analysis.get('descriptor') or {},
+        'verification': (analysis.get('verification') or {
+            "verification_confidence": 50,
+            "is_valid_proof": True,  # Let admin review manually
+            "evidence_found": ["Manual review required - API unavailable"],
+            "analysis": "Photo submitted but AI verification unavailable. Please review manually."
+        }) if item_description is not None else None
+    }
+
 def fallback_matching(lost_item, found_items):
     """
     Fallback matching algorithm when AI is unavailable.
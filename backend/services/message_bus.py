@@ -0,0 +1,170 @@
+from config import Config
+import json
+import queue
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 100  # Messages buffered per stream before it is dropped as too slow
+MAX_SUBSCRIBERS = Config.SSE_MAX_SUBSCRIBERS
+RELAY_CHANNEL = 'reunite:messages'
+
+# claim_id -> set of subscriber queues for this worker's open streams
+_subscribers = {}
+_lock = threading.Lock()
+
+# Messages sent through other workers reach this worker's streams through
+# either a Redis channel (MESSAGE_BUS_URL) or one poller thread per worker
+_app = None
+_relay = None  # Redis client when MESSAGE_BUS_URL is set
+_watermark = 0  # Highest message id the poller has looked past
+_fanout_thread = None
+_fanout_stop = threading.Event()  # Set to retire the running listener or poller
+_fanout_lock = threading.Lock()
+
+class Subscription:
+    """One open stream's view of a claim's new messages"""
+
+    def __init__(self, claim_id):
+        self.claim_id = claim_id
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = False
+
+    def get(self, timeout):
+        """Next published message dict, or None on timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+def subscriber_count():
+    with _lock:
+        return sum(len(subs) for subs in _subscribers.values())
+
+def subscribe(claim_id):
+    """Start receiving messages published to a claim; returns None when the worker is full"""
+    subscription = Subscription(claim_id)
+    with _lock:
+        if sum(len(subs) for subs in _subscribers.values()) >= MAX_SUBSCRIBERS:
+            return None
+        _subscribers.setdefault(claim_id, set()).add(subscription)
+    _start_fanout()
+    return subscription
+
+def unsubscribe(subscription):
+    with _lock:
+        subs = _subscribers.get(subscription.claim_id)
+        if subs is None:
+            return
+        subs.discard(subscription)
+        if not subs:
+            del _subscribers[subscription.claim_id]
+
+def publish(claim_id, message):
+    """Fan a committed message out to the claim's open streams, in every worker when relayed"""
+    if _relay is not None:
+        try:
+            _relay.publish(RELAY_CHANNEL, json.dumps({'claim_id': claim_id, 'message': message}))
+            return  # Delivered back to this worker by the relay listener
+        except Exception as e:
+            print(f"⚠️ Message relay failed, delivering locally: {e}")
+    _deliver(claim_id, message)
+
+def _deliver(claim_id, message):
+    """Queue a message for this worker's streams on the claim"""
+    with _lock:
+        subs = list(_subscribers.get(claim_id, ()))
+    for subscription in subs:
+        try:
+            subscription.queue.put_nowait(message)
+        except queue.Full:
+            # The client stopped reading; end its stream so it reconnects and catches up from the DB
+            subscription.dropped = True
+            unsubscribe(subscription)
+
+def init_message_bus(app):
+    """
+    Connect to MESSAGE_BUS_URL if set; otherwise start the poller's watermark at
+    the newest message, since streams catch up on anything older themselves.
+    Call inside an app context. The relay listener or poller starts with the first stream.
+    """
+    global _app, _relay, _watermark, _fanout_thread, _fanout_stop
+    from models import db, Message
+    with _fanout_lock:
+        # A new app (e.g. in tests) replaces any fan-out thread started for a previous one
+        _fanout_stop.set()
+        _fanout_stop = threading.Event()
+        _fanout_thread = None
+    _app = app
+    url = app.config.get('MESSAGE_BUS_URL')
+    if url:
+        import redis
+        _relay = redis.Redis.from_url(url)
+    else:
+        _relay = None
+        _watermark = db.session.query(db.func.max(Message.id)).scalar() or 0
+
+def _start_fanout():
+    global _fanout_thread
+    with _fanout_lock:
+        if _fanout_thread is not None and _fanout_thread.is_alive():
+            return
+        if _relay is not None:
+            # Subscribe before returning, so nothing published after this stream's catch-up query is missed
+            pubsub = _relay.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(RELAY_CHANNEL)
+            pubsub.get_message(timeout=5)
+            target, args = _listen, (pubsub, _fanout_stop)
+        elif _app is not None:
+            target, args = _poll, (_app, _fanout_stop)
+        else:
+            return  # Not initialized (e.g. a bare script); streams only see this process's messages
+        _fanout_thread = threading.Thread(target=target, args=args, name='message-fanout', daemon=True)
+        _fanout_thread.start()
+
+def _listen(pubsub, stop):
+    """Deliver relayed messages to this worker's streams"""
+    while not stop.is_set():
+        try:
+            for item in pubsub.listen():
+                if stop.is_set():
+                    break
+                if item['type'] == 'message':
+                    payload = json.loads(item['data'])
+                    _deliver(payload['claim_id'], payload['message'])
+        except Exception as e:
+            print(f"⚠️ Message relay listener failed, reconnecting: {e}")
+            stop.wait(1)
+            try:
+                pubsub.subscribe(RELAY_CHANNEL)
+            except Exception:
+                pass
+    pubsub.close()
+
+def _poll(app, stop):
+    """
+    Every SSE_POLL_SECONDS, load new messages for claims that have open streams
+    here with one query and deliver them. Streams skip ids they have already sent.
+    """
+    global _watermark
+    from models import db, Message, serialize_messages
+    while not stop.wait(Config.SSE_POLL_SECONDS):
+        with _lock:
+            claim_ids = list(_subscribers)
+        if not claim_ids:
+            continue
+        try:
+            with app.app_context():
+                try:
+                    rows = Message.query.filter(
+                        Message.claim_id.in_(claim_ids), Message.id > _watermark
+                    ).order_by(Message.id.asc()).all()
+                    messages = serialize_messages(rows)
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            print(f"⚠️ Message poller failed: {e}")
+            continue
+        if stop.is_set():
+            return  # Rows from a retired app's database
+        for message in messages:
+            _watermark = max(_watermark, message['id'])
+            _deliver(message['claim_id'], message)
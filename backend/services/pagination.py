@@ -0,0 +1,63 @@
+from flask import request
+from sqlalchemy import and_, or_
+from datetime import datetime
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(row, sort_attr='created_at'):
+    """Opaque cursor pointing just past `row` in (sort_attr, id) order"""
+    value = getattr(row, sort_attr)
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value, row.id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, numeric=False):
+    """
+    Inverse of encode_cursor for a datetime sort key (or a numeric one);
+    raises ValueError for malformed cursors
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if numeric:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError
+        else:
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def get_limit():
+    """Read `limit` from the query string, clamped to MAX_PAGE_SIZE; raises ValueError on bad input"""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def get_page_args(numeric=False):
+    """Read `limit` and `cursor` from the query string; raises ValueError on bad input"""
+    limit = get_limit()
+    cursor = request.args.get('cursor')
+    return limit, decode_cursor(cursor, numeric) if cursor else None
+
+def paginate(query, model, limit, cursor=None, sort_column=None):
+    """
+    Keyset-paginate `query` in descending (sort_column, id) order, newest first
+    by default. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    sort_column = model.created_at if sort_column is None else sort_column
+    if cursor:
+        value, row_id = cursor
+        query = query.filter(or_(
+            sort_column < value,
+            and_(sort_column == value, model.id < row_id)
+        ))
+    rows = query.order_by(sort_column.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1], sort_column.key)
+    return rows, None
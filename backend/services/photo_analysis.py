@@ -0,0 +1,45 @@
+from models import db, PhotoAnalysis
+from services.gemini_service import analyze_photo, photo_hash
+from sqlalchemy.exc import IntegrityError
+import hashlib
+import json
+
+def _context_key(item_description, verification_question):
+    """Stable key for the item text a photo was verified against"""
+    if item_description is None:
+        return ''
+    text = f"{item_description[:120]}\n{(verification_question or '')[:80]}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def get_photo_analysis(image_bytes, photo_url=None, item_description=None, verification_question=None):
+    """
+    Return the combined analysis for a photo, reusing a stored result when the
+    same image was already analyzed in the same context. Otherwise runs one
+    model call and persists it. Does not commit; the caller's transaction does.
+    """
+    digest = photo_hash(image_bytes)
+    context_key = _context_key(item_description, verification_question)
+    
+    stored = PhotoAnalysis.query.filter_by(photo_hash=digest, context_key=context_key).first()
+    if stored:
+        print(f"♻️  Reusing stored analysis for photo {digest[:12]}")
+        if photo_url and not stored.photo_url:
+            stored.photo_url = photo_url
+        return json.loads(stored.analysis)
+    
+    analysis = analyze_photo(image_bytes, item_description, verification_question)
+    if not analysis.get('ai_available'):
+        # Don't persist placeholder results; retry the model next time
+        return analysis
+    try:
+        with db.session.begin_nested():
+            db.session.add(PhotoAnalysis(
+                photo_hash=digest,
+                context_key=context_key,
+                photo_url=photo_url,
+                analysis=json.dumps(analysis)
+            ))
+    except IntegrityError:
+        # Another request stored the same photo first; ours is equivalent
+        pass
+    return analysis
@@ -0,0 +1,152 @@
+from models import db, User, Reward, UserPoints
+from sqlalchemy import event, func, update
+from sqlalchemy.exc import IntegrityError
+from config import Config
+import threading
+import time
+
+LEADERBOARD_SIZE = 10
+LEADERBOARD_TTL = Config.LEADERBOARD_CACHE_TTL  # Reload from user_points so other workers' awards show up
+
+# school_id -> {'loaded_at': float, 'points': {user_id: total}, 'names': {user_id: name}}
+_leaderboards = {}
+_leaderboards_lock = threading.Lock()
+
+def award_points(user_id, school_id, points, reason, related_item_id=None, related_type=None):
+    """
+    Add a Reward to the ledger and bump the user's running total in the same
+    transaction. The caller commits; the in-memory leaderboard is updated
+    only once that commit succeeds.
+    """
+    reward = Reward(
+        user_id=user_id,
+        school_id=school_id,
+        points=points,
+        reason=reason,
+        related_item_id=related_item_id,
+        related_type=related_type
+    )
+    db.session.add(reward)
+
+    if not _increment_total(user_id, school_id, points):
+        try:
+            with db.session.begin_nested():
+                db.session.add(UserPoints(user_id=user_id, school_id=school_id, total_points=points))
+        except IntegrityError:
+            # Another request created the row first
+            _increment_total(user_id, school_id, points)
+
+    # Remember the new total so the cached leaderboard can be updated after commit
+    awarded = db.session.info.setdefault('points_awarded', {})
+    awarded[(school_id, user_id)] = get_total_points(user_id, school_id)
+    return reward
+
+def _increment_total(user_id, school_id, points):
+    result = db.session.execute(
+        update(UserPoints)
+        .where(UserPoints.user_id == user_id, UserPoints.school_id == school_id)
+        .values(total_points=UserPoints.total_points + points)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+def get_total_points(user_id, school_id):
+    """User's point balance in a school, from the summary table"""
+    total = db.session.query(UserPoints.total_points).filter_by(
+        user_id=user_id,
+        school_id=school_id
+    ).scalar()
+    return total or 0
+
+def get_leaderboard(school_id):
+    """Top users by points for a school as [(user_id, name, points)], served from memory when fresh"""
+    now = time.time()
+    with _leaderboards_lock:
+        board = _leaderboards.get(school_id)
+        if board and now - board['loaded_at'] < LEADERBOARD_TTL and not _missing_names(board):
+            return _ranked(board)
+
+    board = _load_leaderboard(school_id)
+    with _leaderboards_lock:
+        _leaderboards[school_id] = board
+        return _ranked(board)
+
+def _missing_names(board):
+    return any(uid not in board['names'] for uid in board['points'])
+
+def _ranked(board):
+    ordered = sorted(board['points'].items(), key=lambda entry: (-entry[1], entry[0]))
+    return [(uid, board['names'].get(uid), total) for uid, total in ordered]
+
+def _load_leaderboard(school_id):
+    rows = db.session.query(
+        UserPoints.user_id,
+        User.first_name,
+        User.last_name,
+        UserPoints.total_points
+    ).join(
+        User, User.id == UserPoints.user_id
+    ).filter(
+        UserPoints.school_id == school_id
+    ).order_by(
+        UserPoints.total_points.desc(), UserPoints.user_id
+    ).limit(LEADERBOARD_SIZE).all()
+    return {
+        'loaded_at': time.time(),
+        'points': {uid: total for uid, first, last, total in rows},
+        'names': {uid: f"{first} {last}" for uid, first, last, total in rows}
+    }
+
+def _apply_award(school_id, user_id, total):
+    """Fold a committed award into the cached top-N (totals only ever increase)"""
+    board = _leaderboards.get(school_id)
+    if board is None:
+        return
+    entries = board['points']
+    if user_id in entries or len(entries) < LEADERBOARD_SIZE:
+        entries[user_id] = total
+    else:
+        lowest = min(entries, key=lambda uid: (entries[uid], -uid))
+        if total > entries[lowest]:
+            del entries[lowest]
+            entries[user_id] = total
+    # A new entrant's name is loaded on the next read
+
+def invalidate_leaderboard(school_id=None):
+    with _leaderboards_lock:
+        if school_id is None:
+            _leaderboards.clear()
+        else:
+            _leaderboards.pop(school_id, None)
+
+@event.listens_for(db.session, 'after_commit')
+def _after_commit(session):
+    if session.in_nested_transaction():
+        return  # A savepoint was released; the awards are not committed yet
+    awarded = session.info.pop('points_awarded', None)
+    if not awarded:
+        return
+    with _leaderboards_lock:
+        for (school_id, user_id), total in awarded.items():
+            _apply_award(school_id, user_id, total)
+
+@event.listens_for(db.session, 'after_rollback')
+def _after_rollback(session):
+    if session.in_nested_transaction():
+        return  # Only the savepoint's work was undone
+    session.info.pop('points_awarded', None)
+
+def rebuild_user_points(school_id=None):
+    """Repair job: recompute user_points from the rewards ledger"""
+    delete = UserPoints.query
+    totals = db.session.query(
+        Reward.user_id, Reward.school_id, func.sum(Reward.points)
+    ).group_by(Reward.user_id, Reward.school_id)
+    if school_id is not None:
+        delete = delete.filter_by(school_id=school_id)
+        totals = totals.filter(Reward.school_id == school_id)
+    delete.delete(synchronize_session=False)
+    for uid, sid, total in totals.all():
+        db.session.add(UserPoints(user_id=uid, school_id=sid, total_points=int(total or 0)))
+    db.session.commit()
+    invalidate_leaderboard(school_id)
@@ -0,0 +1,118 @@
+from models import db, User, LostItem, QRCode
+from services.db_routing import use_primary
+from config import Config
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import aliased, object_session
+from collections import OrderedDict
+import threading
+import time
+
+QR_INFO_TTL = Config.QR_INFO_CACHE_TTL
+MAX_ENTRIES = 10000
+
+# code -> (loaded_at, payload, owner_id, lost_item_id, lost_item_owner_id), least recently used first
+_payloads = OrderedDict()
+_lock = threading.Lock()
+_generation = 0  # Bumped by every invalidation; a miss that loaded across one isn't stored
+
+def _load(code):
+    """Public payload for a code in one joined query, plus the ids it depends on"""
+    owner = aliased(User)
+    lost_item_owner = aliased(User)
+    row = db.session.query(QRCode, owner, LostItem, lost_item_owner).outerjoin(
+        owner, owner.id == QRCode.user_id
+    ).outerjoin(
+        LostItem, LostItem.id == QRCode.lost_item_id
+    ).outerjoin(
+        lost_item_owner, lost_item_owner.id == LostItem.user_id
+    ).filter(QRCode.code == code).first()
+    if row is None:
+        return None
+
+    qr, user, lost_item, lost_user = row
+    users = {lost_user.id: lost_user} if lost_user else {}
+    payload = {
+        'code': qr.code,
+        'owner_name': f"{user.first_name} {user.last_name}" if user else "Unknown",
+        'contact_info': qr.contact_info,
+        'lost_item': lost_item.to_dict(users) if lost_item else None
+    }
+    return payload, qr.user_id, qr.lost_item_id, lost_item.user_id if lost_item else None
+
+def get_public_qr(code):
+    """Serialized public info for a scanned code (None if unknown), cached for QR_INFO_CACHE_TTL seconds"""
+    now = time.time()
+    with _lock:
+        entry = _payloads.get(code)
+        if entry and now - entry[0] < QR_INFO_TTL:
+            _payloads.move_to_end(code)
+            return entry[1]
+        generation = _generation
+
+    # From the primary, so a lagging replica can't re-cache what was just invalidated
+    with use_primary():
+        loaded = _load(code)
+    if loaded is None:
+        return None
+    with _lock:
+        if generation == _generation:
+            _payloads[code] = (now,) + loaded
+            _payloads.move_to_end(code)
+            while len(_payloads) > MAX_ENTRIES:
+                _payloads.popitem(last=False)
+    return loaded[0]
+
+def invalidate_qr(code=None, user_id=None, lost_item_id=None, lost_item_ids=()):
+    """
+    Drop cached payloads for a code, an owner, or linked lost items (no
+    arguments clears all)
+    """
+    global _generation
+    item_ids = set(lost_item_ids)
+    if lost_item_id is not None:
+        item_ids.add(lost_item_id)
+    with _lock:
+        _generation += 1
+        if code is None and user_id is None and not item_ids:
+            _payloads.clear()
+            return
+        for cached_code, (_, _, owner_id, item_id, item_owner_id) in list(_payloads.items()):
+            if (cached_code == code
+                    or (user_id is not None and user_id in (owner_id, item_owner_id))
+                    or item_id in item_ids):
+                del _payloads[cached_code]
+
+# Changes are collected during flush and applied once the transaction commits.
+# A concurrent miss that loaded the old row before then sees the generation
+# change and doesn't store it
+def _pending(target):
+    return object_session(target).info.setdefault('qr_invalidations', set())
+
+@event.listens_for(QRCode, 'after_update')
+@event.listens_for(QRCode, 'after_delete')
+def _qr_changed(mapper, connection, target):
+    _pending(target).add(('code', target.code))
+
+@event.listens_for(LostItem, 'after_update')
+@event.listens_for(LostItem, 'after_delete')
+def _lost_item_changed(mapper, connection, target):
+    _pending(target).add(('lost_item_id', target.id))
+
+@event.listens_for(User, 'after_update')
+def _user_changed(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.first_name.history.has_changes() or state.attrs.last_name.history.has_changes():
+        _pending(target).add(('user_id', target.id))
+
+@event.listens_for(db.session, 'after_commit')
+def _after_commit(session):
+    if session.in_nested_transaction():
+        return  # A savepoint was released; the changes are not committed yet
+    for kind, value in session.info.pop('qr_invalidations', ()):
+        invalidate_qr(**{kind: value})
+
+@event.listens_for(db.session, 'after_rollback')
+def _after_rollback(session):
+    if session.in_nested_transaction():
+        return  # Changes flushed before the savepoint still need invalidating
+    session.info.pop('qr_invalidations', None)
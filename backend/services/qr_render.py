@@ -0,0 +1,148 @@
+from config import Config
+from collections import OrderedDict
+import hashlib
+import io
+import os
+import threading
+
+import qrcode
+import qrcode.image.svg
+
+RENDER_VERSION = '1'  # Bump when rendering changes so cached variants get new ETags
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+MIN_SIZE = 64
+MAX_SIZE = 2048
+SIZE_STEP = 32  # Sizes are rounded to this so the cache holds a bounded set of variants
+DISK_CACHE_DIR = os.path.join('instance', 'qr_cache')
+MEMORY_CACHE_BYTES = Config.QR_CACHE_MAX_BYTES
+
+# key -> bytes, least recently used first
+_memory_cache = OrderedDict()
+_memory_cache_bytes = 0
+_lock = threading.Lock()
+
+def qr_target_url(code, host_url):
+    """Frontend page a QR code points at"""
+    base_url = host_url.rstrip('/')
+    # Replace backend port with frontend port for local dev
+    if 'localhost:5000' in base_url:
+        frontend_url = base_url.replace(':5000', ':5173')
+    else:
+        # In production, use the configured frontend URL
+        frontend_url = Config.FRONTEND_URL.rstrip('/')
+    return f"{frontend_url}/qr/{code}"
+
+def normalize_variant(size, fmt):
+    """Validate ?size=&format=; returns (size, fmt), size None for the default/vector render"""
+    fmt = (fmt or 'png').lower()
+    if fmt not in FORMATS:
+        raise ValueError('format must be png or svg')
+    if fmt == 'svg' or size in (None, ''):
+        return None, fmt
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ValueError('size must be an integer')
+    size = max(MIN_SIZE, min(size, MAX_SIZE))
+    return round(size / SIZE_STEP) * SIZE_STEP, fmt
+
+def variant_key(data, size, fmt):
+    """Content address of a rendered variant; also used as its ETag"""
+    raw = f"{RENDER_VERSION}|{data}|{size or ''}|{fmt}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def render(data, size=None, fmt='png'):
+    """Render a QR code to bytes (PNG at `size` pixels square, or SVG)"""
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    if fmt == 'svg':
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+        return buffer.getvalue()
+
+    img = qr.make_image(fill_color="black", back_color="white").get_image()
+    if size:
+        from PIL import Image
+        img = img.resize((size, size), Image.NEAREST)
+    img.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+def _disk_path(key, fmt):
+    return os.path.join(DISK_CACHE_DIR, key[:2], f"{key}.{fmt}")
+
+def _remember(key, content):
+    global _memory_cache_bytes
+    with _lock:
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            return
+        _memory_cache[key] = content
+        _memory_cache_bytes += len(content)
+        while _memory_cache_bytes > MEMORY_CACHE_BYTES and len(_memory_cache) > 1:
+            _, evicted = _memory_cache.popitem(last=False)
+            _memory_cache_bytes -= len(evicted)
+
+def get_rendered(data, size=None, fmt='png'):
+    """
+    Rendered QR bytes and their key, from memory, then disk, then a fresh render.
+    Variants are content-addressed, so cached files never go stale.
+    """
+    key = variant_key(data, size, fmt)
+    with _lock:
+        content = _memory_cache.get(key)
+        if content is not None:
+            _memory_cache.move_to_end(key)
+            return content, key
+
+    path = _disk_path(key, fmt)
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        content = render(data, size, fmt)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)  # Atomic, so readers never see a partial file
+        except OSError as e:
+            print(f"Warning: Could not write QR cache file: {e}")
+
+    _remember(key, content)
+    return content, key
+
+_pool = None
+_pool_lock = threading.Lock()
+RENDER_WORKERS = Config.QR_RENDER_WORKERS or os.cpu_count() or 1
+INLINE_RENDER_LIMIT = 8  # Smaller batches aren't worth the inter-process round trip
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn, not fork: forking a threaded server process can deadlock the children
+            _pool = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+def render_many(datas, size=None, fmt='png'):
+    """Render several QR codes, in parallel on a process pool for larger batches"""
+    if len(datas) <= INLINE_RENDER_LIMIT:
+        return [render(data, size, fmt) for data in datas]
+    from concurrent.futures.process import BrokenProcessPool
+    global _pool
+    chunksize = max(1, len(datas) // (RENDER_WORKERS * 4))
+    try:
+        return list(_get_pool().map(render, datas, [size] * len(datas), [fmt] * len(datas), chunksize=chunksize))
+    except BrokenProcessPool as e:
+        # A worker died; start a fresh pool next time and finish this batch here
+        print(f"⚠️ QR render pool failed, rendering inline: {e}")
+        with _pool_lock:
+            _pool = None
+        return [render(data, size, fmt) for data in datas]
@@ -0,0 +1,50 @@
+from PIL import Image, ImageDraw, ImageFont
+import io
+
+# A4 at 150 DPI
+PAGE_WIDTH = 1240
+PAGE_HEIGHT = 1754
+PAGE_DPI = 150
+MARGIN = 60
+COLUMNS = 4
+TILE_SIZE = (PAGE_WIDTH - 2 * MARGIN) // COLUMNS
+QR_SIZE = 256  # Rendered size of each code; fits a tile with room for the label
+LABEL_HEIGHT = 28
+ROWS = (PAGE_HEIGHT - 2 * MARGIN) // (TILE_SIZE + LABEL_HEIGHT)
+SHEET_FORMATS = {'pdf': 'application/pdf', 'png': 'image/png'}
+
+def _draw_tile(page, qr_png, label, x, y):
+    qr_image = Image.open(io.BytesIO(qr_png)).convert('L')
+    offset = (TILE_SIZE - qr_image.width) // 2
+    page.paste(qr_image, (x + offset, y + offset))
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default()
+    text_width = draw.textlength(label, font=font)
+    draw.text((x + (TILE_SIZE - text_width) / 2, y + TILE_SIZE + 4), label, fill=0, font=font)
+
+def _layout(qr_pngs, labels, rows_per_page):
+    """Yield pages of tiled codes, `rows_per_page` rows each"""
+    per_page = COLUMNS * rows_per_page
+    for start in range(0, len(qr_pngs), per_page):
+        rows = min(rows_per_page, -(-(len(qr_pngs) - start) // COLUMNS))
+        height = PAGE_HEIGHT if rows_per_page == ROWS else 2 * MARGIN + rows * (TILE_SIZE + LABEL_HEIGHT)
+        page = Image.new('L', (PAGE_WIDTH, height), 255)
+        for i, (qr_png, label) in enumerate(zip(qr_pngs[start:start + per_page], labels[start:start + per_page])):
+            row, col = divmod(i, COLUMNS)
+            _draw_tile(page, qr_png, label, MARGIN + col * TILE_SIZE, MARGIN + row * (TILE_SIZE + LABEL_HEIGHT))
+        yield page
+
+def build_sheet(qr_pngs, labels, fmt='pdf'):
+    """
+    Printable sheet of QR codes with their codes underneath: a multi-page A4
+    PDF, or one tall tiled PNG.
+    """
+    buffer = io.BytesIO()
+    if fmt == 'pdf':
+        pages = list(_layout(qr_pngs, labels, ROWS))
+        pages[0].save(buffer, format='PDF', save_all=True, append_images=pages[1:], resolution=PAGE_DPI)
+    else:
+        rows = -(-len(qr_pngs) // COLUMNS)
+        page = next(_layout(qr_pngs, labels, rows))
+        page.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
@@ -0,0 +1,33 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+def init_query_guard(app, db):
+    """
+    Count SQL statements per request. Requests that go over
+    MAX_QUERIES_PER_REQUEST raise in testing (so N+1 regressions fail the
+    test) and log a warning otherwise.
+    """
+    limit = app.config.get('MAX_QUERIES_PER_REQUEST')
+    if not limit:
+        return
+    
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        # Savepoints (begin_nested) are transaction bookkeeping, not queries
+        if has_request_context() and not statement.startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')):
+            g.query_count = g.get('query_count', 0) + 1
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', count_query)
+    
+    @app.after_request
+    def check_query_count(response):
+        count = g.get('query_count', 0)
+        if count > limit:
+            msg = f"{request.method} {request.path} issued {count} queries (limit {limit})"
+            if app.testing:
+                raise AssertionError(msg)
+            print(f"⚠️  {msg}")
+        if app.debug or app.testing:
+            response.headers['X-Query-Count'] = str(count)
+        return response
@@ -0,0 +1,167 @@
+from flask import request, jsonify
+from config import Config
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import math
+import threading
+import time
+
+MAX_KEYS = 100000  # Buckets and dedupe keys kept per worker; evicting one only resets it
+
+class MemoryBackend:
+    """Token buckets and dedupe keys in this process (each worker limits on its own)"""
+
+    def __init__(self):
+        self.buckets = OrderedDict()  # key -> (tokens, updated_at), least recently used first
+        self.seen = OrderedDict()  # key -> expires_at
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, refill_per_second):
+        """Spend one token; returns the tokens left, negative when the bucket was empty"""
+        now = time.time()
+        with self.lock:
+            tokens, updated_at = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            remaining = tokens - 1
+            self.buckets[key] = (remaining if remaining >= 0 else tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > MAX_KEYS:
+                self.buckets.popitem(last=False)
+        return remaining
+
+    def add_once(self, key, ttl):
+        """Remember key for ttl seconds; False if it was already remembered"""
+        now = time.time()
+        with self.lock:
+            expires_at = self.seen.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self.seen[key] = now + ttl
+            self.seen.move_to_end(key)
+            while len(self.seen) > MAX_KEYS:
+                self.seen.popitem(last=False)
+        return True
+
+    def discard(self, key):
+        with self.lock:
+            self.seen.pop(key, None)
+
+# Refill, spend and save a bucket atomically in Redis
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local remaining = tokens - 1
+if remaining >= 0 then tokens = remaining end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(remaining)
+"""
+
+class RedisBackend:
+    """Buckets shared by every worker through Redis (needs the redis package)"""
+
+    def __init__(self, url, prefix='reunite:ratelimit:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.take_script = self.client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key, capacity, refill_per_second):
+        return float(self.take_script(keys=[self.prefix + key], args=[capacity, refill_per_second, time.time()]))
+
+    def add_once(self, key, ttl):
+        return bool(self.client.set(self.prefix + key, 1, nx=True, ex=max(1, math.ceil(ttl))))
+
+    def discard(self, key):
+        self.client.delete(self.prefix + key)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def set_backend(backend):
+    """Use another store (anything with take/add_once/discard), e.g. for a multi-worker deployment"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            url = Config.RATE_LIMIT_STORAGE_URL
+            _backend = RedisBackend(url) if url else MemoryBackend()
+        return _backend
+
+# Requests per minute for each endpoint, per client IP and per QR code (0 disables that bucket)
+LIMITS = {
+    'qr_info': {'ip': Config.QR_INFO_RATE_PER_IP, 'code': Config.QR_INFO_RATE_PER_CODE},
+    'qr_contact': {'ip': Config.QR_CONTACT_RATE_PER_IP, 'code': Config.QR_CONTACT_RATE_PER_CODE},
+}
+
+def client_ip():
+    # Behind a reverse proxy, wrap the app in werkzeug's ProxyFix so this is the real client
+    return request.remote_addr or 'unknown'
+
+def _retry_after(name, scope, value):
+    """Seconds until the bucket has a token again, or None if the request may proceed"""
+    per_minute = LIMITS[name][scope]
+    if not per_minute:
+        return None
+    refill_per_second = per_minute / 60.0
+    try:
+        remaining = get_backend().take(f"{name}:{scope}:{value}", per_minute, refill_per_second)
+    except Exception as e:
+        print(f"⚠️ Rate limit backend failed, allowing request: {e}")
+        return None
+    if remaining >= 0:
+        return None
+    return max(1, math.ceil(-remaining / refill_per_second))
+
+def too_many_requests(retry_after, error='Too many requests, please try again later'):
+    response = jsonify({'error': error})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def rate_limited(name):
+    """
+    Token-bucket limit an endpoint by client IP and by its `code` URL argument.
+    Place above @read_only so rejected requests never touch the database.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            retry_after = _retry_after(name, 'ip', client_ip())
+            if retry_after is None and 'code' in kwargs:
+                retry_after = _retry_after(name, 'code', kwargs['code'])
+            if retry_after is not None:
+                return too_many_requests(retry_after)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def claim_first_send(*parts):
+    """
+    True for the first identical submission within CONTACT_DEDUPE_SECONDS, False
+    for repeats. Returns the key too, so a failed send can release it for a retry.
+    """
+    key = 'dedupe:' + hashlib.sha256('\x1f'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+    try:
+        return get_backend().add_once(key, Config.CONTACT_DEDUPE_SECONDS), key
+    except Exception as e:
+        print(f"⚠️ Rate limit backend failed, skipping dedupe: {e}")
+        return True, None
+
+def release_send(key):
+    if key is None:
+        return
+    try:
+        get_backend().discard(key)
+    except Exception as e:
+        print(f"⚠️ Rate limit backend failed: {e}")
@@ -0,0 +1,89 @@
+from models import db, LostItem, FoundItem, User
+from sqlalchemy import or_, text
+import re
+
+ITEM_MODELS = {'lost': LostItem, 'found': FoundItem}
+
+def _fts_query(q):
+    """Turn free text into a safe FTS5 query: each word as a quoted prefix term"""
+    terms = re.findall(r'\w+', q.lower())[:10]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def _has_fts_index():
+    if db.session.get_bind().dialect.name != 'sqlite':
+        return False
+    return db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'"
+    )).first() is not None
+
+def _search_fts(school_id, match, item_types, status, limit, offset):
+    sql = (
+        "SELECT item_type, item_id, bm25(items_fts) AS score FROM items_fts "
+        "WHERE items_fts MATCH :match AND school_id = :school_id "
+    )
+    params = {'match': match, 'school_id': school_id, 'limit': limit, 'offset': offset}
+    if len(item_types) == 1:
+        sql += "AND item_type = :item_type "
+        params['item_type'] = item_types[0]
+    if status:
+        sql += (
+            "AND ((item_type = 'lost' AND item_id IN (SELECT id FROM lost_items WHERE status = :status)) "
+            "OR (item_type = 'found' AND item_id IN (SELECT id FROM found_items WHERE status = :status))) "
+        )
+        params['status'] = status
+    sql += "ORDER BY score LIMIT :limit OFFSET :offset"
+    return [(row.item_type, row.item_id, row.score) for row in db.session.execute(text(sql), params)]
+
+def _search_like(school_id, q, item_types, status, limit, offset):
+    """Fallback for databases without the FTS index: LIKE on each word, newest first"""
+    terms = re.findall(r'\w+', q.lower())[:10]
+    hits = []
+    for item_type in item_types:
+        model = ITEM_MODELS[item_type]
+        query = db.session.query(model.id, model.created_at).filter(model.school_id == school_id)
+        if status:
+            query = query.filter(model.status == status)
+        for term in terms:
+            pattern = f"%{term}%"
+            query = query.filter(or_(
+                model.title.ilike(pattern), model.description.ilike(pattern), model.brand.ilike(pattern),
+                model.color.ilike(pattern), model.location.ilike(pattern)
+            ))
+        rows = query.order_by(model.created_at.desc()).limit(offset + limit).all()
+        hits.extend((item_type, row.id, row.created_at) for row in rows)
+    hits.sort(key=lambda hit: hit[2], reverse=True)
+    return [(item_type, item_id, None) for item_type, item_id, _ in hits[offset:offset + limit]]
+
+def search_items(school_id, q, item_type=None, status=None, limit=20, offset=0):
+    """
+    Ranked search over a school's lost and found items.
+    Returns (results, has_more) where results are {'type', 'item', 'rank'} dicts.
+    """
+    item_types = [item_type] if item_type in ITEM_MODELS else list(ITEM_MODELS)
+    match = _fts_query(q)
+    if not match:
+        return [], False
+
+    if _has_fts_index():
+        hits = _search_fts(school_id, match, item_types, status, limit + 1, offset)
+    else:
+        hits = _search_like(school_id, q, item_types, status, limit + 1, offset)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+
+    # Load the matched rows and their owners in a fixed number of queries
+    items = {}
+    for t in item_types:
+        ids = [item_id for hit_type, item_id, _ in hits if hit_type == t]
+        if ids:
+            model = ITEM_MODELS[t]
+            items[t] = {row.id: row for row in model.query.filter(model.id.in_(ids)).all()}
+    user_ids = {row.user_id for rows in items.values() for row in rows.values()}
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids)).all()} if user_ids else {}
+
+    results = []
+    for hit_type, item_id, rank in hits:
+        row = items.get(hit_type, {}).get(item_id)
+        if row:
+            results.append({'type': hit_type, 'item': row.to_dict(users), 'rank': rank})
+    return results, has_more
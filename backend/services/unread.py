@@ -0,0 +1,64 @@
+from models import db, Message, UnreadCount
+from services.db_routing import use_primary
+from sqlalchemy import case, update
+from sqlalchemy.exc import IntegrityError
+
+def increment_unread(user_id, claim_id, amount=1):
+    """Bump a receiver's unread counter for a claim; the caller commits"""
+    if _add_to_count(user_id, claim_id, amount):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(UnreadCount(user_id=user_id, claim_id=claim_id, count=amount))
+    except IntegrityError:
+        # Another request created the row first
+        _add_to_count(user_id, claim_id, amount)
+
+def _add_to_count(user_id, claim_id, amount):
+    new_count = UnreadCount.count + amount
+    result = db.session.execute(
+        update(UnreadCount)
+        .where(UnreadCount.user_id == user_id, UnreadCount.claim_id == claim_id)
+        .values(count=case((new_count < 0, 0), else_=new_count))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+def mark_claim_read(user_id, claim_id):
+    """
+    Mark every message the user received in a claim as read with one UPDATE.
+    Commits only when something changed; returns the number of messages marked.
+    """
+    # The counter says whether there is anything to mark, so steady-state polls never write.
+    # Read it from the primary: a lagging replica would skip messages that are still unread
+    with use_primary():
+        unread = db.session.query(UnreadCount.count).filter_by(user_id=user_id, claim_id=claim_id).scalar()
+    if not unread:
+        return 0
+    result = db.session.execute(
+        update(Message)
+        .where(Message.receiver_id == user_id, Message.claim_id == claim_id, Message.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    marked = result.rowcount
+    if marked:
+        _add_to_count(user_id, claim_id, -marked)
+    else:
+        # The counter had drifted; reset it so later polls skip the UPDATE again
+        db.session.execute(
+            update(UnreadCount)
+            .where(UnreadCount.user_id == user_id, UnreadCount.claim_id == claim_id)
+            .values(count=0)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return marked
+
+def get_unread_counts(user_id):
+    """{claim_id: unread} for claims with unread messages, from the counter table"""
+    rows = db.session.query(UnreadCount.claim_id, UnreadCount.count).filter(
+        UnreadCount.user_id == user_id,
+        UnreadCount.count > 0
+    ).all()
+    return {claim_id: count for claim_id, count in rows}
@@ -0,0 +1,101 @@
+import os
+
+# Keep the AI helpers from waiting on a real Ollama server
+os.environ.setdefault('OLLAMA_HOST', 'http://127.0.0.1:9')
+os.environ.setdefault('OLLAMA_TIMEOUT', '1')
+
+import pytest
+from config import Config
+from app import create_app
+from models import db, qr_code_pool, join_code_pool
+from services import claim_participants, qr_lookup, points, db_routing, chat_sessions, rate_limit, message_bus
+
+def _reset_worker_state():
+    """Per-process caches would otherwise leak rows (and reused ids) between test databases"""
+    claim_participants._participants.clear()
+    qr_lookup.invalidate_qr()
+    points._leaderboards.clear()
+    db_routing._recent_writes.clear()
+    chat_sessions._sessions.clear()
+    message_bus._subscribers.clear()
+    qr_code_pool.codes.clear()
+    join_code_pool.codes.clear()
+    rate_limit.set_backend(rate_limit.MemoryBackend())
+
+@pytest.fixture
+def replica_url():
+    """DATABASE_REPLICA_URL for the app; override in a test module to add a replica"""
+    return None
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, replica_url):
+    monkeypatch.chdir(tmp_path)  # Uploads and rendered QR codes go under instance/
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, 'DATABASE_REPLICA_URL', replica_url)
+    _reset_worker_state()
+    app = create_app()
+    app.testing = True
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    _reset_worker_state()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def auth(client, email, password):
+    r = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert r.status_code == 200, r.get_json()
+    return {'Authorization': f"Bearer {r.get_json()['access_token']}"}
+
+def signup(client, join_code, name):
+    r = client.post('/api/auth/signup', json={
+        'email': f'{name}@example.com', 'password': 'password123',
+        'firstName': name.title(), 'lastName': 'Student', 'joinCode': join_code
+    })
+    assert r.status_code == 201, r.get_json()
+    return {'Authorization': f"Bearer {r.get_json()['access_token']}"}
+
+@pytest.fixture
+def school(client):
+    """A school with an owner of lost items and a finder: their auth headers, plus the join code"""
+    admin = auth(client, 'admin@reunite.com', 'admin123')
+    r = client.post('/api/admin/create-school', json={'name': 'Test School'}, headers=admin)
+    assert r.status_code == 201, r.get_json()
+    join_code = r.get_json()['school']['join_code']
+    return {
+        'admin': admin,
+        'owner': signup(client, join_code, 'owner'),
+        'finder': signup(client, join_code, 'finder'),
+        'join_code': join_code,
+    }
+
+def post_lost_item(client, headers, title='Black iPhone', **fields):
+    data = {'title': title, 'description': 'black apple iphone in a case', 'category': 'phone',
+            'color': 'black', 'brand': 'Apple', 'unique_traits': 'cracked corner', **fields}
+    r = client.post('/api/items/lost', data=data, headers=headers)
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['item']
+
+def post_found_item(client, headers, title='Black iPhone found', **fields):
+    data = {'title': title, 'description': 'black apple iphone in a case', 'category': 'phone',
+            'color': 'black', 'brand': 'Apple', **fields}
+    r = client.post('/api/items/found', data=data, headers=headers)
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['item']
+
+@pytest.fixture
+def claim_id(client, school):
+    """A claim by the owner on the finder's item"""
+    lost = post_lost_item(client, school['owner'])
+    found = post_found_item(client, school['finder'])
+    r = client.post('/api/claims/create', json={'lost_item_id': lost['id'], 'found_item_id': found['id']},
+                    headers=school['owner'])
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['claim']['id']
+
+def query_count(response):
+    return int(response.headers['X-Query-Count'])
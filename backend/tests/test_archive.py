@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from models import db, LostItem, FoundItem, Match, Claim, Message, UnreadCount, ARCHIVE_TABLES
+from services.archive import archive_closed_items
+from conftest import post_lost_item, post_found_item
+
+RETENTION_DAYS = 180
+
+def returned_item(client, school, title='Black iPhone'):
+    """A lost item matched, claimed, discussed and approved: both items end up closed"""
+    lost = post_lost_item(client, school['owner'], title=title)
+    found = post_found_item(client, school['finder'], title=f'{title} found')
+    r = client.post('/api/claims/create', json={'lost_item_id': lost['id'], 'found_item_id': found['id']},
+                    headers=school['owner'])
+    assert r.status_code == 201, r.get_json()
+    claim_id = r.get_json()['claim']['id']
+    r = client.post('/api/messages/send', json={'claim_id': claim_id, 'content': 'Found your phone'},
+                    headers=school['finder'])
+    assert r.status_code == 201, r.get_json()
+    r = client.post(f'/api/claims/approve/{claim_id}', headers=school['finder'])
+    assert r.status_code == 200, r.get_json()
+    return lost['id'], found['id'], claim_id
+
+def close_days_ago(days, *models):
+    for model in models:
+        db.session.execute(db.update(model).values(updated_at=datetime.utcnow() - timedelta(days=days)))
+    db.session.commit()
+
+def count(model, **filters):
+    hot = db.session.query(model).filter_by(**filters).count()
+    table = ARCHIVE_TABLES[model]
+    archived = db.session.execute(
+        db.select(db.func.count()).select_from(table).where(*[table.c[k] == v for k, v in filters.items()])
+    ).scalar()
+    return hot, archived
+
+def test_status_change_bumps_updated_at(app, client, school):
+    lost = post_lost_item(client, school['owner'])
+    with app.app_context():
+        db.session.execute(db.update(LostItem).values(updated_at=datetime(2020, 1, 1)))
+        db.session.commit()
+        item = db.session.get(LostItem, lost['id'])
+        item.status = 'closed'
+        db.session.commit()
+        assert item.updated_at > datetime.utcnow() - timedelta(minutes=1)
+
+def test_closed_items_move_with_their_children(app, client, school):
+    lost_id, found_id, claim_id = returned_item(client, school)
+    with app.app_context():
+        close_days_ago(RETENTION_DAYS + 1, LostItem, FoundItem)
+        totals = archive_closed_items(RETENTION_DAYS)
+        assert totals == {'lost_items': 1, 'found_items': 1}
+        assert count(LostItem, id=lost_id) == (0, 1)
+        assert count(FoundItem, id=found_id) == (0, 1)
+        assert count(Claim, id=claim_id) == (0, 1)
+        assert count(Message, claim_id=claim_id) == (0, 1)
+        assert count(Match, lost_item_id=lost_id) == (0, 1)
+        assert UnreadCount.query.filter_by(claim_id=claim_id).count() == 0
+
+    r = client.get('/api/items/lost', headers=school['owner'])
+    assert r.get_json()['items'] == []
+    r = client.get('/api/items/lost', query_string={'include_archived': 1}, headers=school['owner'])
+    assert [item['id'] for item in r.get_json()['items']] == [lost_id]
+    r = client.get('/api/claims/my-claims', query_string={'include_archived': 1}, headers=school['owner'])
+    assert [claim['id'] for claim in r.get_json()['claims']] == [claim_id]
+    r = client.get(f'/api/messages/claim/{claim_id}', query_string={'include_archived': 1}, headers=school['owner'])
+    assert [message['content'] for message in r.get_json()['messages']] == ['Found your phone']
+
+def test_retention_counts_from_close_not_creation(app, client, school):
+    returned_item(client, school)
+    with app.app_context():
+        # Reported long ago but only just returned
+        db.session.execute(db.update(LostItem).values(created_at=datetime.utcnow() - timedelta(days=400)))
+        db.session.commit()
+        assert archive_closed_items(RETENTION_DAYS) == {'lost_items': 0, 'found_items': 0}
+
+def test_open_and_qr_linked_items_stay_hot(app, client, school):
+    open_item = post_lost_item(client, school['owner'], title='Blue umbrella')
+    lost_id, _, _ = returned_item(client, school)
+    r = client.post('/api/qr-codes/create', json={'lost_item_id': lost_id}, headers=school['owner'])
+    assert r.status_code == 201
+    with app.app_context():
+        close_days_ago(RETENTION_DAYS + 1, LostItem)
+        assert archive_closed_items(RETENTION_DAYS)['lost_items'] == 0
+        assert count(LostItem, id=open_item['id']) == (1, 0)
+        assert count(LostItem, id=lost_id) == (1, 0)
+
+def test_archived_ids_are_not_reused(app, client, school):
+    lost_id, found_id, claim_id = returned_item(client, school)
+    with app.app_context():
+        close_days_ago(RETENTION_DAYS + 1, LostItem, FoundItem)
+        archive_closed_items(RETENTION_DAYS)
+
+    # The archived rows were the newest, so plain SQLite rowids would hand these ids out again
+    new_lost_id, new_found_id, new_claim_id = returned_item(client, school, title='Red wallet')
+    assert new_lost_id > lost_id
+    assert new_found_id > found_id
+    assert new_claim_id > claim_id
+    with app.app_context():
+        close_days_ago(RETENTION_DAYS + 1, LostItem, FoundItem)
+        assert archive_closed_items(RETENTION_DAYS) == {'lost_items': 1, 'found_items': 1}
+
+def test_include_archived_pages_across_both_tables(app, client, school):
+    archived_ids = [returned_item(client, school, title=f'Phone {i}')[0] for i in range(3)]
+    with app.app_context():
+        close_days_ago(RETENTION_DAYS + 1, LostItem, FoundItem)
+        archive_closed_items(RETENTION_DAYS)
+    hot_ids = [post_lost_item(client, school['owner'], title=f'Keys {i}')['id'] for i in range(3)]
+
+    seen, cursor = [], None
+    while True:
+        query = {'include_archived': 1, 'limit': 2, **({'cursor': cursor} if cursor else {})}
+        data = client.get('/api/items/lost', query_string=query, headers=school['owner']).get_json()
+        seen += [item['id'] for item in data['items']]
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert seen == sorted(archived_ids + hot_ids, reverse=True)
@@ -0,0 +1,57 @@
+import pytest
+from routes import chat
+from services import chat_sessions
+
+@pytest.fixture
+def prompts(monkeypatch):
+    """Messages arrays sent to the model; every reply echoes the last message"""
+    sent = []
+
+    def fake_chat(model, messages):
+        sent.append(messages)
+        return {'message': {'content': f"echo: {messages[-1]['content']}"}}
+
+    monkeypatch.setattr(chat, '_chat', fake_chat)
+    return sent
+
+def send(client, headers, message, **fields):
+    return client.post('/api/chat/message', json={'message': message, **fields}, headers=headers)
+
+def test_session_keeps_history_server_side(client, school, prompts):
+    r = send(client, school['owner'], 'where do I report a lost phone?')
+    assert r.status_code == 200, r.get_json()
+    session_id = r.get_json()['session_id']
+
+    r = send(client, school['owner'], 'and a found one?', session_id=session_id)
+    assert r.status_code == 200, r.get_json()
+    assert r.get_json()['session_id'] == session_id
+    assert [m['content'] for m in prompts[-1][1:]] == [
+        'where do I report a lost phone?', 'echo: where do I report a lost phone?', 'and a found one?']
+
+def test_unknown_session_asks_for_history_once(client, school, prompts):
+    r = send(client, school['owner'], 'hello again', session_id='gone')
+    assert r.status_code == 404
+    assert r.get_json()['session_expired'] is True
+    assert not prompts
+
+    history = [{'role': 'user', 'content': 'earlier question'}, {'role': 'assistant', 'content': 'earlier answer'}]
+    r = send(client, school['owner'], 'hello again', history=history)
+    assert r.status_code == 200, r.get_json()
+    assert [m['content'] for m in prompts[-1][1:]] == ['earlier question', 'earlier answer', 'hello again']
+
+def test_sessions_are_private(client, school, prompts):
+    session_id = send(client, school['owner'], 'my secret').get_json()['session_id']
+    r = send(client, school['finder'], 'what did they say?', session_id=session_id)
+    assert r.status_code == 404
+
+def test_history_is_compacted_to_the_token_budget(monkeypatch):
+    monkeypatch.setattr(chat_sessions, 'TOKEN_BUDGET', 400)
+    session = chat_sessions.ChatSession('s', user_id=1)
+    for i in range(40):
+        session.add_turn('user' if i % 2 == 0 else 'assistant', f'turn {i} ' + 'words ' * 20)
+
+    messages = session.build_messages(pending='latest question')
+    assert sum(chat_sessions.estimate_tokens(m['content']) for m in messages) <= 400
+    assert 'Earlier in this conversation' in messages[0]['content']
+    assert messages[-2]['content'].startswith('turn 39')
+    assert messages[-1] == {'role': 'user', 'content': 'latest question'}
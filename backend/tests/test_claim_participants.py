@@ -0,0 +1,30 @@
+from sqlalchemy import text
+from models import db
+from services import claim_participants
+
+def send(client, headers, claim_id):
+    return client.post('/api/messages/send', json={'claim_id': claim_id, 'content': 'hello'}, headers=headers)
+
+def test_claims_deleted_by_other_workers_are_noticed_after_the_ttl(app, client, school, claim_id, monkeypatch):
+    assert send(client, school['owner'], claim_id).status_code == 201  # Cached here
+
+    # Deleted elsewhere: this worker's cache isn't told
+    with app.app_context():
+        db.session.execute(text("DELETE FROM unread_counts WHERE claim_id = :id"), {'id': claim_id})
+        db.session.execute(text("DELETE FROM messages WHERE claim_id = :id"), {'id': claim_id})
+        db.session.execute(text("DELETE FROM claims WHERE id = :id"), {'id': claim_id})
+        db.session.commit()
+
+    monkeypatch.setattr(claim_participants, 'PARTICIPANTS_TTL', 0)
+    assert send(client, school['owner'], claim_id).status_code == 404
+    assert claim_id not in claim_participants._participants
+
+def test_status_changes_are_picked_up_on_revalidation(app, client, school, claim_id, monkeypatch):
+    send(client, school['owner'], claim_id)  # Cached here
+    with app.app_context():
+        db.session.execute(text("UPDATE claims SET status = 'approved' WHERE id = :id"), {'id': claim_id})
+        db.session.commit()
+        assert claim_participants.get_participants(claim_id).status == 'pending'  # Still trusted
+
+        monkeypatch.setattr(claim_participants, 'PARTICIPANTS_TTL', 0)
+        assert claim_participants.get_participants(claim_id).status == 'approved'
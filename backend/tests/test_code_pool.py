@@ -0,0 +1,28 @@
+from models import qr_code_pool, join_code_pool
+
+def create_qr(client, headers):
+    return client.post('/api/qr-codes/create', json={}, headers=headers)
+
+def test_colliding_pooled_code_is_retried_with_a_fresh_one(client, school):
+    taken = create_qr(client, school['owner']).get_json()['qr_code']['code']
+
+    # Another worker inserted this code after our pool checked it
+    qr_code_pool.codes.appendleft(taken)
+    r = create_qr(client, school['owner'])
+    assert r.status_code == 201, r.get_json()
+    assert r.get_json()['qr_code']['code'] != taken
+
+def test_retries_are_bounded(client, school):
+    taken = create_qr(client, school['owner']).get_json()['qr_code']['code']
+    qr_code_pool.codes.clear()
+    qr_code_pool.codes.extend([taken] * 3)
+    assert create_qr(client, school['owner']).status_code == 500
+    # The next request gets a working code again
+    assert create_qr(client, school['owner']).status_code == 201
+
+def test_refills_skip_codes_already_in_use(app, client, school, monkeypatch):
+    join_code = school['join_code']
+    monkeypatch.setattr(join_code_pool, '_candidates', lambda count: {join_code, 'FRESH1'})
+    with app.app_context():
+        join_code_pool.codes.clear()
+        assert join_code_pool.take() == 'FRESH1'
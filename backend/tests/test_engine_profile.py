@@ -0,0 +1,32 @@
+from config import Config
+from models import db
+from services.engine_profile import engine_options
+
+def pragma(name):
+    return db.session.execute(db.text(f'PRAGMA {name}')).scalar()
+
+def test_tuned_sqlite_connections_get_wal_and_pragmas(app):
+    with app.app_context():
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('busy_timeout') == Config.SQLITE_BUSY_TIMEOUT_MS
+        assert pragma('cache_size') == -Config.SQLITE_CACHE_SIZE_KB
+        assert db.engine.pool.size() == Config.DB_POOL_SIZE
+
+def test_default_profile_leaves_sqlite_alone(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'DB_ENGINE_PROFILE', 'default')
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'default.db'}")
+    from app import create_app
+    default_app = create_app()
+    with default_app.app_context():
+        assert pragma('journal_mode') == 'delete'
+        db.session.remove()
+        db.engine.dispose()
+
+def test_server_databases_get_pool_settings():
+    config = {'DB_ENGINE_PROFILE': 'tuned', 'DB_POOL_SIZE': 7, 'DB_MAX_OVERFLOW': 3, 'DB_POOL_RECYCLE': 600}
+    assert engine_options(config, 'postgresql://db.example/reunite') == {
+        'pool_size': 7, 'max_overflow': 3, 'pool_pre_ping': True, 'pool_recycle': 600
+    }
+    assert engine_options(config, 'sqlite://') == {}
+    assert engine_options({**config, 'DB_ENGINE_PROFILE': 'default'}, 'postgresql://db.example/reunite') == {}
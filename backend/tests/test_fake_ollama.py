@@ -0,0 +1,22 @@
+import json
+import pytest
+import fake_ollama
+
+CHAT = [{'role': 'user', 'content': 'How do I report a lost phone?'}]
+SIMILARITY = [{'role': 'user', 'content': 'Compare these photos. Return JSON: {"match_confidence": 0-100}'}]
+ANALYSIS = [{'role': 'user', 'content': 'Describe this item. Return JSON: {"extraction": {}, "descriptor": {}}'}]
+
+def test_response_file_only_overrides_its_prompt_kinds(tmp_path, monkeypatch):
+    path = tmp_path / 'responses.json'
+    path.write_text(json.dumps({'chat': 'Try the front office.'}))
+    monkeypatch.setattr(fake_ollama.Settings, 'responses', fake_ollama.load_responses(path))
+
+    assert fake_ollama.build_reply(CHAT) == 'Try the front office.'
+    assert json.loads(fake_ollama.build_reply(SIMILARITY)) == fake_ollama.CANNED_SIMILARITY
+    assert set(json.loads(fake_ollama.build_reply(ANALYSIS))) == {'extraction', 'descriptor'}
+
+def test_response_file_rejects_unknown_kinds(tmp_path):
+    path = tmp_path / 'responses.json'
+    path.write_text(json.dumps({'reply': 'hello'}))
+    with pytest.raises(SystemExit, match='reply'):
+        fake_ollama.load_responses(path)
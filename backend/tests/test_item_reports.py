@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import event
+from conftest import post_lost_item, post_found_item
+from models import db
+from routes import items
+
+@pytest.fixture
+def commits():
+    """Number of commits since the test started, not counting released savepoints"""
+    count = [0]
+
+    def counted(session):
+        if not session.in_nested_transaction():
+            count[0] += 1
+
+    event.listen(db.session, 'after_commit', counted)
+    yield count
+    event.remove(db.session, 'after_commit', counted)
+
+def listing(client, headers, path):
+    return client.get(path, headers=headers).get_json()
+
+def test_reports_commit_item_matches_and_points_once(client, school, commits):
+    post_found_item(client, school['finder'])
+    commits[0] = 0
+    post_lost_item(client, school['owner'])
+    assert commits[0] == 1
+    assert len(listing(client, school['owner'], '/api/items/matches')['matches']) == 1
+    assert listing(client, school['owner'], '/api/rewards/my-points')['total_points'] == 10
+
+def test_a_failure_leaves_nothing_half_written(client, school, monkeypatch):
+    post_found_item(client, school['finder'])
+
+    def broken_award(*args, **kwargs):
+        raise RuntimeError('points service down')
+
+    monkeypatch.setattr(items, 'award_points', broken_award)
+    r = client.post('/api/items/lost', headers=school['owner'], data={
+        'title': 'Black iPhone', 'description': 'black apple iphone in a case', 'category': 'phone',
+        'color': 'black', 'brand': 'Apple', 'unique_traits': 'cracked corner'})
+    assert r.status_code == 500
+
+    assert listing(client, school['owner'], '/api/items/lost?mine=1')['items'] == []
+    assert listing(client, school['owner'], '/api/items/matches')['matches'] == []
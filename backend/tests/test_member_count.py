@@ -0,0 +1,41 @@
+from conftest import signup, query_count
+
+def member_count(client, headers):
+    r = client.get('/api/student/my-school', headers=headers)
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()['school']['member_count']
+
+def test_member_count_follows_signups_leaves_and_joins(client, school):
+    assert member_count(client, school['owner']) == 2
+
+    student = signup(client, school['join_code'], 'student')
+    assert member_count(client, school['owner']) == 3
+
+    r = client.post('/api/student/leave-school', headers=student)
+    assert r.status_code == 200, r.get_json()
+    assert member_count(client, school['owner']) == 2
+
+    r = client.post('/api/student/join-school', json={'join_code': school['join_code']}, headers=student)
+    assert r.status_code == 200, r.get_json()
+    assert r.get_json()['school']['member_count'] == 3
+
+    # Rejected joins don't count
+    r = client.post('/api/student/join-school', json={'join_code': school['join_code']}, headers=student)
+    assert r.status_code == 400
+    assert member_count(client, school['owner']) == 3
+
+def test_school_listing_does_not_count_members_per_school(client, school):
+    admin = school['admin']
+    r = client.post('/api/admin/create-school', json={'name': 'Second School'}, headers=admin)
+    second = r.get_json()['school']['join_code']
+    signup(client, second, 'second')
+
+    few = query_count(client.get('/api/admin/schools', headers=admin))
+    for i in range(5):
+        r = client.post('/api/admin/create-school', json={'name': f'School {i}'}, headers=admin)
+        signup(client, r.get_json()['school']['join_code'], f'member{i}')
+
+    r = client.get('/api/admin/schools', headers=admin)
+    assert {s['name']: s['member_count'] for s in r.get_json()['schools']} == {
+        'Test School': 2, 'Second School': 1, **{f'School {i}': 1 for i in range(5)}}
+    assert query_count(r) <= few
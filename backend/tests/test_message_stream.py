@@ -0,0 +1,92 @@
+import pytest
+from config import Config
+from models import db, Message
+from services import message_bus
+
+@pytest.fixture
+def short_streams(monkeypatch):
+    monkeypatch.setattr(Config, 'SSE_KEEPALIVE_SECONDS', 0.2)
+    monkeypatch.setattr(Config, 'SSE_MAX_STREAM_SECONDS', 1)
+    monkeypatch.setattr(Config, 'SSE_POLL_SECONDS', 0.05)
+
+def send(client, headers, claim_id, content):
+    r = client.post('/api/messages/send', json={'claim_id': claim_id, 'content': content}, headers=headers)
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['message_data']
+
+def stream_token(client, headers, claim_id):
+    r = client.post(f'/api/messages/claim/{claim_id}/stream-token', headers=headers)
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()['token']
+
+def open_stream(client, headers, claim_id, **params):
+    token = stream_token(client, headers, claim_id)
+    r = client.get(f'/api/messages/claim/{claim_id}/stream', query_string={'token': token, **params},
+                   buffered=False)
+    assert r.status_code == 200, r.get_json()
+    return r, iter(r.response)
+
+def next_event(chunks):
+    """Next message event's data line, skipping keepalives"""
+    for chunk in chunks:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('id: '):
+            return chunk.split('data: ', 1)[1].strip()
+    return None
+
+def test_stream_replays_then_delivers_each_message_once(client, school, claim_id, short_streams):
+    first = send(client, school['owner'], claim_id, 'Is this your phone?')
+    r, chunks = open_stream(client, school['finder'], claim_id, after_id=0)
+    assert f'"id": {first["id"]}' in next_event(chunks)
+
+    # Delivered by the send right away and again by the poller; the stream sends it once
+    second = send(client, school['finder'], claim_id, 'Yes, it is')
+    assert f'"id": {second["id"]}' in next_event(chunks)
+    assert next_event(chunks) is None  # Only keepalives until the stream ends
+    r.close()
+    assert message_bus.subscriber_count() == 0
+
+def test_messages_from_other_workers_reach_open_streams(app, client, school, claim_id, short_streams):
+    subscription = message_bus.subscribe(claim_id)
+    assert subscription.get(timeout=0.2) is None
+
+    # Written straight to the database, as another worker would, without publishing here
+    with app.app_context():
+        sender = send(client, school['owner'], claim_id, 'warm up')  # Sets up sender and receiver ids
+        db.session.add(Message(claim_id=claim_id, sender_id=sender['receiver_id'],
+                               receiver_id=sender['sender_id'], content='from another worker'))
+        db.session.commit()
+
+    contents = []
+    while 'from another worker' not in contents:
+        message = subscription.get(timeout=2)
+        assert message is not None
+        contents.append(message['content'])
+    message_bus.unsubscribe(subscription)
+
+def test_slow_streams_are_dropped(claim_id):
+    subscription = message_bus.subscribe(claim_id)
+    for i in range(message_bus.SUBSCRIBER_QUEUE_SIZE + 1):
+        message_bus.publish(claim_id, {'id': i})
+    assert subscription.dropped
+    assert message_bus.subscriber_count() == 0
+
+def test_stream_tokens_are_scoped_to_a_claim(client, school, claim_id, short_streams):
+    token = stream_token(client, school['owner'], claim_id)
+    path = f'/api/messages/claim/{claim_id}/stream'
+
+    assert client.get(path).status_code == 401
+    assert client.get(path, query_string={'token': token + 'x'}).status_code == 401
+    assert client.get(f'/api/messages/claim/{claim_id + 1}/stream', query_string={'token': token}).status_code == 403
+    # The access token is no longer accepted in the URL
+    jwt = school['owner']['Authorization'].split()[1]
+    assert client.get(path, query_string={'jwt': jwt}).status_code == 401
+
+    r = client.post(f'/api/messages/claim/{claim_id}/stream-token', headers=school['admin'])
+    assert r.status_code == 403
+
+def test_stream_tokens_expire(client, school, claim_id, monkeypatch):
+    token = stream_token(client, school['owner'], claim_id)
+    monkeypatch.setattr(Config, 'SSE_TOKEN_SECONDS', -1)
+    r = client.get(f'/api/messages/claim/{claim_id}/stream', query_string={'token': token})
+    assert r.status_code == 401
@@ -0,0 +1,31 @@
+def send_many(client, school, claim_id, count):
+    ids = []
+    for i in range(count):
+        sender = school['finder'] if i % 2 else school['owner']
+        r = client.post('/api/messages/send', json={'claim_id': claim_id, 'content': f'message {i}'}, headers=sender)
+        assert r.status_code == 201, r.get_json()
+        ids.append(r.get_json()['message_data']['id'])
+    return ids
+
+def fetch(client, headers, claim_id, **params):
+    r = client.get(f'/api/messages/claim/{claim_id}', query_string=params, headers=headers)
+    assert r.status_code == 200, r.get_json()
+    data = r.get_json()
+    return [m['id'] for m in data['messages']], data['has_more']
+
+def test_latest_page_then_older_pages(client, school, claim_id):
+    ids = send_many(client, school, claim_id, 7)
+    assert fetch(client, school['owner'], claim_id, limit=3) == (ids[4:], True)
+    assert fetch(client, school['owner'], claim_id, limit=3, before_id=ids[4]) == (ids[1:4], True)
+    assert fetch(client, school['owner'], claim_id, limit=3, before_id=ids[1]) == (ids[:1], False)
+
+def test_after_id_returns_only_newer_messages(client, school, claim_id):
+    ids = send_many(client, school, claim_id, 5)
+    assert fetch(client, school['owner'], claim_id, after_id=ids[1], limit=2) == (ids[2:4], True)
+    assert fetch(client, school['owner'], claim_id, after_id=ids[-1]) == ([], False)
+
+def test_bad_cursors_and_outsiders_are_rejected(client, school, claim_id):
+    r = client.get(f'/api/messages/claim/{claim_id}', query_string={'after_id': 'x'}, headers=school['owner'])
+    assert r.status_code == 400
+    r = client.get(f'/api/messages/claim/{claim_id}', headers=school['admin'])
+    assert r.status_code == 403
@@ -0,0 +1,124 @@
+import threading
+import pytest
+import sqlalchemy
+from sqlalchemy import inspect, text
+import migrations
+from migrations import MIGRATIONS, run_migrations
+from models import db
+from conftest import post_lost_item
+
+LATEST = max(version for version, _, _ in MIGRATIONS)
+
+def applied_versions():
+    return [row[0] for row in db.session.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+def table_sql(name):
+    return db.session.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': name}
+    ).scalar()
+
+def downgrade_lost_items():
+    """
+    Put lost_items back the way databases from before migrations 7 and 8 have
+    it: no updated_at, and an id SQLite may reuse. Indexes and triggers are kept.
+    """
+    with db.engine.begin() as conn:
+        dependents = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+            "AND tbl_name = 'lost_items' AND sql IS NOT NULL AND name != 'ix_lost_items_status_updated'"
+        )).scalars().all()
+        conn.execute(text("DROP INDEX ix_lost_items_status_updated"))
+        conn.execute(text("ALTER TABLE lost_items DROP COLUMN updated_at"))
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'lost_items'")).scalar()
+        columns = ', '.join(c['name'] for c in inspect(conn).get_columns('lost_items'))
+        conn.execute(text(sql.replace('"lost_items"', 'lost_items').replace(
+            'CREATE TABLE lost_items', 'CREATE TABLE legacy_lost_items').replace(' AUTOINCREMENT', '')))
+        conn.execute(text(f"INSERT INTO legacy_lost_items ({columns}) SELECT {columns} FROM lost_items"))
+        conn.execute(text("DROP TABLE lost_items"))
+        conn.execute(text("ALTER TABLE legacy_lost_items RENAME TO lost_items"))
+        for statement in dependents:
+            conn.execute(text(statement))
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'lost_items'"))
+        conn.execute(text("DELETE FROM schema_migrations WHERE version >= 7"))
+
+def test_fresh_database_records_every_migration(app):
+    with app.app_context():
+        assert applied_versions() == sorted(version for version, _, _ in MIGRATIONS)
+        assert run_migrations(db) == []
+        assert 'AUTOINCREMENT' in table_sql('lost_items')
+
+def test_upgrade_keeps_rows_indexes_and_search(app, client, school):
+    item = post_lost_item(client, school['owner'], title='Green backpack')
+    with app.app_context():
+        downgrade_lost_items()
+        assert 'AUTOINCREMENT' not in table_sql('lost_items')
+
+        assert run_migrations(db) == [7, 8]
+        assert 'AUTOINCREMENT' in table_sql('lost_items')
+        updated_at = db.session.execute(
+            text("SELECT updated_at FROM lost_items WHERE id = :id"), {'id': item['id']}
+        ).scalar()
+        assert updated_at is not None
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('lost_items')}
+        assert {'ix_lost_items_school_status', 'ix_lost_items_status_updated'} <= indexes
+        assert applied_versions()[-1] == LATEST
+
+    r = client.get('/api/items/search', query_string={'q': 'backpack'}, headers=school['owner'])
+    assert [result['item']['id'] for result in r.get_json()['results']] == [item['id']]
+    # New rows still reach the search index through the recreated triggers
+    newer = post_lost_item(client, school['owner'], title='Green bottle')
+    r = client.get('/api/items/search', query_string={'q': 'bottle'}, headers=school['owner'])
+    assert [result['item']['id'] for result in r.get_json()['results']] == [newer['id']]
+
+def test_concurrent_runners_apply_each_migration_once(app, client, school):
+    post_lost_item(client, school['owner'])
+    with app.app_context():
+        downgrade_lost_items()
+
+    results, errors = [], []
+
+    def worker():
+        try:
+            with app.app_context():
+                results.append(run_migrations(db))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert errors == []
+    assert sorted(version for applied in results for version in applied) == [7, 8]
+
+def test_index_migrations_check_the_inspector(app):
+    """MySQL has no CREATE INDEX IF NOT EXISTS, so index migrations look before creating"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_claims_claimant"))
+            conn.execute(text("DELETE FROM schema_migrations WHERE version IN (1, 5)"))
+        statements = []
+        listen = lambda conn, cursor, statement, *args: statements.append(statement)
+        sqlalchemy.event.listen(db.engine, 'before_cursor_execute', listen)
+        try:
+            assert run_migrations(db) == [1, 5]
+        finally:
+            sqlalchemy.event.remove(db.engine, 'before_cursor_execute', listen)
+        assert [s for s in statements if s.startswith('CREATE INDEX')] == [
+            'CREATE INDEX ix_claims_claimant ON claims (claimant_id)']
+
+@pytest.fixture
+def no_fts5(monkeypatch):
+    """SQLite built without FTS5 (request it before `app`)"""
+    monkeypatch.setattr(migrations, '_fts5_available', lambda conn: False)
+
+def test_search_falls_back_to_like_without_fts5(no_fts5, app, client, school):
+    with app.app_context():
+        assert 4 in applied_versions()  # Recorded, so it isn't retried on every start
+        assert table_sql('items_fts') is None
+    item = post_lost_item(client, school['owner'], title='Green backpack')
+    post_lost_item(client, school['owner'], title='Red wallet')
+    r = client.get('/api/items/search', query_string={'q': 'backpack'}, headers=school['owner'])
+    assert r.status_code == 200, r.get_json()
+    assert [result['item']['id'] for result in r.get_json()['results']] == [item['id']]
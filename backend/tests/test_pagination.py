@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from models import db, Match, LostItem, FoundItem
+from services.pagination import encode_cursor, decode_cursor
+from conftest import post_lost_item, post_found_item
+
+def walk(client, path, headers, key, **params):
+    """Every row of a listing, following next_cursor page by page"""
+    rows, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        r = client.get(path, query_string=query, headers=headers)
+        assert r.status_code == 200, r.get_json()
+        data = r.get_json()
+        rows += data[key]
+        pages += 1
+        cursor = data['next_cursor']
+        if not cursor:
+            return rows, pages
+
+def test_cursor_round_trip():
+    row = SimpleNamespace(id=7, created_at=datetime(2024, 5, 1, 12, 30, 15, 123456), confidence_score=87.5)
+    assert decode_cursor(encode_cursor(row)) == (row.created_at, 7)
+    assert decode_cursor(encode_cursor(row, 'confidence_score'), numeric=True) == (87.5, 7)
+
+@pytest.mark.parametrize('cursor,numeric', [
+    ('not-a-cursor', False),
+    ('', False),
+    (encode_cursor(SimpleNamespace(id=1, created_at=datetime(2024, 1, 1))), True),  # Date where a number belongs
+    (encode_cursor(SimpleNamespace(id=1, score=True), 'score'), True),
+])
+def test_decode_rejects_malformed_cursors(cursor, numeric):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, numeric)
+
+def test_bad_cursor_is_a_400(client, school):
+    r = client.get('/api/items/lost', query_string={'cursor': 'garbage'}, headers=school['owner'])
+    assert r.status_code == 400
+
+def test_lost_items_page_newest_first_without_gaps(client, school):
+    ids = [post_lost_item(client, school['owner'], title=f'Wallet {i}')['id'] for i in range(7)]
+    rows, pages = walk(client, '/api/items/lost', school['owner'], 'items', limit=3)
+    assert [row['id'] for row in rows] == sorted(ids, reverse=True)
+    assert pages == 3
+
+def test_rows_sharing_a_timestamp_are_split_by_id(app, client, school):
+    ids = [post_lost_item(client, school['owner'], title=f'Keys {i}')['id'] for i in range(5)]
+    with app.app_context():
+        db.session.execute(db.update(LostItem).values(created_at=datetime(2024, 1, 1)))
+        db.session.commit()
+    rows, _ = walk(client, '/api/items/lost', school['owner'], 'items', limit=2)
+    assert [row['id'] for row in rows] == sorted(ids, reverse=True)
+
+def test_matches_page_by_confidence_best_first(app, client, school):
+    lost = post_lost_item(client, school['owner'])
+    found = post_found_item(client, school['finder'])
+    scores = [40, 90, 55, 90, 70, 31, 88]
+    with app.app_context():
+        db.session.execute(db.delete(Match))
+        db.session.execute(db.insert(Match), [
+            {'lost_item_id': lost['id'], 'found_item_id': found['id'], 'confidence_score': float(score),
+             'match_reasons': '[]'}
+            for score in scores
+        ])
+        db.session.commit()
+    rows, pages = walk(client, '/api/items/matches', school['owner'], 'matches', limit=2)
+    assert [row['confidence_score'] for row in rows] == sorted(scores, reverse=True)
+    assert len({row['id'] for row in rows}) == len(scores)
+    assert pages == 4
+
+def test_found_items_filter_by_status(app, client, school):
+    kept = post_found_item(client, school['finder'], title='Umbrella')
+    claimed = post_found_item(client, school['finder'], title='Scarf')
+    with app.app_context():
+        db.session.get(FoundItem, claimed['id']).status = 'claimed'
+        db.session.commit()
+    rows, _ = walk(client, '/api/items/found', school['owner'], 'items', status='available')
+    assert [row['id'] for row in rows] == [kept['id']]
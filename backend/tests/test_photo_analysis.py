@@ -0,0 +1,56 @@
+import io
+import pytest
+from PIL import Image
+import fake_ollama
+from services import gemini_service
+
+@pytest.fixture
+def vision_calls(monkeypatch):
+    """Prompts sent to the model, answered with fake_ollama's canned replies"""
+    calls = []
+
+    def chat(model, messages, **kwargs):
+        calls.append(messages[-1]['content'])
+        return {'message': {'content': fake_ollama.build_reply(messages)}}
+
+    monkeypatch.setattr(gemini_service.client, 'chat', chat)
+    return calls
+
+def photo(color='black'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, 'PNG')
+    buffer.seek(0)
+    return buffer, 'phone.png'
+
+def post_lost_with_photo(client, headers, description, color='black'):
+    r = client.post('/api/items/lost', headers=headers, content_type='multipart/form-data', data={
+        'title': 'Black iPhone', 'description': description, 'unique_traits': 'cracked corner',
+        'photo': photo(color)})
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['item']
+
+def test_one_combined_call_per_photo_and_context(client, school, vision_calls):
+    post_lost_with_photo(client, school['owner'], 'black iphone in a clear case')
+    assert len(vision_calls) == 1
+    assert '"extraction"' in vision_calls[0] and '"descriptor"' in vision_calls[0]
+
+    # Same image and description: the stored analysis is reused
+    post_lost_with_photo(client, school['owner'], 'black iphone in a clear case')
+    assert len(vision_calls) == 1
+
+    # A different image, or the same one checked against another description, needs the model
+    post_lost_with_photo(client, school['owner'], 'black iphone in a clear case', color='white')
+    post_lost_with_photo(client, school['owner'], 'phone with a red sticker')
+    assert len(vision_calls) == 3
+
+def test_placeholder_results_are_not_stored(client, school, monkeypatch):
+    calls = []
+
+    def unavailable(**kwargs):
+        calls.append(1)
+        raise ConnectionError('ollama down')
+
+    monkeypatch.setattr(gemini_service.client, 'chat', unavailable)
+    post_lost_with_photo(client, school['owner'], 'black iphone in a clear case')
+    post_lost_with_photo(client, school['owner'], 'black iphone in a clear case')
+    assert len(calls) == 2  # Retried rather than reusing the fallback
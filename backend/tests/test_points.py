@@ -0,0 +1,66 @@
+from conftest import signup, post_lost_item, post_found_item
+from models import db, User
+from services import points
+
+def leaderboard(client, headers):
+    r = client.get('/api/rewards/leaderboard', headers=headers)
+    assert r.status_code == 200, r.get_json()
+    return [(row['name'], row['points']) for row in r.get_json()['leaderboard']]
+
+def test_totals_and_leaderboard_follow_awards(client, school):
+    post_lost_item(client, school['owner'])
+    post_found_item(client, school['finder'])
+    post_found_item(client, school['finder'], title='Blue umbrella')
+    assert leaderboard(client, school['owner']) == [('Finder Student', 30), ('Owner Student', 10)]
+
+    # The cached leaderboard picks up later awards without reloading
+    post_lost_item(client, school['owner'], title='Red wallet')
+    post_lost_item(client, school['owner'], title='Grey scarf')
+    post_lost_item(client, school['owner'], title='Gold ring')
+    assert leaderboard(client, school['finder']) == [('Owner Student', 40), ('Finder Student', 30)]
+
+    r = client.get('/api/rewards/my-points', headers=school['owner'])
+    assert r.get_json()['total_points'] == 40
+    assert len(r.get_json()['rewards']) == 4
+
+def test_rolled_back_awards_leave_the_cache_alone(app, client, school):
+    post_found_item(client, school['finder'])
+    assert leaderboard(client, school['owner']) == [('Finder Student', 15)]
+
+    with app.app_context():
+        finder = User.query.filter_by(email='finder@example.com').first()
+        points.award_points(finder.id, finder.school_id, 100, 'Never committed')
+        db.session.rollback()
+
+    assert leaderboard(client, school['owner']) == [('Finder Student', 15)]
+
+def test_leaderboard_keeps_the_top_scorers(client, school, monkeypatch):
+    monkeypatch.setattr(points, 'LEADERBOARD_SIZE', 2)
+    post_lost_item(client, school['owner'])
+    post_found_item(client, school['finder'])
+    assert leaderboard(client, school['owner']) == [('Finder Student', 15), ('Owner Student', 10)]
+
+    # A newcomer outscoring the last entry replaces it in the cached top-N
+    newcomer = signup(client, school['join_code'], 'newcomer')
+    post_found_item(client, newcomer)
+    post_lost_item(client, newcomer)
+    assert leaderboard(client, school['owner']) == [('Newcomer Student', 25), ('Finder Student', 15)]
+
+def test_awards_wait_for_the_outer_commit(app, client, school):
+    post_found_item(client, school['finder'])
+    assert leaderboard(client, school['owner']) == [('Finder Student', 15)]
+
+    with app.app_context():
+        finder = User.query.filter_by(email='finder@example.com').first()
+        points.award_points(finder.id, finder.school_id, 5, 'Kept')
+        with db.session.begin_nested():
+            pass  # Releasing a savepoint does not commit the award
+        assert points.get_leaderboard(finder.school_id)[0][2] == 15
+        try:
+            with db.session.begin_nested():
+                raise ValueError
+        except ValueError:
+            pass  # Rolling one back keeps the awards made before it
+        db.session.commit()
+
+    assert leaderboard(client, school['owner']) == [('Finder Student', 20)]
@@ -0,0 +1,33 @@
+import os
+from services import qr_render
+
+def create_qr(client, headers):
+    r = client.post('/api/qr-codes/create', json={}, headers=headers)
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['qr_code']['code']
+
+def test_images_are_cached_and_revalidated(client, school, monkeypatch):
+    code = create_qr(client, school['owner'])
+    r = client.get(f'/api/qr-codes/image/{code}', query_string={'size': 250})
+    assert r.status_code == 200 and r.mimetype == 'image/png'
+    assert 'immutable' in r.headers['Cache-Control']
+    etag = r.headers['ETag'].strip('"')
+    assert os.path.exists(qr_render._disk_path(etag, 'png'))
+
+    # Sizes round to the same variant; a matching ETag is answered without rendering
+    monkeypatch.setattr(qr_render, 'render', None)
+    again = client.get(f'/api/qr-codes/image/{code}', query_string={'size': 256})
+    assert again.headers['ETag'] == r.headers['ETag'] and again.data == r.data
+    r = client.get(f'/api/qr-codes/image/{code}', query_string={'size': 250},
+                   headers={'If-None-Match': r.headers['ETag']})
+    assert r.status_code == 304 and r.data == b''
+
+def test_svg_and_invalid_variants(client, school):
+    code = create_qr(client, school['owner'])
+    r = client.get(f'/api/qr-codes/image/{code}', query_string={'format': 'svg', 'size': 512})
+    assert r.status_code == 200 and r.mimetype == 'image/svg+xml'
+    assert b'<svg' in r.data
+
+    assert client.get(f'/api/qr-codes/image/{code}', query_string={'format': 'gif'}).status_code == 400
+    assert client.get(f'/api/qr-codes/image/{code}', query_string={'size': 'big'}).status_code == 400
+    assert client.get('/api/qr-codes/image/NOSUCHCODE').status_code == 404
@@ -0,0 +1,22 @@
+from config import Config
+
+def test_landing_page_is_cacheable(client):
+    r = client.get('/qr/ABC123')
+    assert r.status_code == 200 and r.mimetype == 'text/html'
+    assert '"ABC123"' in r.get_data(as_text=True)
+    assert r.headers['Cache-Control'] == f'public, max-age={Config.QR_PAGE_MAX_AGE}'
+
+    again = client.get('/qr/ABC123', headers={'If-None-Match': r.headers['ETag']})
+    assert again.status_code == 304 and again.data == b''
+    # Each code gets its own page
+    assert client.get('/qr/XYZ789').headers['ETag'] != r.headers['ETag']
+
+def test_codes_are_escaped_into_the_page(client):
+    html = client.get('/qr/</script><b>').get_data(as_text=True)
+    assert '</script><b>' not in html
+
+def test_render_qr_page_writes_a_page_for_every_code(app, tmp_path):
+    result = app.test_cli_runner().invoke(args=['render-qr-page', str(tmp_path / 'page.html')])
+    assert result.exit_code == 0, result.output
+    html = (tmp_path / 'page.html').read_text(encoding='utf-8')
+    assert 'const code = null ||' in html
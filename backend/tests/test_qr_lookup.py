@@ -0,0 +1,83 @@
+from conftest import post_lost_item, query_count
+from models import db, User, LostItem
+from services import qr_lookup
+
+def scan(client, code):
+    return client.get(f'/api/qr-codes/{code}')
+
+def create_qr(client, headers, **fields):
+    r = client.post('/api/qr-codes/create', json=fields, headers=headers)
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['qr_code']['code']
+
+def test_repeat_scans_are_served_from_memory(client, school):
+    code = create_qr(client, school['owner'])
+    assert query_count(scan(client, code)) > 0
+    r = scan(client, code)
+    assert r.get_json()['owner_name'] == 'Owner Student'
+    assert query_count(r) == 0
+
+def test_commits_drop_dependent_entries(app, client, school):
+    item = post_lost_item(client, school['owner'], title='Green backpack')
+    code = create_qr(client, school['owner'], lost_item_id=item['id'])
+    assert scan(client, code).get_json()['lost_item']['status'] == 'active'
+
+    with app.app_context():
+        db.session.get(LostItem, item['id']).status = 'found'
+        db.session.commit()
+    assert scan(client, code).get_json()['lost_item']['status'] == 'found'
+
+    with app.app_context():
+        db.session.query(User).filter_by(email='owner@example.com').one().first_name = 'Renamed'
+        db.session.commit()
+    assert scan(client, code).get_json()['owner_name'] == 'Renamed Student'
+
+    r = client.get('/api/qr-codes/my-codes', headers=school['owner'])
+    qr_id = r.get_json()['qr_codes'][0]['id']
+    assert client.delete(f'/api/qr-codes/{qr_id}', headers=school['owner']).status_code == 200
+    assert scan(client, code).status_code == 404
+
+def test_rolled_back_changes_keep_the_entry(app, client, school):
+    code = create_qr(client, school['owner'])
+    scan(client, code)
+    with app.app_context():
+        db.session.query(User).filter_by(email='owner@example.com').one().first_name = 'Renamed'
+        db.session.flush()
+        db.session.rollback()
+    r = scan(client, code)
+    assert r.get_json()['owner_name'] == 'Owner Student'
+    assert query_count(r) == 0
+
+def test_a_miss_that_overlaps_an_invalidation_is_not_cached(client, school, monkeypatch):
+    code = create_qr(client, school['owner'])
+    load = qr_lookup._load
+
+    def load_then_invalidate(code):
+        loaded = load(code)
+        qr_lookup.invalidate_qr(user_id=0)  # A commit elsewhere lands while this miss is loading
+        return loaded
+
+    monkeypatch.setattr(qr_lookup, '_load', load_then_invalidate)
+    assert scan(client, code).status_code == 200
+    assert code not in qr_lookup._payloads
+
+def test_invalidations_wait_for_the_outer_commit(app, client, school):
+    item = post_lost_item(client, school['owner'], title='Green backpack')
+    code = create_qr(client, school['owner'], lost_item_id=item['id'])
+    scan(client, code)
+
+    with app.app_context():
+        db.session.get(LostItem, item['id']).status = 'found'
+        db.session.flush()
+        try:
+            with db.session.begin_nested():
+                raise ValueError
+        except ValueError:
+            pass  # Rolling back a savepoint keeps the change flushed before it
+        with db.session.begin_nested():
+            pass
+        # Releasing a savepoint does not commit the change, so other readers keep the cached row
+        assert code in qr_lookup._payloads
+        db.session.commit()
+
+    assert scan(client, code).get_json()['lost_item']['status'] == 'found'
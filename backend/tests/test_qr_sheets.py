@@ -0,0 +1,30 @@
+import io
+from PIL import Image
+from services import qr_render
+
+def batch(client, headers, **fields):
+    return client.post('/api/qr-codes/batch', json=fields, headers=headers)
+
+def test_batch_returns_a_printable_sheet_of_new_codes(client, school):
+    r = batch(client, school['owner'], count=3, contact_info='Room 101')
+    assert r.status_code == 200 and r.mimetype == 'application/pdf'
+    assert r.data.startswith(b'%PDF')
+
+    r = batch(client, school['owner'], count=5, format='png')
+    assert r.status_code == 200 and r.mimetype == 'image/png'
+    assert Image.open(io.BytesIO(r.data)).width == 1240
+
+    r = client.get('/api/qr-codes/my-codes', headers=school['owner'])
+    codes = r.get_json()['qr_codes']
+    assert len(codes) == 8 and len({qr['code'] for qr in codes}) == 8
+
+def test_batch_validates_its_input(client, school):
+    assert batch(client, school['owner'], count=0).status_code == 400
+    assert batch(client, school['owner'], count='many').status_code == 400
+    assert batch(client, school['owner'], count=2, format='docx').status_code == 400
+    r = client.get('/api/qr-codes/my-codes', headers=school['owner'])
+    assert r.get_json()['qr_codes'] == []
+
+def test_large_batches_render_on_the_pool_like_inline():
+    datas = [f'https://example.com/qr/CODE{i}' for i in range(qr_render.INLINE_RENDER_LIMIT + 2)]
+    assert qr_render.render_many(datas, 64) == [qr_render.render(data, 64) for data in datas]
@@ -0,0 +1,102 @@
+import pytest
+from conftest import signup, post_lost_item, post_found_item, query_count
+
+# (user, path) for every listing endpoint; none may issue a query per row
+LISTINGS = [
+    ('owner', '/api/items/lost'),
+    ('owner', '/api/items/found'),
+    ('owner', '/api/items/matches'),
+    ('owner', '/api/items/stats'),
+    ('owner', '/api/claims/my-claims'),
+    ('finder', '/api/claims/found-item-claims'),
+    ('owner', '/api/qr-codes/my-codes'),
+    ('owner', '/api/messages/unread-counts'),
+    ('owner', '/api/rewards/leaderboard'),
+]
+
+def claim(client, headers, lost, found):
+    r = client.post('/api/claims/create', json={'lost_item_id': lost['id'], 'found_item_id': found['id']},
+                    headers=headers)
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['claim']['id']
+
+def add_rows(client, school, count, start=0):
+    """
+    `count` rounds of items, claims, messages and QR codes that the owner and
+    finder see, each involving a new pair of students so that every row
+    references different users
+    """
+    for i in range(start, start + count):
+        loser = signup(client, school['join_code'], f'loser{i}')
+        other_finder = signup(client, school['join_code'], f'finder{i}')
+        own_lost = post_lost_item(client, school['owner'], title=f'Black iPhone {i}')
+        their_lost = post_lost_item(client, loser, title=f'Black iPhone lost {i}')
+        their_found = post_found_item(client, other_finder, title=f'Black iPhone found {i}')
+        own_found = post_found_item(client, school['finder'], title=f'Black iPhone spotted {i}')
+
+        claim_id = claim(client, school['owner'], own_lost, their_found)
+        claim(client, loser, their_lost, own_found)
+        r = client.post('/api/messages/send', json={'claim_id': claim_id, 'content': f'Is it yours? {i}'},
+                        headers=other_finder)
+        assert r.status_code == 201, r.get_json()
+        r = client.post('/api/qr-codes/create', json={'lost_item_id': own_lost['id']}, headers=school['owner'])
+        assert r.status_code == 201, r.get_json()
+
+@pytest.mark.parametrize('user,path', LISTINGS)
+def test_listing_query_count_does_not_grow_with_rows(client, school, user, path):
+    add_rows(client, school, 2)
+    r = client.get(path, headers=school[user])
+    assert r.status_code == 200, r.get_json()
+    few = query_count(r)
+
+    add_rows(client, school, 6, start=2)
+    r = client.get(path, headers=school[user])
+    assert r.status_code == 200, r.get_json()
+    assert query_count(r) <= few  # Cached endpoints may even issue fewer
+
+def test_claim_messages_query_count_does_not_grow_with_messages(client, school):
+    lost = post_lost_item(client, school['owner'])
+    found = post_found_item(client, school['finder'])
+    claim_id = claim(client, school['owner'], lost, found)
+    path = f'/api/messages/claim/{claim_id}'
+
+    def send(count):
+        for i in range(count):
+            sender = school['finder'] if i % 2 else school['owner']
+            r = client.post('/api/messages/send', json={'claim_id': claim_id, 'content': f'message {i}'}, headers=sender)
+            assert r.status_code == 201, r.get_json()
+
+    send(2)
+    client.get(path, headers=school['owner'])  # Marks the owner's messages read
+    few = query_count(client.get(path, headers=school['owner']))
+
+    send(10)
+    client.get(path, headers=school['owner'])
+    r = client.get(path, headers=school['owner'])  # Nothing unread again, like the first measurement
+    assert len(r.get_json()['messages']) == 12
+    assert query_count(r) <= few
+
+def test_guard_fails_requests_over_the_limit(app, client):
+    from models import User
+
+    @app.route('/test/n-plus-one')
+    def n_plus_one():
+        for _ in range(app.config['MAX_QUERIES_PER_REQUEST'] + 1):
+            User.query.first()
+        return 'ok'
+
+    with pytest.raises(AssertionError, match='queries'):
+        client.get('/test/n-plus-one')
+
+def test_savepoints_are_not_counted(app, client):
+    from models import db, User
+
+    @app.route('/test/savepoints')
+    def savepoints():
+        for _ in range(app.config['MAX_QUERIES_PER_REQUEST']):
+            with db.session.begin_nested():
+                pass
+        User.query.first()
+        return 'ok'
+
+    assert query_count(client.get('/test/savepoints')) == 1
@@ -0,0 +1,55 @@
+import pytest
+from conftest import query_count
+from services import rate_limit
+
+def create_qr(client, headers):
+    r = client.post('/api/qr-codes/create', json={}, headers=headers)
+    assert r.status_code == 201, r.get_json()
+    return r.get_json()['qr_code']['code']
+
+def contact(client, code, message, ip='10.0.0.1'):
+    return client.post(f'/api/qr-codes/{code}/contact', json={'finder_name': 'Sam', 'message': message},
+                       environ_base={'REMOTE_ADDR': ip})
+
+def contact_messages(client, headers):
+    return [m['message'] for m in client.get('/api/qr-codes/contact-messages', headers=headers).get_json()['messages']]
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setitem(rate_limit.LIMITS, 'qr_contact', {'ip': 3, 'code': 5})
+
+def test_contact_is_limited_per_ip_before_touching_the_database(client, school, limits):
+    code = create_qr(client, school['owner'])
+    for i in range(3):
+        assert contact(client, code, f'found it {i}').status_code == 200
+    r = contact(client, code, 'found it again')
+    assert r.status_code == 429
+    assert int(r.headers['Retry-After']) >= 1
+    assert query_count(r) == 0
+    # Other clients have their own bucket
+    assert contact(client, code, 'found it too', ip='10.0.0.2').status_code == 200
+
+def test_contact_is_limited_per_code_across_ips(client, school, limits):
+    code = create_qr(client, school['owner'])
+    for i in range(5):
+        assert contact(client, code, f'found it {i}', ip=f'10.0.1.{i}').status_code == 200
+    assert contact(client, code, 'one more', ip='10.0.1.99').status_code == 429
+
+def test_identical_messages_are_stored_once(client, school):
+    code = create_qr(client, school['owner'])
+    assert contact(client, code, 'Your keys are at the front desk').status_code == 200
+    assert contact(client, code, 'Your keys are at the front desk').status_code == 200
+    assert contact_messages(client, school['owner']) == ['Your keys are at the front desk']
+
+def test_failed_sends_can_be_retried(client, school):
+    assert contact(client, 'NOSUCHCODE', 'hello').status_code == 404
+    assert contact(client, 'NOSUCHCODE', 'hello').status_code == 404  # Not a silent duplicate
+
+def test_buckets_refill_over_time(monkeypatch):
+    backend = rate_limit.MemoryBackend()
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'time', lambda: now[0])
+    assert [backend.take('k', 2, 1.0) >= 0 for _ in range(3)] == [True, True, False]
+    now[0] += 1
+    assert backend.take('k', 2, 1.0) >= 0
+    assert backend.take('k', 2, 1.0) < 0
@@ -0,0 +1,42 @@
+import pytest
+from conftest import post_lost_item
+from services import db_routing
+from services.db_routing import copy_to_replica, LAST_WRITE_HEADER
+
+@pytest.fixture
+def replica_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'replica.db'}"
+
+@pytest.fixture
+def snapshot(tmp_path):
+    """Bring the replica up to date with the primary"""
+    return lambda: copy_to_replica(str(tmp_path / 'test.db'), str(tmp_path / 'replica.db'))
+
+def lost_titles(client, headers, **extra_headers):
+    r = client.get('/api/items/lost', headers={**headers, **extra_headers})
+    assert r.status_code == 200, r.get_json()
+    return [item['title'] for item in r.get_json()['items']]
+
+def test_reads_go_to_the_replica_unless_the_caller_just_wrote(client, school, snapshot):
+    snapshot()
+    r = client.post('/api/items/lost', headers=school['owner'], data={
+        'title': 'Green backpack', 'description': 'green canvas backpack', 'category': 'bag',
+        'color': 'green', 'unique_traits': 'name tag'})
+    assert r.status_code == 201, r.get_json()
+    last_write = r.headers[LAST_WRITE_HEADER]
+
+    # The writer reads from the primary; everyone else sees the lagging replica
+    assert lost_titles(client, school['owner']) == ['Green backpack']
+    assert lost_titles(client, school['finder']) == []
+    # ...unless they echo a recent write, e.g. from another tab or worker
+    assert lost_titles(client, school['finder'], **{LAST_WRITE_HEADER: last_write}) == ['Green backpack']
+    assert lost_titles(client, school['finder'], **{LAST_WRITE_HEADER: 'garbage'}) == []
+
+    snapshot()
+    assert lost_titles(client, school['finder']) == ['Green backpack']
+
+def test_read_your_writes_window_expires(client, school, snapshot, monkeypatch):
+    snapshot()
+    post_lost_item(client, school['owner'], title='Green backpack')
+    monkeypatch.setattr(db_routing, '_read_your_writes_window', 0)
+    assert lost_titles(client, school['owner']) == []
@@ -0,0 +1,31 @@
+from sqlalchemy import text
+from conftest import signup, post_lost_item, post_found_item
+from models import db
+
+def search(client, headers, q, **params):
+    r = client.get('/api/items/search', query_string={'q': q, **params}, headers=headers)
+    assert r.status_code == 200, r.get_json()
+    return [(result['type'], result['item']['title']) for result in r.get_json()['results']]
+
+def test_search_ranks_and_filters_within_the_school(client, school):
+    post_lost_item(client, school['owner'], title='Green backpack', description='canvas backpack with patches')
+    post_found_item(client, school['finder'], title='Backpack found in gym', description='green backpack')
+    post_lost_item(client, school['owner'], title='Red wallet', description='leather wallet')
+
+    assert set(search(client, school['owner'], 'backpack')) == {
+        ('lost', 'Green backpack'), ('found', 'Backpack found in gym')}
+    assert search(client, school['owner'], 'backpack', type='found') == [('found', 'Backpack found in gym')]
+    assert search(client, school['owner'], 'wallet') == [('lost', 'Red wallet')]
+
+    # Other schools' items never show up
+    r = client.post('/api/admin/create-school', json={'name': 'Other School'}, headers=school['admin'])
+    outsider = signup(client, r.get_json()['school']['join_code'], 'outsider')
+    assert search(client, outsider, 'backpack') == []
+
+def test_deleted_items_leave_the_search_index(app, client, school):
+    item = post_lost_item(client, school['owner'], title='Green backpack')
+    r = client.delete(f"/api/items/lost/{item['id']}", headers=school['owner'])
+    assert r.status_code == 200, r.get_json()
+    assert search(client, school['owner'], 'backpack') == []
+    with app.app_context():
+        assert db.session.execute(text("SELECT COUNT(*) FROM items_fts")).scalar() == 0
@@ -0,0 +1,37 @@
+from sqlalchemy import event
+from conftest import signup, post_lost_item, post_found_item
+from models import db, Match, Claim, serialize_matches, serialize_claims
+
+def count_queries(fn):
+    statements = []
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listen)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listen)
+    return result, len(statements)
+
+def test_batched_serializers_match_lazy_to_dict(app, client, school):
+    for i in range(4):
+        owner = signup(client, school['join_code'], f'owner{i}')
+        finder = signup(client, school['join_code'], f'finder{i}')
+        post_found_item(client, finder, title=f'Black iPhone found {i}')
+        lost = post_lost_item(client, owner, title=f'Black iPhone {i}')
+        match = client.get('/api/items/matches', headers=owner).get_json()['matches'][0]
+        r = client.post('/api/claims/create', headers=owner,
+                        json={'lost_item_id': lost['id'], 'found_item_id': match['found_item_id']})
+        assert r.status_code == 201, r.get_json()
+
+    with app.app_context():
+        matches = Match.query.all()
+        claims = Claim.query.all()
+        assert len(matches) > 4 and len(claims) == 4
+
+        batched, queries = count_queries(lambda: serialize_matches(matches))
+        assert queries == 3  # Lost items, found items, users
+        assert batched == [m.to_dict() for m in matches]
+
+        batched, queries = count_queries(lambda: serialize_claims(claims))
+        assert queries == 3  # Claimants share the user lookup
+        assert batched == [c.to_dict() for c in claims]
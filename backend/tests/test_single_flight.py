@@ -0,0 +1,77 @@
+import threading
+import pytest
+from services import gemini_service
+from services.gemini_service import single_flight
+
+class CountingEvent(threading.Event):
+    """Event that counts the callers blocked on it"""
+
+    def __init__(self):
+        super().__init__()
+        self.waiters = threading.Semaphore(0)
+
+    def wait(self, timeout=None):
+        self.waiters.release()
+        return super().wait(timeout)
+
+def run_concurrently(key, fn, followers=3):
+    """
+    Start a leader blocked inside fn, then `followers` callers with the same key;
+    returns each follower's result or exception once the leader is released
+    """
+    started, release = threading.Event(), threading.Event()
+    outcomes = []
+
+    def leader_fn():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    def call(target):
+        try:
+            outcomes.append(single_flight(key, target))
+        except BaseException as e:
+            outcomes.append(e)
+
+    leader = threading.Thread(target=call, args=(leader_fn,))
+    leader.start()
+    assert started.wait(5)
+    done = gemini_service._in_flight[key].done = CountingEvent()
+    threads = [threading.Thread(target=call, args=(lambda: pytest.fail('followers must not call fn'),))
+               for _ in range(followers)]
+    for t in threads:
+        t.start()
+    for _ in threads:
+        assert done.waiters.acquire(timeout=5)
+    release.set()
+    for t in [leader] + threads:
+        t.join(5)
+    assert key not in gemini_service._in_flight
+    return outcomes
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return {'message': {'content': 'hi'}}
+
+    outcomes = run_concurrently('same-prompt', fn)
+    assert len(calls) == 1
+    assert outcomes == [{'message': {'content': 'hi'}}] * 4
+
+def test_errors_reach_every_caller():
+    def fn():
+        raise ConnectionError('ollama down')
+
+    outcomes = run_concurrently('failing-prompt', fn)
+    assert len(outcomes) == 4
+    assert all(isinstance(o, ConnectionError) for o in outcomes)
+
+def test_followers_are_released_when_the_leader_is_interrupted():
+    def fn():
+        raise KeyboardInterrupt
+
+    outcomes = run_concurrently('interrupted-prompt', fn)
+    assert sum(isinstance(o, KeyboardInterrupt) for o in outcomes) == 1  # Only the leader re-raises it
+    assert sum(isinstance(o, RuntimeError) for o in outcomes) == 3
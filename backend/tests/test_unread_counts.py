@@ -0,0 +1,53 @@
+from sqlalchemy import event
+from models import db
+
+def send(client, headers, claim_id, content='hello'):
+    r = client.post('/api/messages/send', json={'claim_id': claim_id, 'content': content}, headers=headers)
+    assert r.status_code == 201, r.get_json()
+
+def unread(client, headers):
+    r = client.get('/api/messages/unread-counts', headers=headers)
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()
+
+def test_counters_follow_sends_and_reads(client, school, claim_id):
+    for i in range(3):
+        send(client, school['finder'], claim_id, f'found it {i}')
+    send(client, school['owner'], claim_id, 'thanks')
+
+    assert unread(client, school['owner']) == {'claims': {str(claim_id): 3}, 'total': 3}
+    assert unread(client, school['finder']) == {'claims': {str(claim_id): 1}, 'total': 1}
+
+    r = client.post(f'/api/messages/claim/{claim_id}/read', headers=school['owner'])
+    assert r.get_json()['marked'] == 3
+    assert unread(client, school['owner']) == {'claims': {}, 'total': 0}
+
+    # Fetching the conversation marks the finder's message read too
+    r = client.get(f'/api/messages/claim/{claim_id}', headers=school['finder'])
+    assert [m['is_read'] for m in r.get_json()['messages'] if m['content'] == 'thanks'] == [True]
+    assert unread(client, school['finder'])['total'] == 0
+
+def test_reading_with_nothing_unread_does_not_write(app, client, school, claim_id):
+    send(client, school['finder'], claim_id)
+    client.post(f'/api/messages/claim/{claim_id}/read', headers=school['owner'])
+
+    statements = []
+    with app.app_context():
+        listen = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listen)
+    try:
+        r = client.post(f'/api/messages/claim/{claim_id}/read', headers=school['owner'])
+        assert r.get_json()['marked'] == 0
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', listen)
+    assert not [s for s in statements if s.lstrip().upper().startswith('UPDATE')]
+
+def test_deleting_a_claim_drops_its_counters(client, school, claim_id):
+    send(client, school['finder'], claim_id)
+    assert unread(client, school['owner'])['total'] == 1
+    r = client.get('/api/claims/my-claims', headers=school['owner'])
+    lost_item_id = r.get_json()['claims'][0]['lost_item_id']
+    r = client.delete(f'/api/items/lost/{lost_item_id}', headers=school['owner'])
+    assert r.status_code == 200, r.get_json()
+    assert unread(client, school['owner']) == {'claims': {}, 'total': 0}
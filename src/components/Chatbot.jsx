@@ -10,6 +10,7 @@ const Chatbot = () => {
   ]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
+  const [sessionId, setSessionId] = useState(null);
   const messagesEndRef = useRef(null);
   const inputRef = useRef(null);
 
@@ -34,13 +35,22 @@ const Chatbot = () => {
     setMessages(newMessages);
 
     try {
-      // Prepare conversation history (excluding system message)
-      const history = newMessages.map(msg => ({
-        role: msg.role,
-        content: msg.content
-      }));
-
-      const response = await chatAPI.sendMessage(userMessage, history);
+      // History is kept server-side, keyed by session ID, so only the new message is sent.
+      // If the server no longer has the session, resend once with the prior turns to rebuild it
+      let response;
+      try {
+        response = await chatAPI.sendMessage(userMessage, sessionId);
+      } catch (err) {
+        if (!err.data?.session_expired) throw err;
+        const history = messages.map(msg => ({
+          role: msg.role,
+          content: msg.content
+        }));
+        response = await chatAPI.sendMessage(userMessage, null, history);
+      }
+      if (response.session_id) {
+        setSessionId(response.session_id);
+      }
       
       // Add AI response
       setMessages([...newMessages, { role: 'assistant', content: response.response }]);
@@ -60,6 +70,10 @@ const Chatbot = () => {
   };
 
   const handleClear = () => {
+    if (sessionId) {
+      chatAPI.clearSession(sessionId).catch(err => console.error('Error clearing chat session:', err));
+      setSessionId(null);
+    }
     setMessages([
       {
         role: 'assistant',
@@ -7,6 +7,7 @@ const ClaimDetail = ({ claim, currentUserId, onClose, onUpdate }) => {
   const [newMessage, setNewMessage] = useState('');
   const [sending, setSending] = useState(false);
   const [loading, setLoading] = useState(true);
+  const [hasOlder, setHasOlder] = useState(false);
   const [uploadingPhoto, setUploadingPhoto] = useState(false);
   const [proofPhoto, setProofPhoto] = useState(null);
   const messagesEndRef = useRef(null);
@@ -21,15 +22,31 @@ const ClaimDetail = ({ claim, currentUserId, onClose, onUpdate }) => {
   }, [claim]);
 
   useEffect(() => {
-    loadMessages();
-    // Poll for new messages every 3 seconds
-    const interval = setInterval(loadMessages, 3000);
-    return () => clearInterval(interval);
+    let source = null;
+    let cancelled = false;
+
+    // Load the history once, then receive new messages over a single stream
+    loadMessages().then((loaded) => {
+      if (cancelled) return;
+      const lastId = loaded.length ? loaded[loaded.length - 1].id : 0;
+      source = messagesAPI.streamMessages(currentClaim.id, lastId, (message) => {
+        appendMessage(message);
+        if (message.receiver_id === currentUserId) {
+          // The chat is open, so the message has been seen
+          messagesAPI.markRead(currentClaim.id).catch(() => {});
+        }
+      });
+    });
+
+    return () => {
+      cancelled = true;
+      if (source) source.close();
+    };
   }, [currentClaim.id]);
 
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [messages.length ? messages[messages.length - 1].id : null]);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -38,23 +55,44 @@ const ClaimDetail = ({ claim, currentUserId, onClose, onUpdate }) => {
   const loadMessages = async () => {
     try {
       const data = await messagesAPI.getMessages(currentClaim.id);
-      setMessages(data.messages || []);
+      const loaded = data.messages || [];
+      setMessages(loaded);
+      setHasOlder(Boolean(data.has_more));
       setLoading(false);
+      return loaded;
     } catch (err) {
       console.error('Error loading messages:', err);
       setLoading(false);
+      return [];
+    }
+  };
+
+  const loadOlderMessages = async () => {
+    if (!messages.length) return;
+    try {
+      const data = await messagesAPI.getMessages(currentClaim.id, { before_id: messages[0].id });
+      setMessages((prev) => [...(data.messages || []), ...prev]);
+      setHasOlder(Boolean(data.has_more));
+    } catch (err) {
+      console.error('Error loading older messages:', err);
     }
   };
 
+  const appendMessage = (message) => {
+    setMessages((prev) => (prev.some((m) => m.id === message.id) ? prev : [...prev, message]));
+  };
+
   const handleSendMessage = async (e) => {
     e.preventDefault();
     if (!newMessage.trim() || sending) return;
 
     try {
       setSending(true);
-      await messagesAPI.sendMessage(currentClaim.id, newMessage.trim());
+      const result = await messagesAPI.sendMessage(currentClaim.id, newMessage.trim());
       setNewMessage('');
-      await loadMessages();
+      if (result.message_data) {
+        appendMessage(result.message_data);
+      }
     } catch (err) {
       alert(err.message || 'Failed to send message');
     } finally {
@@ -283,6 +321,16 @@ const ClaimDetail = ({ claim, currentUserId, onClose, onUpdate }) => {
           <div className="flex-1 flex flex-col">
             {/* Messages List */}
             <div className="flex-1 overflow-y-auto p-6 space-y-4">
+              {!loading && hasOlder && (
+                <div className="text-center">
+                  <button
+                    onClick={loadOlderMessages}
+                    className="text-sm text-[#4278ff] font-semibold hover:underline"
+                  >
+                    Load earlier messages
+                  </button>
+                </div>
+              )}
               {loading ? (
                 <div className="text-center py-8 text-[#5C5B61]">Loading messages...</div>
               ) : messages.length === 0 ? (
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { itemsAPI, claimsAPI } from '../utils/api';
+import LoadMoreButton from './LoadMoreButton';
 
 const FoundItems = () => {
   const [items, setItems] = useState([]);
@@ -11,6 +12,9 @@ const FoundItems = () => {
   const [claiming, setClaiming] = useState(false);
   const [lostItems, setLostItems] = useState([]);
   const [selectedLostItem, setSelectedLostItem] = useState('');
+  const [searchQuery, setSearchQuery] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadItems();
@@ -20,20 +24,15 @@ const FoundItems = () => {
     try {
       setLoading(true);
       setError('');
-      const data = await itemsAPI.getFoundItems();
-      
-      // Filter to only show available items
-      const availableItems = data.items?.filter(item => item.status === 'available') || [];
-      setItems(availableItems);
+      const data = await itemsAPI.getFoundItems({ status: 'available' });
+      setItems(data.items || []);
+      setNextCursor(data.next_cursor || null);
       
       // Also load user's lost items for claiming
       try {
-        const lostData = await itemsAPI.getLostItems();
-        // Filter for active lost items (not found, not deleted)
-        const activeLostItems = lostData.items?.filter(item => 
-          item.status === 'active' || !item.status || item.status === ''
-        ) || [];
-        setLostItems(activeLostItems);
+        // The user's active lost items (not found, not deleted), one full page for the picker
+        const lostData = await itemsAPI.getLostItems({ mine: 1, status: 'active', limit: 100 });
+        setLostItems(lostData.items || []);
       } catch (lostErr) {
         console.error('Error loading lost items:', lostErr);
         // Don't fail the whole component if lost items fail to load
@@ -47,6 +46,37 @@ const FoundItems = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await itemsAPI.getFoundItems({ status: 'available', cursor: nextCursor });
+      setItems((prev) => [...prev, ...(data.items || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      console.error('Error loading found items:', err);
+      setError(err.message || 'Failed to load found items');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const handleSearch = async (e) => {
+    e.preventDefault();
+    if (!searchQuery.trim()) {
+      loadItems();
+      return;
+    }
+    try {
+      setError('');
+      const data = await itemsAPI.searchItems(searchQuery.trim(), { type: 'found', status: 'available' });
+      setItems((data.results || []).map(result => result.item));
+      setNextCursor(null);  // Search results aren't part of the listing's pages
+    } catch (err) {
+      console.error('Error searching found items:', err);
+      setError(err.message || 'Search failed');
+    }
+  };
+
   const handleClaimClick = (item) => {
     setSelectedItem(item);
     setSelectedLostItem('');
@@ -103,7 +133,7 @@ const FoundItems = () => {
     );
   }
 
-  if (items.length === 0) {
+  if (items.length === 0 && !searchQuery) {
     return (
       <div className="text-center py-12">
         <div className="bg-gradient-to-br from-[#4278ff]/10 to-[#06ABAB]/10 rounded-full w-20 h-20 flex items-center justify-center mx-auto mb-4">
@@ -128,9 +158,24 @@ const FoundItems = () => {
             <p className="text-[#5C5B61]">Items found by others - claim if they're yours</p>
           </div>
           <div className="bg-white px-4 py-2 rounded-lg border border-emerald-200 shadow-sm">
-            <span className="text-lg font-bold text-emerald-700">{items.length} {items.length === 1 ? 'item' : 'items'}</span>
+            <span className="text-lg font-bold text-emerald-700">{items.length}{nextCursor ? '+' : ''} {items.length === 1 ? 'item' : 'items'}</span>
           </div>
         </div>
+        <form onSubmit={handleSearch} className="mt-4 flex gap-2">
+          <input
+            type="text"
+            value={searchQuery}
+            onChange={(e) => setSearchQuery(e.target.value)}
+            placeholder="Search by title, description, brand, color or location..."
+            className="flex-1 px-4 py-2 rounded-lg border-2 border-emerald-200 focus:border-[#4278ff] focus:outline-none transition-colors bg-white"
+          />
+          <button
+            type="submit"
+            className="bg-[#4278ff] text-white px-4 py-2 rounded-lg font-semibold hover:bg-[#3a6ce0] transition-colors"
+          >
+            Search
+          </button>
+        </form>
       </div>
 
       {/* Items Grid */}
@@ -196,6 +241,8 @@ const FoundItems = () => {
         ))}
       </div>
 
+      {nextCursor && <LoadMoreButton onClick={loadMore} loading={loadingMore} />}
+
       {/* Claim Modal */}
       {showClaimModal && selectedItem && (
         <div className="fixed inset-0 z-50 flex items-center justify-center p-4 bg-black/50 backdrop-blur-sm">
@@ -0,0 +1,16 @@
+import React from 'react';
+
+// Fetches the next page of a cursor-paginated listing
+const LoadMoreButton = ({ onClick, loading }) => (
+  <div className="flex justify-center pt-2">
+    <button
+      onClick={onClick}
+      disabled={loading}
+      className="bg-white text-[#4278ff] border border-[#4278ff]/30 px-6 py-2 rounded-lg hover:bg-[#4278ff]/5 transition-colors font-semibold text-sm disabled:opacity-50"
+    >
+      {loading ? 'Loading...' : 'Load more'}
+    </button>
+  </div>
+);
+
+export default LoadMoreButton;
@@ -1,11 +1,14 @@
 import React, { useState, useEffect } from 'react';
 import { itemsAPI } from '../utils/api';
+import LoadMoreButton from './LoadMoreButton';
 
 const LostItems = ({ refreshKey, currentUserId }) => {
   const [items, setItems] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [deleting, setDeleting] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadItems();
@@ -14,9 +17,10 @@ const LostItems = ({ refreshKey, currentUserId }) => {
   const loadItems = async () => {
     try {
       setLoading(true);
-      const data = await itemsAPI.getLostItems();
-      // Filter to only show active lost items
-      setItems(data.items?.filter(item => item.status === 'active') || []);
+      // Only active lost items
+      const data = await itemsAPI.getLostItems({ status: 'active' });
+      setItems(data.items || []);
+      setNextCursor(data.next_cursor || null);
     } catch (err) {
       setError(err.message || 'Failed to load lost items');
     } finally {
@@ -24,6 +28,19 @@ const LostItems = ({ refreshKey, currentUserId }) => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await itemsAPI.getLostItems({ status: 'active', cursor: nextCursor });
+      setItems((prev) => [...prev, ...(data.items || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      setError(err.message || 'Failed to load lost items');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (itemId) => {
     if (!window.confirm('Are you sure you want to delete this lost item posting?')) {
       return;
@@ -74,7 +91,7 @@ const LostItems = ({ refreshKey, currentUserId }) => {
             <p className="text-[#5C5B61]">Items that others have lost - keep an eye out!</p>
           </div>
           <div className="bg-white px-4 py-2 rounded-lg border border-rose-200 shadow-sm">
-            <span className="text-lg font-bold text-rose-700">{items.length} {items.length === 1 ? 'item' : 'items'}</span>
+            <span className="text-lg font-bold text-rose-700">{items.length}{nextCursor ? '+' : ''} {items.length === 1 ? 'item' : 'items'}</span>
           </div>
         </div>
       </div>
@@ -168,6 +185,8 @@ const LostItems = ({ refreshKey, currentUserId }) => {
           </div>
         ))}
       </div>
+
+      {nextCursor && <LoadMoreButton onClick={loadMore} loading={loadingMore} />}
     </div>
   );
 };
@@ -1,10 +1,13 @@
 import React, { useState, useEffect } from 'react';
 import { itemsAPI, claimsAPI } from '../utils/api';
+import LoadMoreButton from './LoadMoreButton';
 
 const Matches = () => {
   const [matches, setMatches] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadMatches();
@@ -13,8 +16,10 @@ const Matches = () => {
   const loadMatches = async () => {
     try {
       setLoading(true);
+      // Best matches first
       const data = await itemsAPI.getMatches();
       setMatches(data.matches || []);
+      setNextCursor(data.next_cursor || null);
     } catch (err) {
       setError(err.message || 'Failed to load matches');
     } finally {
@@ -22,6 +27,19 @@ const Matches = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await itemsAPI.getMatches({ cursor: nextCursor });
+      setMatches((prev) => [...prev, ...(data.matches || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      setError(err.message || 'Failed to load matches');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleClaim = async (match) => {
     if (!window.confirm('Are you sure this is your item? You\'ll need to verify ownership.')) {
       return;
@@ -73,7 +91,7 @@ const Matches = () => {
             <p className="text-[#5C5B61]">Potential matches for your lost items powered by AI</p>
           </div>
           <div className="bg-white px-4 py-2 rounded-lg border border-[#4278ff]/20">
-            <span className="text-lg font-bold text-[#4278ff]">{matches.length} {matches.length === 1 ? 'match' : 'matches'}</span>
+            <span className="text-lg font-bold text-[#4278ff]">{matches.length}{nextCursor ? '+' : ''} {matches.length === 1 ? 'match' : 'matches'}</span>
           </div>
         </div>
       </div>
@@ -132,6 +150,8 @@ const Matches = () => {
         );
       })}
       </div>
+
+      {nextCursor && <LoadMoreButton onClick={loadMore} loading={loadingMore} />}
     </div>
   );
 };
@@ -1,6 +1,14 @@
 import React, { useState, useEffect } from 'react';
 import { claimsAPI, messagesAPI } from '../utils/api';
 import ClaimDetail from './ClaimDetail';
+import LoadMoreButton from './LoadMoreButton';
+
+// Claims made by the user and claims on items they found, deduplicated, most recent first
+const mergeClaims = (...lists) => {
+  const byId = new Map();
+  lists.flat().forEach((claim) => byId.set(claim.id, claim));
+  return [...byId.values()].sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
+};
 
 const MyClaims = ({ currentUserId }) => {
   const [claims, setClaims] = useState([]);
@@ -8,6 +16,10 @@ const MyClaims = ({ currentUserId }) => {
   const [error, setError] = useState('');
   const [selectedClaim, setSelectedClaim] = useState(null);
   const [showDetail, setShowDetail] = useState(false);
+  const [unreadCounts, setUnreadCounts] = useState({});
+  // Each listing pages separately: { mine, found } next_cursor values
+  const [cursors, setCursors] = useState({ mine: null, found: null });
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadClaims();
@@ -18,20 +30,14 @@ const MyClaims = ({ currentUserId }) => {
       setLoading(true);
       setError('');
       // Load both claims made by user and claims on items they found
-      const [myClaimsData, foundItemClaimsData] = await Promise.all([
+      const [myClaimsData, foundItemClaimsData, unreadData] = await Promise.all([
         claimsAPI.getMyClaims().catch(() => ({ claims: [] })),
-        claimsAPI.getFoundItemClaims().catch(() => ({ claims: [] }))
+        claimsAPI.getFoundItemClaims().catch(() => ({ claims: [] })),
+        messagesAPI.getUnreadCounts().catch(() => ({ claims: {} }))
       ]);
-      
-      // Combine and deduplicate claims
-      const allClaims = [...(myClaimsData.claims || []), ...(foundItemClaimsData.claims || [])];
-      const uniqueClaims = allClaims.filter((claim, index, self) =>
-        index === self.findIndex(c => c.id === claim.id)
-      );
-      
-      // Sort by most recent
-      uniqueClaims.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-      setClaims(uniqueClaims);
+      setUnreadCounts(unreadData.claims || {});
+      setClaims(mergeClaims(myClaimsData.claims || [], foundItemClaimsData.claims || []));
+      setCursors({ mine: myClaimsData.next_cursor || null, found: foundItemClaimsData.next_cursor || null });
     } catch (err) {
       console.error('Error loading claims:', err);
       setError(err.message || 'Failed to load claims');
@@ -40,6 +46,23 @@ const MyClaims = ({ currentUserId }) => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const [myClaimsData, foundItemClaimsData] = await Promise.all([
+        cursors.mine ? claimsAPI.getMyClaims({ cursor: cursors.mine }) : { claims: [] },
+        cursors.found ? claimsAPI.getFoundItemClaims({ cursor: cursors.found }) : { claims: [] }
+      ]);
+      setClaims((prev) => mergeClaims(prev, myClaimsData.claims || [], foundItemClaimsData.claims || []));
+      setCursors({ mine: myClaimsData.next_cursor || null, found: foundItemClaimsData.next_cursor || null });
+    } catch (err) {
+      console.error('Error loading claims:', err);
+      setError(err.message || 'Failed to load claims');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleViewClaim = (claim) => {
     setSelectedClaim(claim);
     setShowDetail(true);
@@ -80,6 +103,8 @@ const MyClaims = ({ currentUserId }) => {
     );
   };
 
+  const hasMore = Boolean(cursors.mine || cursors.found);
+
   if (loading) {
     return (
       <div className="text-center py-12">
@@ -123,7 +148,7 @@ const MyClaims = ({ currentUserId }) => {
             <p className="text-[#5C5B61]">Track your item claims and coordinate with finders</p>
           </div>
           <div className="bg-white px-4 py-2 rounded-lg border border-blue-200 shadow-sm">
-            <span className="text-lg font-bold text-blue-700">{claims.length} {claims.length === 1 ? 'claim' : 'claims'}</span>
+            <span className="text-lg font-bold text-blue-700">{claims.length}{hasMore ? '+' : ''} {claims.length === 1 ? 'claim' : 'claims'}</span>
           </div>
         </div>
       </div>
@@ -159,7 +184,14 @@ const MyClaims = ({ currentUserId }) => {
                       )}
                     </p>
                   </div>
-                  {getStatusBadge(claim.status, claim.verification_status)}
+                  <div className="flex items-center gap-2 shrink-0">
+                    {unreadCounts[claim.id] > 0 && (
+                      <span className="bg-[#4278ff] text-white px-2 py-1 rounded-full text-xs font-semibold">
+                        {unreadCounts[claim.id]} new
+                      </span>
+                    )}
+                    {getStatusBadge(claim.status, claim.verification_status)}
+                  </div>
                 </div>
 
                 <div className="flex flex-wrap gap-2 text-xs text-[#5C5B61] mb-3">
@@ -205,6 +237,8 @@ const MyClaims = ({ currentUserId }) => {
         ))}
       </div>
 
+      {hasMore && <LoadMoreButton onClick={loadMore} loading={loadingMore} />}
+
       {showDetail && selectedClaim && (
         <ClaimDetail
           claim={selectedClaim}
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { qrCodesAPI, itemsAPI } from '../utils/api';
+import LoadMoreButton from './LoadMoreButton';
 
 const MyQRCodes = ({ currentUserId }) => {
   const [qrCodes, setQRCodes] = useState([]);
@@ -13,6 +14,8 @@ const MyQRCodes = ({ currentUserId }) => {
   const [creating, setCreating] = useState(false);
   const [deleting, setDeleting] = useState(null);
   const [activeTab, setActiveTab] = useState('codes'); // 'codes' or 'messages'
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadData();
@@ -24,11 +27,13 @@ const MyQRCodes = ({ currentUserId }) => {
       setError('');
       const [qrData, lostData, messagesData] = await Promise.all([
         qrCodesAPI.getMyQRCodes().catch(() => ({ qr_codes: [] })),
-        itemsAPI.getLostItems().catch(() => ({ items: [] })),
+        // One full page of the user's active lost items for the link picker
+        itemsAPI.getLostItems({ mine: 1, status: 'active', limit: 100 }).catch(() => ({ items: [] })),
         qrCodesAPI.getContactMessages().catch(() => ({ messages: [] }))
       ]);
       setQRCodes(qrData.qr_codes || []);
-      setLostItems(lostData.items?.filter(item => item.status === 'active') || []);
+      setNextCursor(qrData.next_cursor || null);
+      setLostItems(lostData.items || []);
       setContactMessages(messagesData.messages || []);
     } catch (err) {
       console.error('Error loading QR codes:', err);
@@ -38,6 +43,20 @@ const MyQRCodes = ({ currentUserId }) => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await qrCodesAPI.getMyQRCodes({ cursor: nextCursor });
+      setQRCodes((prev) => [...prev, ...(data.qr_codes || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      console.error('Error loading QR codes:', err);
+      setError(err.message || 'Failed to load QR codes');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCreateQR = async (e) => {
     e.preventDefault();
     try {
@@ -58,6 +77,29 @@ const MyQRCodes = ({ currentUserId }) => {
     }
   };
 
+  const handleCreateBatch = async () => {
+    const input = window.prompt('How many QR codes do you want to print?', '20');
+    const count = parseInt(input, 10);
+    if (!count) return;
+    try {
+      setCreating(true);
+      const blob = await qrCodesAPI.createQRCodeBatch(count, contactInfo || null, 'pdf');
+      const url = window.URL.createObjectURL(blob);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = 'reunite-qr-codes.pdf';
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+      window.URL.revokeObjectURL(url);
+      loadData();
+    } catch (err) {
+      alert(err.message || 'Failed to create QR codes');
+    } finally {
+      setCreating(false);
+    }
+  };
+
   const handleDownload = async (qrCode) => {
     try {
       const qrUrl = `https://reunite.adiavi.com/${qrCode.qr_image_url}`;
@@ -122,7 +164,7 @@ const MyQRCodes = ({ currentUserId }) => {
           </div>
           <div className="flex items-center gap-3">
             <div className="bg-white px-4 py-2 rounded-lg border border-amber-200 shadow-sm">
-              <span className="text-lg font-bold text-amber-700">{qrCodes.length} {qrCodes.length === 1 ? 'code' : 'codes'}</span>
+              <span className="text-lg font-bold text-amber-700">{qrCodes.length}{nextCursor ? '+' : ''} {qrCodes.length === 1 ? 'code' : 'codes'}</span>
             </div>
             <button
               onClick={() => setShowCreateModal(true)}
@@ -133,6 +175,13 @@ const MyQRCodes = ({ currentUserId }) => {
               </svg>
               Create QR Code
             </button>
+            <button
+              onClick={handleCreateBatch}
+              disabled={creating}
+              className="bg-white text-[#4278ff] border-2 border-[#4278ff] px-5 py-2 rounded-lg hover:bg-[#4278ff]/5 transition-colors font-semibold text-sm disabled:opacity-50"
+            >
+              Print Sheet
+            </button>
           </div>
         </div>
         
@@ -146,7 +195,7 @@ const MyQRCodes = ({ currentUserId }) => {
                 : 'text-[#5C5B61] hover:text-amber-700'
             }`}
           >
-            My QR Codes ({qrCodes.length})
+            My QR Codes ({qrCodes.length}{nextCursor ? '+' : ''})
           </button>
           <button
             onClick={() => setActiveTab('messages')}
@@ -294,6 +343,8 @@ const MyQRCodes = ({ currentUserId }) => {
         </div>
       )}
 
+      {activeTab === 'codes' && nextCursor && <LoadMoreButton onClick={loadMore} loading={loadingMore} />}
+
       {/* Create QR Code Modal */}
       {showCreateModal && (
         <div className="fixed inset-0 z-50 flex items-center justify-center p-4 bg-black/50 backdrop-blur-sm">
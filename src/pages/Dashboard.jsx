@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { authAPI, studentAPI, rewardsAPI, itemsAPI, claimsAPI, qrCodesAPI, clearAuthTokens } from '../utils/api';
+import { authAPI, studentAPI, rewardsAPI, itemsAPI, clearAuthTokens } from '../utils/api';
 import ReportLostItem from '../components/ReportLostItem';
 import ReportFoundItem from '../components/ReportFoundItem';
 import Sidebar from '../components/Sidebar';
@@ -114,26 +114,15 @@ const Dashboard = () => {
 
   const loadStatistics = async () => {
     try {
-      const [lostData, foundData, claimsData, matchesData, qrCodesData] = await Promise.all([
-        itemsAPI.getLostItems().catch(() => ({ items: [] })),
-        itemsAPI.getFoundItems().catch(() => ({ items: [] })),
-        claimsAPI.getMyClaims().catch(() => ({ claims: [] })),
-        itemsAPI.getMatches().catch(() => ({ matches: [] })),
-        qrCodesAPI.getMyQRCodes().catch(() => ({ qr_codes: [] }))
-      ]);
-
-      // Count user's lost items
-      const myLostItems = lostData.items?.filter(item => item.user_id === user?.id) || [];
-      
-      // Count available found items
-      const availableFoundItems = foundData.items?.filter(item => item.status === 'available') || [];
+      // Counted server-side, so totals aren't limited to the first page of each listing
+      const data = await itemsAPI.getStats();
 
       setStats({
-        lostItems: myLostItems.length,
-        foundItems: availableFoundItems.length,
-        myClaims: claimsData.claims?.length || 0,
-        matches: matchesData.matches?.length || 0,
-        qrCodes: qrCodesData.qr_codes?.length || 0
+        lostItems: data.lost_items || 0,
+        foundItems: data.found_items || 0,
+        myClaims: data.my_claims || 0,
+        matches: data.matches || 0,
+        qrCodes: data.qr_codes || 0
       });
     } catch (err) {
       console.error('Error loading statistics:', err);
@@ -26,7 +26,7 @@ const QRCodeContact = () => {
       setQrInfo(data);
     } catch (err) {
       console.error('Error loading QR info:', err);
-      setResult({ success: false, message: 'Invalid QR code' });
+      setResult({ success: false, message: err.status === 429 ? err.message : 'Invalid QR code' });
     } finally {
       setLoading(false);
     }
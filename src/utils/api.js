@@ -35,10 +35,21 @@ const getAuthHeaders = () => {
   return headers;
 };
 
+// Time of our last write, from the X-Last-Write response header. Sending it back
+// lets whichever server worker handles the next read skip a lagging read replica
+let lastWrite = null;
+
+const rememberWrite = (response) => {
+  lastWrite = response.headers.get('X-Last-Write') || lastWrite;
+};
+
 // API request helper
 const apiRequest = async (endpoint, options = {}) => {
   const url = `${API_BASE_URL}${endpoint}`;
   const headers = getAuthHeaders();
+  if (lastWrite) {
+    headers['X-Last-Write'] = lastWrite;
+  }
   
   // Merge with any custom headers from options
   if (options.headers) {
@@ -60,6 +71,7 @@ const apiRequest = async (endpoint, options = {}) => {
 
   try {
     const response = await fetch(url, config);
+    rememberWrite(response);
     
     // Handle empty responses
     let data;
@@ -97,6 +109,14 @@ const apiRequest = async (endpoint, options = {}) => {
   }
 };
 
+// Build a query string from list params (limit, cursor, status, category), skipping empty values
+const withQuery = (endpoint, params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+  ).toString();
+  return query ? `${endpoint}?${query}` : endpoint;
+};
+
 // Auth API
 export const authAPI = {
   signup: async (userData) => {
@@ -223,6 +243,7 @@ export const itemsAPI = {
       },
       body: formData,
     });
+    rememberWrite(response);
     const data = await response.json();
     if (!response.ok) throw new Error(data.error || 'Failed to report lost item');
     return data;
@@ -237,21 +258,30 @@ export const itemsAPI = {
       },
       body: formData,
     });
+    rememberWrite(response);
     const data = await response.json();
     if (!response.ok) throw new Error(data.error || 'Failed to report found item');
     return data;
   },
 
-  getLostItems: async () => {
-    return apiRequest('/items/lost');
+  getLostItems: async (params = {}) => {
+    return apiRequest(withQuery('/items/lost', params));
+  },
+
+  getFoundItems: async (params = {}) => {
+    return apiRequest(withQuery('/items/found', params));
+  },
+
+  getMatches: async (params = {}) => {
+    return apiRequest(withQuery('/items/matches', params));
   },
 
-  getFoundItems: async () => {
-    return apiRequest('/items/found');
+  getStats: async () => {
+    return apiRequest('/items/stats');
   },
 
-  getMatches: async () => {
-    return apiRequest('/items/matches');
+  searchItems: async (q, params = {}) => {
+    return apiRequest(withQuery('/items/search', { q, ...params }));
   },
 
   getQRItem: async (code) => {
@@ -291,6 +321,7 @@ export const claimsAPI = {
       },
       body: formData,
     });
+    rememberWrite(response);
     const data = await response.json();
     if (!response.ok) throw new Error(data.error || 'Failed to verify claim');
     return data;
@@ -302,12 +333,12 @@ export const claimsAPI = {
     });
   },
 
-  getMyClaims: async () => {
-    return apiRequest('/claims/my-claims');
+  getMyClaims: async (params = {}) => {
+    return apiRequest(withQuery('/claims/my-claims', params));
   },
 
-  getFoundItemClaims: async () => {
-    return apiRequest('/claims/found-item-claims');
+  getFoundItemClaims: async (params = {}) => {
+    return apiRequest(withQuery('/claims/found-item-claims', params));
   },
 };
 
@@ -323,8 +354,68 @@ export const messagesAPI = {
     });
   },
 
-  getMessages: async (claimId) => {
-    return apiRequest(`/messages/claim/${claimId}`);
+  getMessages: async (claimId, params = {}) => {
+    return apiRequest(withQuery(`/messages/claim/${claimId}`, params));
+  },
+
+  markRead: async (claimId) => {
+    return apiRequest(`/messages/claim/${claimId}/read`, { method: 'POST' });
+  },
+
+  getUnreadCounts: async () => {
+    return apiRequest('/messages/unread-counts');
+  },
+
+  // Server-Sent Events stream of new messages. Each connection is opened with a
+  // short-lived token scoped to the claim, since EventSource can't send the
+  // Authorization header. When the server ends a stream (or the token expires),
+  // it reconnects with a fresh token from the last message received.
+  // Returns a handle whose close() stops the stream.
+  streamMessages: (claimId, afterId, onMessage, retryMs = 3000) => {
+    let lastId = afterId;
+    let source = null;
+    let retryTimer = null;
+    let closed = false;
+
+    const connect = async () => {
+      try {
+        const { token } = await apiRequest(`/messages/claim/${claimId}/stream-token`, { method: 'POST' });
+        if (closed) return;
+        const params = { token };
+        if (lastId != null) {
+          params.after_id = lastId;
+        }
+        source = new EventSource(`${API_BASE_URL}${withQuery(`/messages/claim/${claimId}/stream`, params)}`);
+        source.addEventListener('message', (event) => {
+          const message = JSON.parse(event.data);
+          lastId = message.id;
+          onMessage(message);
+        });
+        source.addEventListener('error', () => {
+          // Reconnect ourselves: the browser would retry with the expired token
+          source.close();
+          scheduleReconnect();
+        });
+      } catch (err) {
+        if (err.status === 403 || err.status === 404) return; // No longer part of this claim
+        scheduleReconnect();
+      }
+    };
+
+    const scheduleReconnect = () => {
+      if (!closed) {
+        retryTimer = setTimeout(connect, retryMs);
+      }
+    };
+
+    connect();
+    return {
+      close: () => {
+        closed = true;
+        clearTimeout(retryTimer);
+        if (source) source.close();
+      },
+    };
   },
 };
 
@@ -351,8 +442,24 @@ export const qrCodesAPI = {
     });
   },
 
-  getMyQRCodes: async () => {
-    return apiRequest('/qr-codes/my-codes');
+  // Returns the printable sheet as a Blob (format: 'pdf' or 'png')
+  createQRCodeBatch: async (count, contactInfo, format = 'pdf') => {
+    const response = await fetch(`${API_BASE_URL}/qr-codes/batch`, {
+      method: 'POST',
+      headers: getAuthHeaders(),
+      credentials: 'include',
+      body: JSON.stringify({ count, contact_info: contactInfo || null, format }),
+    });
+    rememberWrite(response);
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.error || 'Failed to create QR codes');
+    }
+    return response.blob();
+  },
+
+  getMyQRCodes: async (params = {}) => {
+    return apiRequest(withQuery('/qr-codes/my-codes', params));
   },
 
   getQRInfo: async (code) => {
@@ -379,13 +486,21 @@ export const qrCodesAPI = {
 
 // Chat API
 export const chatAPI = {
-  sendMessage: async (message, history = []) => {
+  // Pass history only to rebuild a session the server answered with session_expired
+  sendMessage: async (message, sessionId = null, history = null) => {
+    const body = { message, session_id: sessionId };
+    if (history) {
+      body.history = history;
+    }
     return apiRequest('/chat/message', {
       method: 'POST',
-      body: {
-        message,
-        history
-      },
+      body,
+    });
+  },
+
+  clearSession: async (sessionId) => {
+    return apiRequest(`/chat/session/${sessionId}`, {
+      method: 'DELETE',
     });
   },
 };